@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  starts / stops the BST daemon which serves dependency and proxy
+#  queries from an in-memory cache
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+#----------------------------------------------------------------------------
+# Includes
+#----------------------------------------------------------------------------
+
+
+import logging
+import sys
+
+from ToolBOSCore.BuildSystem import BSTDaemon
+from ToolBOSCore.Util        import ArgsManagerV2
+
+
+#----------------------------------------------------------------------------
+# Commandline parsing
+#----------------------------------------------------------------------------
+
+
+desc = 'Starts a per-user daemon which keeps the ToolBOS settings and the ' \
+       'pkgInfo.py files of the Software Installation Tree (SIT) in memory. ' \
+       'While running, "ListDependencies.py" and "UpdateProxyDir.py" are ' \
+       'executed by the daemon. Set BST_DAEMON=FALSE to bypass it.'
+
+argman = ArgsManagerV2.ArgsManager( desc )
+
+argman.addArgument( '-f', '--foreground', action='store_true',
+                    help='do not detach, run daemon in this process' )
+
+argman.addArgument( '-k', '--stop', action='store_true',
+                    help='stop the running daemon' )
+
+argman.addArgument( '-q', '--query', action='store_true',
+                    help='show if the daemon is running' )
+
+argman.addArgument( '-t', '--timeout', type=int, metavar='N',
+                    default=BSTDaemon.defaultIdleTimeout,
+                    help='exit after N seconds without request (default: %(default)s)' )
+
+argman.addExample( '%(prog)s' )
+argman.addExample( '%(prog)s -q' )
+argman.addExample( '%(prog)s -k' )
+
+args       = vars( argman.run() )
+
+foreground = args['foreground']
+query      = args['query']
+stop       = args['stop']
+timeout    = args['timeout']
+
+
+#----------------------------------------------------------------------------
+# Main program
+#----------------------------------------------------------------------------
+
+
+if timeout < 1:
+    argman.error( 'timeout must be a positive number' )
+
+if query:
+    status = BSTDaemon.getStatus()
+
+    if status:
+        print( 'BST daemon running (pid=%(pid)d, uptime=%(uptime)ds, '
+               'requests=%(requests)d)' % status )
+        sys.exit( 0 )
+    else:
+        print( 'BST daemon not running' )
+        sys.exit( 1 )
+
+elif stop:
+    if not BSTDaemon.stop():
+        logging.info( 'BST daemon not running' )
+
+elif foreground:
+    try:
+        BSTDaemon.serve( timeout )
+    except KeyboardInterrupt:
+        pass
+    except OSError as details:
+        logging.error( details )
+        sys.exit( -1 )
+
+else:
+    try:
+        BSTDaemon.start( timeout )
+    except OSError as details:
+        logging.error( details )
+        sys.exit( -1 )
+
+
+# EOF
@@ -98,7 +98,7 @@ argman.addArgument( '--flat', action='store_true', default=False,
 argman.addArgument( '-i', '--install', action='store_true',
                     help='install package into global SIT' )
 
-argman.addArgument( '-j', '--jobs', default=jobs, type=int,
+argman.addArgument( '-j', '--jobs', type=int,
                     help='run number of compile jobs in parallel (default: %d)' % jobs )
 
 argman.addArgument( '-k', '--codecheck', action='store_true',
@@ -169,7 +169,8 @@ deprecate_all = args['deprecate_all']
 documentation = args['doc']
 flatStyle     = args['flat']
 globalInstall = args['install']
-jobs          = args['jobs']
+explicitJobs  = args['jobs'] is not None
+jobs          = args['jobs'] if explicitJobs else jobs
 listEnv       = args['list']
 message       = args['message']
 platform      = args['platform']
@@ -313,7 +314,7 @@ try:
 
 
     bst.setBuildType( buildType )
-    bst.setParallelJobs( jobs )
+    bst.setParallelJobs( jobs, explicitJobs )
     bst.setTargetPlatform( platform )
 
 
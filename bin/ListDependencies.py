@@ -40,8 +40,9 @@
 #----------------------------------------------------------------------------
 
 
-from ToolBOSCore.Packages import ListDependencies, ProjectProperties
-from ToolBOSCore.Util     import ArgsManagerV2
+from ToolBOSCore.BuildSystem import BSTDaemon
+from ToolBOSCore.Packages    import ProjectProperties
+from ToolBOSCore.Util        import ArgsManagerV2
 
 
 #----------------------------------------------------------------------------
@@ -70,6 +71,12 @@ argman.addArgument( '-m', '--missing-only', action='store_true',
 argman.addArgument( '-r', '--reverse', action='store_true',
                     help='find out who is depending on package' )
 
+argman.addArgument( '--depth', type=int, metavar='N',
+                    help='max. depth of the tree (default: unlimited)' )
+
+argman.addArgument( '--format', choices=( 'tree', 'json', 'dot' ), default='tree',
+                    help='output format, "dot" for Graphviz (default: tree)' )
+
 argman.addArgument( 'package', help='absolute or canonical package path' )
 
 argman.addExample( '%(prog)s .' )
@@ -77,13 +84,16 @@ argman.addExample( '%(prog)s Libraries/MasterClock/1.6' )
 argman.addExample( '%(prog)s ${SIT}/Libraries/MasterClock/1.6' )
 argman.addExample( '%(prog)s -f /hri/sit/latest/Libraries/MasterClock/1.6' )
 argman.addExample( '%(prog)s -r sit://Libraries/MasterClock/1.6' )
+argman.addExample( '%(prog)s --format=dot Libraries/MasterClock/1.6 | dot -Tsvg > deps.svg' )
 
 args          = vars( argman.run() )
 
 asList        = args['list']
 canonicalPath = ProjectProperties.toCanonicalPath( args['package'] )
+depth         = args['depth']
 direct        = args['direct']
 full          = args['full']
+outputFormat  = args['format']
 missingOnly   = args['missing_only']
 reverse       = args['reverse']
 
@@ -99,8 +109,31 @@ if missingOnly:
 #----------------------------------------------------------------------------
 
 
-ListDependencies.listDependencies( canonicalPath, reverse, recursive,
-                                   missingOnly, asList, full )
+if depth is not None and depth < 1:
+    argman.error( 'depth must be a positive number' )
+
+# SIT packages can be queried from the BST daemon (if running),
+# which already has all pkgInfo.py files in memory
+
+if canonicalPath == '.':
+    served = False
+else:
+    served, _ = BSTDaemon.tryExecute( 'listDependencies',
+                                      canonicalPath=canonicalPath,
+                                      reverse=reverse,
+                                      recursive=recursive,
+                                      missingOnly=missingOnly,
+                                      asList=asList,
+                                      showDuplicates=full,
+                                      maxDepth=depth,
+                                      outputFormat=outputFormat )
+
+if not served:
+    from ToolBOSCore.Packages import ListDependencies
+
+    ListDependencies.listDependencies( canonicalPath, reverse, recursive,
+                                       missingOnly, asList, full,
+                                       depth, outputFormat )
 
 
 # EOF
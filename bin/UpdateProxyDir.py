@@ -43,9 +43,10 @@
 import logging
 import sys
 
-from ToolBOSCore.Settings import UserSetup
-from ToolBOSCore.Storage  import ProxyDir
-from ToolBOSCore.Util     import ArgsManagerV2, FastScript
+from ToolBOSCore.BuildSystem import BSTDaemon
+from ToolBOSCore.Settings    import UserSetup
+from ToolBOSCore.Storage     import ProxyDir
+from ToolBOSCore.Util        import ArgsManagerV2, FastScript
 
 
 #----------------------------------------------------------------------------
@@ -59,6 +60,9 @@ desc = 'Update your Software Installation Tree (SIT) sandbox and ' + \
 argman = ArgsManagerV2.ArgsManager( desc )
 
 
+argman.addArgument( '-a', '--all', action='store_true',
+                    help='ignore change journal, rescan entire SIT' )
+
 argman.addArgument( '-b', '--keep-broken', action='store_false', default=True,
                     help='do not remove broken symlinks' )
 
@@ -92,6 +96,8 @@ argman.addExample( '%(prog)s -r                          # ATTENTION!' )
 
 args                     = vars( argman.run() )
 
+fullResync               = args['all']
+
 checkProxyLinkTarget     = args['no_check']
 checkProxyLinkedVersion  = args['no_upgrade']
 cleanHomeDirectory       = args['skip']
@@ -122,15 +128,30 @@ if find:
 else:
 
     try:
-        UserSetup.silentUpgrade()
-        ProxyDir.updateProxyDir( removeBrokenSymlinks,
-                                 removeEmptyCategories,
-                                 linkNewPackagesIntoProxy,
-                                 checkProxyLinkTarget,
-                                 checkProxyLinkedVersion,
-                                 removeProxyInstallations,
-                                 cleanHomeDirectory,
-                                 dryRun )
+        # let the BST daemon (if running) do the job, so that it can
+        # keep its index of the SIT up-to-date
+        served, _ = BSTDaemon.tryExecute( 'updateProxyDir',
+                                          removeBrokenSymlinks=removeBrokenSymlinks,
+                                          removeEmptyCategories=removeEmptyCategories,
+                                          linkNewPackagesIntoProxy=linkNewPackagesIntoProxy,
+                                          checkProxyLinkTarget=checkProxyLinkTarget,
+                                          checkProxyLinkedVersion=checkProxyLinkedVersion,
+                                          removeProxyInstallations=removeProxyInstallations,
+                                          cleanHomeDirectory=cleanHomeDirectory,
+                                          dryRun=dryRun,
+                                          fullResync=fullResync )
+
+        if not served:
+            UserSetup.silentUpgrade()
+            ProxyDir.updateProxyDir( removeBrokenSymlinks,
+                                     removeEmptyCategories,
+                                     linkNewPackagesIntoProxy,
+                                     checkProxyLinkTarget,
+                                     checkProxyLinkedVersion,
+                                     removeProxyInstallations,
+                                     cleanHomeDirectory,
+                                     dryRun,
+                                     fullResync )
 
     except ( AssertionError, OSError, ValueError ) as details:
         # show stacktrace in verbose mode
@@ -35,17 +35,32 @@ then
 
 <%text>
     # source all dependencies
-    for i in "${SIT_DEPENDENCIES[@]}"
-    do
-        if [[ ! -z $VERBOSE ]]
-        then
+    #
+    # use pre-resolved environment of all dependencies if available and
+    # up-to-date, otherwise source each dependency recursively
 </%text>
-            echo "[${packageCategory}/${packageName}/${packageVersion}/BashSrc] Sourcing <%text>${SIT}/${i}</%text>/BashSrc"
+    if [[ -f "<%text>${SIT}</%text>/${packageCategory}/${packageName}/${packageVersion}/BashSrc.flat" ]]
+    then
+        source "<%text>${SIT}</%text>/${packageCategory}/${packageName}/${packageVersion}/BashSrc.flat"
+    fi
+
+    if [[ "<%text>${BASHSRC_FLAT_DONE}</%text>" != "${packageCategory}/${packageName}/${packageVersion}" ]]
+    then
+<%text>
+        for i in "${SIT_DEPENDENCIES[@]}"
+        do
+            if [[ ! -z $VERBOSE ]]
+            then
+</%text>
+                echo "[${packageCategory}/${packageName}/${packageVersion}/BashSrc] Sourcing <%text>${SIT}/${i}</%text>/BashSrc"
 <%text>
-        fi
+            fi
+
+            source "${SIT}/${i}/BashSrc"
+        done
+    fi
 
-        source "${SIT}/${i}/BashSrc"
-    done
+    unset BASHSRC_FLAT_DONE
 
 fi
 
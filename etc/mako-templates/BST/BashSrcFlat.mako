@@ -0,0 +1,78 @@
+# BashSrc.flat auto-generated by ToolBOSCore
+#
+# Pre-resolved environment of all dependencies of ${canonicalPath},
+# sourced by its BashSrc instead of sourcing each dependency recursively.
+#
+# The content is only applied if all listed BashSrc files are still the same
+# files (not reinstalled as another patchlevel) and none of them is newer
+# than this file, otherwise the BashSrc falls back to recursive sourcing.
+
+BASHSRC_FLAT_FRESH=1
+
+%for entry in entries:
+if [[ ! "<%text>${SIT}</%text>/${entry['package']}/BashSrc" -ef "${entry['realPath']}" ||
+      "<%text>${SIT}</%text>/${entry['package']}/BashSrc" -nt "<%text>${SIT}</%text>/${canonicalPath}/BashSrc.flat" ]]
+then
+    BASHSRC_FLAT_FRESH=0
+fi
+%endfor
+
+if [[ "<%text>${BASHSRC_FLAT_FRESH}</%text>" == 1 ]]
+then
+    unset BASHSRC_FLAT_FRESH
+%for entry in entries:
+
+    %if entry['inline']:
+    if [[ " <%text>${TOOLBOSCORE_SOURCED}</%text> " != *" ${entry['package']} "* ]]
+    then
+        %for line in entry['project']:
+        ${line}
+        %endfor
+        export TOOLBOSCORE_SOURCED="${entry['package']} <%text>${TOOLBOSCORE_SOURCED}</%text>"
+
+        %for line in entry['block']:
+    ${line}
+        %endfor
+    fi
+    %else:
+    source "<%text>${SIT}</%text>/${entry['package']}/BashSrc"
+    %endif
+%endfor
+<%text>
+
+    # remove duplicate entries from search paths (first occurrence wins)
+    for BASHSRC_FLAT_VAR in PATH LD_LIBRARY_PATH PYTHONPATH
+    do
+        if [[ -n "${!BASHSRC_FLAT_VAR+x}" ]]
+        then
+            BASHSRC_FLAT_OLD="${!BASHSRC_FLAT_VAR}:"
+            BASHSRC_FLAT_NEW=""
+
+            while [[ -n "${BASHSRC_FLAT_OLD}" ]]
+            do
+                BASHSRC_FLAT_ITEM="${BASHSRC_FLAT_OLD%%:*}"
+                BASHSRC_FLAT_OLD="${BASHSRC_FLAT_OLD#*:}"
+
+                if [[ -n "${BASHSRC_FLAT_ITEM}" &&
+                      ":${BASHSRC_FLAT_NEW}:" != *":${BASHSRC_FLAT_ITEM}:"* ]]
+                then
+                    BASHSRC_FLAT_NEW="${BASHSRC_FLAT_NEW:+${BASHSRC_FLAT_NEW}:}${BASHSRC_FLAT_ITEM}"
+                fi
+            done
+
+            export "${BASHSRC_FLAT_VAR}=${BASHSRC_FLAT_NEW}"
+        fi
+    done
+
+    unset BASHSRC_FLAT_VAR
+    unset BASHSRC_FLAT_OLD
+    unset BASHSRC_FLAT_NEW
+    unset BASHSRC_FLAT_ITEM
+</%text>
+    BASHSRC_FLAT_DONE="${canonicalPath}"
+fi
+
+unset BASHSRC_FLAT_FRESH
+
+
+# EOF
@@ -0,0 +1,719 @@
+# -*- coding: utf-8 -*-
+#
+#  Resident daemon serving dependency and proxy queries from a warm cache
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import builtins
+import io
+import json
+import logging
+import os
+import re
+import socket
+import sys
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# stop the daemon after this time (in seconds) without any request
+defaultIdleTimeout = 3600
+
+# max. time (in seconds) to wait for the daemon to come up / to connect
+connectTimeout     = 2.0
+
+# commands which may be served by the daemon, see _Daemon.cmd_*()
+commands           = ( 'ping', 'stop', 'listDependencies', 'updateProxyDir' )
+
+# per host, as the home directory might be shared via NFS
+_socketName        = 'BST-Daemon.%s.sock'
+_lockName          = 'BST-Daemon.%s.lock'
+_logName           = 'BST-Daemon.%s.log'
+
+# do not descend into versions of packages or parentTree links
+_stampExclude      = re.compile( r'(^parentTree$|^\d+\.\d+)' )
+
+# max. number of ToolBOS.conf instances (one per working directory)
+_maxConfs          = 64
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def getSocketPath():
+    """
+        Returns the path of the Unix socket the daemon of the current
+        user is listening on (on this host).
+    """
+    return _getPath( _socketName )
+
+
+def tryExecute( command, **kwargs ):
+    """
+        Runs 'command' within the BST daemon, if running, and replays its
+        console output while being produced. Exceptions raised in the
+        daemon are re-raised.
+
+        Returns a tuple ( served, result ) where 'served' is False if the
+        command could not be executed by the daemon (e.g. not running,
+        or disabled with BST_DAEMON=FALSE), in which case the caller
+        shall execute it locally.
+    """
+    FastScript.requireIsIn( command, commands )
+
+    if FastScript.getEnv( 'BST_DAEMON' ) == 'FALSE':
+        return False, None
+
+    request = { 'command'   : command,
+                'kwargs'    : kwargs,
+                'cwd'       : os.getcwd(),
+                'env'       : dict( os.environ ),
+                'debugLevel': FastScript.getDebugLevel(),
+                'root'      : _getPackageRoot() }
+
+    streams  = { 'stdout': sys.stdout, 'stderr': sys.stderr }
+    replayed = []
+
+    def replay( chunk ):
+        streams[ chunk[ 'stream' ] ].write( chunk[ 'data' ] )
+        replayed.append( True )
+
+    try:
+        response = _sendRequest( request, replay )
+    except ( OSError, ValueError ) as details:
+        if replayed:
+            # output was shown partially, do not execute again locally
+            raise OSError( 'BST daemon connection lost: %s' % details )
+
+        logging.debug( 'BST daemon not available: %s', details )
+        return False, None
+
+    if not response.get( 'served' ):
+        logging.debug( 'BST daemon refused request: %s', response.get( 'reason' ) )
+        return False, None
+
+    if response.get( 'exception' ):
+        raise _decodeException( response[ 'exception' ] )
+
+    return True, response.get( 'result' )
+
+
+def getStatus():
+    """
+        Returns a dict with information about the running daemon
+        (pid, uptime, number of requests,...), or None if not running.
+    """
+    try:
+        response = _sendRequest( { 'command': 'ping', 'root': _getPackageRoot() } )
+    except ( OSError, ValueError ):
+        return None
+
+    return response.get( 'result' )
+
+
+def start( idleTimeout=defaultIdleTimeout ):
+    """
+        Launches the daemon in background (if not already running)
+        and waits until it accepts requests.
+    """
+    import subprocess
+    import time
+
+    FastScript.requireIsIntNotZero( idleTimeout )
+
+    if getStatus():
+        logging.info( 'BST daemon already running' )
+        return
+
+    logFile = _getPath( _logName )
+    logDir  = os.path.dirname( logFile )
+    env     = dict( os.environ )
+    incDir  = os.path.dirname( _getPackageRoot() )
+    # fork once more so that the daemon gets detached from this process
+    code    = 'import os; os.fork() and os._exit( 0 ); ' \
+              'from ToolBOSCore.BuildSystem import BSTDaemon; ' \
+              'BSTDaemon.serve( %d )' % idleTimeout
+
+    env[ 'PYTHONPATH' ] = ':'.join( filter( None, ( incDir, env.get( 'PYTHONPATH' ) ) ) )
+
+    FastScript.mkdir( logDir )
+
+    with open( logFile, 'a' ) as f:
+        subprocess.run( [ sys.executable, '-c', code ], env=env,
+                        stdin=subprocess.DEVNULL, stdout=f, stderr=f,
+                        cwd='/', start_new_session=True, check=True )
+
+    deadline = time.monotonic() + connectTimeout * 5
+
+    while time.monotonic() < deadline:
+        if getStatus():
+            logging.info( 'BST daemon started' )
+            return
+
+        time.sleep( 0.05 )
+
+    raise OSError( 'BST daemon did not start, see %s' % logFile )
+
+
+def stop():
+    """
+        Asks the running daemon to terminate.
+        Returns False if it was not running.
+    """
+    try:
+        _sendRequest( { 'command': 'stop', 'root': _getPackageRoot() } )
+        return True
+    except ( OSError, ValueError ):
+        return False
+
+
+def serve( idleTimeout=defaultIdleTimeout ):
+    """
+        Runs the daemon in the current process until stopped, or until
+        no request was received for 'idleTimeout' seconds.
+
+        Raises an OSError if a daemon is already running.
+    """
+    import fcntl
+
+    FastScript.requireIsIntNotZero( idleTimeout )
+
+    socketPath = getSocketPath()
+
+    FastScript.mkdir( os.path.dirname( socketPath ) )
+
+    # held while running, so that concurrently started daemons do not
+    # remove each other's socket
+    lockFile = open( _getPath( _lockName ), 'a' )
+
+    try:
+        fcntl.flock( lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB )
+    except OSError:
+        lockFile.close()
+        raise OSError( 'BST daemon already running' )
+
+    try:
+        _serve( socketPath, idleTimeout )
+    finally:
+        lockFile.close()
+
+
+#----------------------------------------------------------------------------
+# Private classes and functions
+#----------------------------------------------------------------------------
+
+
+def _serve( socketPath, idleTimeout ):
+    import signal
+    import socketserver
+
+    daemon = _Daemon()
+
+    if os.path.exists( socketPath ):
+        if _isListening( socketPath ):
+            raise OSError( 'BST daemon already running' )
+
+        logging.debug( 'removing stale socket %s', socketPath )
+        os.remove( socketPath )
+
+
+    class _Handler( socketserver.StreamRequestHandler ):
+
+        def handle( self ):
+            def send( message ):
+                self.wfile.write( json.dumps( message ).encode() + b'\n' )
+
+            response = daemon.handle( self.rfile.readline(), send )
+
+            try:
+                send( response )
+            except OSError as details:
+                logging.debug( 'client disconnected: %s', details )
+
+
+    class _Server( socketserver.UnixStreamServer ):
+
+        def handle_timeout( self ):
+            logging.info( 'idle for %ds, exiting', idleTimeout )
+            daemon.running = False
+
+
+    oldUmask = os.umask( 0o077 )
+
+    try:
+        server = _Server( socketPath, _Handler )
+    finally:
+        os.umask( oldUmask )
+
+    def _onSignal( signum, frame ):
+        daemon.running = False
+
+    signal.signal( signal.SIGTERM, _onSignal )
+
+    server.timeout = idleTimeout
+    logging.info( 'BST daemon listening on %s (pid=%d)', socketPath, os.getpid() )
+
+    try:
+        while daemon.running:
+            server.handle_request()
+    finally:
+        server.server_close()
+
+        try:
+            os.remove( socketPath )
+        except FileNotFoundError:
+            pass
+
+    logging.info( 'BST daemon stopped' )
+
+
+class _SITIndex( object ):
+    """
+        In-memory MetaInfoCache of one SIT.
+
+        Upon refresh() the packages get listed again only if the mtime
+        of any (category) directory changed, and a PackageRecord is
+        only re-created if its pkgInfo.py changed.
+    """
+
+    def __init__( self, sitPath ):
+        from ToolBOSCore.Packages.MetaInfoCache import MetaInfoCache
+
+        FastScript.requireIsTextNonEmpty( sitPath )
+
+        self.sitPath         = sitPath
+        self.cache           = MetaInfoCache()
+        self._dirStamps      = None     # { path: mtime }
+        self._canonicalPaths = []
+        self._records        = {}       # { packageURL: PackageRecord }
+        self._recordStamps   = {}       # { packageURL: stamp of pkgInfo.py }
+
+        self.cache.setCache( self._records )
+
+
+    def refresh( self ):
+        from ToolBOSCore.Packages.MetaInfoCache import MetaInfoCache
+
+        if self._dirsChanged():
+            self._scan()
+
+        for canonicalPath in self._canonicalPaths:
+            packageURL = 'sit://' + canonicalPath
+            stamp      = _getStamp( os.path.join( self.sitPath, canonicalPath,
+                                                  'pkgInfo.py' ) )
+
+            if packageURL in self._records and \
+               self._recordStamps.get( packageURL ) == stamp:
+                continue
+
+            FastScript.countEvent( 'pkgInfoParsed' )
+
+            try:
+                self._records[ packageURL ] = \
+                    MetaInfoCache.createRecord( self.sitPath, canonicalPath )
+            except ( AssertionError, OSError, SyntaxError ) as details:
+                # treated as not installed, the client will then open
+                # the package from disk and get the same error
+                logging.debug( '%s: %s', canonicalPath, details )
+                self._records.pop( packageURL, None )
+
+            self._recordStamps[ packageURL ] = stamp
+
+
+    def _dirsChanged( self ):
+        if self._dirStamps is None:
+            return True
+
+        for path, mtime in self._dirStamps.items():
+            if _getMTime( path ) != mtime:
+                logging.debug( '%s: directory changed', path )
+                return True
+
+        return False
+
+
+    def _scan( self ):
+        from ToolBOSCore.Packages.ProjectProperties import isCanonicalPath
+        from ToolBOSCore.Storage                    import SIT
+
+        logging.debug( 'indexing %s', self.sitPath )
+
+        dirs = [ self.sitPath ]
+        dirs.extend( FastScript.getDirsInDirRecursive( self.sitPath,
+                                                       _stampExclude ) )
+
+        # take the stamps first, so that changes while listing the
+        # packages get noticed next time
+
+        self._dirStamps = { path: _getMTime( path ) for path in dirs }
+
+        # like SIT.getCanonicalPaths() but without logging to the client
+        projects = SIT.getProjects( self.sitPath, keepPath=False,
+                                    onError=FastScript.printPermissionDenied )
+
+        self._canonicalPaths = sorted( filter( isCanonicalPath, projects ) )
+
+        known = { 'sit://' + canonicalPath for canonicalPath in self._canonicalPaths }
+
+        for packageURL in list( self._records ):
+            if packageURL not in known:
+                del self._records[ packageURL ]
+                del self._recordStamps[ packageURL ]
+
+
+class _Daemon( object ):
+    """
+        Executes the requests within the daemon process, each one with
+        the environment and working directory of the client.
+    """
+
+    def __init__( self ):
+        import time
+
+        self.running      = True
+        self._indexes     = {}              # { sitPath: _SITIndex }
+        self._confs       = {}              # { key: ( ToolBOSConf, stamp ) }
+        self._dpkgStamp   = None
+        self._numRequests = 0
+        self._startTime   = time.time()
+
+
+    def handle( self, line, send ):
+        """
+            Executes the request, sending the console output via 'send()'
+            while being produced. Returns the final response.
+        """
+        try:
+            request = json.loads( line )
+            command = request[ 'command' ]
+        except ( ValueError, KeyError, TypeError ):
+            return { 'served': False, 'reason': 'malformed request' }
+
+        if request.get( 'root' ) != _getPackageRoot():
+            return { 'served': False,
+                     'reason': 'daemon uses %s' % _getPackageRoot() }
+
+        if command not in commands:
+            return { 'served': False, 'reason': 'unknown command: %s' % command }
+
+        self._numRequests += 1
+
+        if command == 'ping':
+            return { 'served': True, 'result': self.cmd_ping() }
+
+        if command == 'stop':
+            self.running = False
+            return { 'served': True }
+
+        return self._execute( getattr( self, 'cmd_' + command ), request, send )
+
+
+    def cmd_ping( self ):
+        import time
+
+        return { 'pid'     : os.getpid(),
+                 'uptime'  : int( time.time() - self._startTime ),
+                 'requests': self._numRequests,
+                 'indexes' : sorted( self._indexes ) }
+
+
+    def cmd_listDependencies( self, **kwargs ):
+        from ToolBOSCore.Packages import ListDependencies
+
+        ListDependencies.listDependencies( **kwargs )
+
+
+    def cmd_updateProxyDir( self, **kwargs ):
+        from ToolBOSCore.Settings import UserSetup
+        from ToolBOSCore.Storage  import ProxyDir
+
+        UserSetup.silentUpgrade()
+        ProxyDir.updateProxyDir( **kwargs )
+
+
+    def _execute( self, func, request, send ):
+        import contextlib
+
+        oldEnv   = dict( os.environ )
+        oldCwd   = os.getcwd()
+        oldLevel = logging.getLogger().level
+        oldLog   = FastScript.consoleHandler.stream
+        stdout   = _ChunkWriter( 'stdout', send )
+        stderr   = _ChunkWriter( 'stderr', send )
+        response = { 'served': True }
+
+        try:
+            os.environ.clear()
+            os.environ.update( request[ 'env' ] )
+            os.chdir( request[ 'cwd' ] )
+
+            FastScript.setDebugLevel( request[ 'debugLevel' ] )
+            FastScript.consoleHandler.setStream( stderr )
+
+            with contextlib.redirect_stdout( stdout ):
+                self._prepare()
+                response[ 'result' ] = func( **request[ 'kwargs' ] )
+
+            stdout.flush()
+            stderr.flush()
+
+        except ( Exception, SystemExit ) as details:
+            response[ 'exception' ] = _encodeException( details )
+
+        finally:
+            FastScript.consoleHandler.setStream( oldLog )
+            logging.getLogger().setLevel( oldLevel )
+
+            os.environ.clear()
+            os.environ.update( oldEnv )
+            os.chdir( oldCwd )
+
+        return response
+
+
+    def _prepare( self ):
+        """
+            Updates the module-level caches for the current request,
+            so that they match the client's environment.
+        """
+        from ToolBOSCore.Packages  import BSTPackage, ProjectProperties
+        from ToolBOSCore.Platforms import Debian
+        from ToolBOSCore.Settings  import ToolBOSConf
+        from ToolBOSCore.Storage   import SIT
+
+        ToolBOSConf._cache = self._getToolBOSConf()
+
+        ProjectProperties._sitPkgCache = None
+
+        dpkgStamp = _getMTime( '/var/lib/dpkg/status' )
+
+        if dpkgStamp != self._dpkgStamp:
+            Debian._debPkgCache = None
+            self._dpkgStamp     = dpkgStamp
+
+        sitPath = SIT.getPath()
+
+        if os.path.isdir( sitPath ):
+            try:
+                index = self._indexes[ sitPath ]
+            except KeyError:
+                index = _SITIndex( sitPath )
+                self._indexes[ sitPath ] = index
+
+            index.refresh()
+            metaInfoCache = index.cache
+        else:
+            # let the command fail the same way as if executed locally
+            metaInfoCache = None
+
+        BSTPackage.BSTInstalledPackage._metaInfoCache   = metaInfoCache
+        BSTPackage.BSTInstalledPackage._sitPath         = sitPath
+        BSTPackage.BSTProxyInstalledPackage._sitPath    = sitPath
+        BSTPackage.BSTGloballyInstalledPackage._sitPath = SIT.getRootPath()
+
+
+    def _getToolBOSConf( self ):
+        """
+            Returns the ToolBOSConf for the current working directory,
+            re-read if any of its configfiles has changed.
+        """
+        from ToolBOSCore.Settings import ToolBOSConf
+
+        key = ( os.getcwd(), os.path.expanduser( '~' ),
+                FastScript.getEnv( 'TOOLBOSCONF_PATH' ) )
+
+        try:
+            conf, stamp = self._confs[ key ]
+
+            if conf._getSnapshotKey( conf._getEvalOrder() ) == stamp:
+                FastScript.countCacheAccess( 'bstDaemonConf', True )
+                return conf
+
+        except KeyError:
+            pass
+
+        FastScript.countCacheAccess( 'bstDaemonConf', False )
+
+        if len( self._confs ) >= _maxConfs:
+            self._confs.clear()
+
+        conf  = ToolBOSConf.ToolBOSConf()
+        stamp = conf._getSnapshotKey( conf._getEvalOrder() )
+
+        self._confs[ key ] = ( conf, stamp )
+
+        return conf
+
+
+class _ChunkWriter( io.TextIOBase ):
+    """
+        Stream which sends the lines written to the client, tagged with
+        the stream name, e.g. { 'stream': 'stdout', 'data': '...' }.
+    """
+
+    def __init__( self, name, send ):
+        super( _ChunkWriter, self ).__init__()
+
+        self._name   = name
+        self._send   = send
+        self._buffer = ''
+
+
+    def writable( self ):
+        return True
+
+
+    def write( self, text ):
+        self._buffer += text
+
+        # send complete lines only, unless flushed (e.g. by the logging)
+        end = self._buffer.rfind( '\n' ) + 1
+
+        if end:
+            self._send( { 'stream': self._name, 'data': self._buffer[ :end ] } )
+            self._buffer = self._buffer[ end: ]
+
+        return len( text )
+
+
+    def flush( self ):
+        if self._buffer:
+            self._send( { 'stream': self._name, 'data': self._buffer } )
+            self._buffer = ''
+
+
+def _sendRequest( request, onChunk=None ):
+    """
+        Sends the request to the daemon and returns its final response.
+        Output chunks received before are passed to 'onChunk()'.
+
+        Raises OSError if the daemon is not running.
+    """
+    sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+
+    try:
+        sock.settimeout( connectTimeout )
+        sock.connect( getSocketPath() )
+        sock.settimeout( None )               # commands may take a while
+
+        sock.sendall( json.dumps( request ).encode() + b'\n' )
+
+        with sock.makefile( 'rb' ) as f:
+            for line in f:
+                message = json.loads( line )
+
+                if 'stream' not in message:
+                    return message
+
+                if onChunk:
+                    onChunk( message )
+
+    finally:
+        sock.close()
+
+    raise OSError( 'BST daemon closed connection' )
+
+
+def _isListening( socketPath ):
+    """
+        Returns a boolean whether a daemon accepts connections on the
+        given socket.
+    """
+    sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+
+    try:
+        sock.settimeout( connectTimeout )
+        sock.connect( socketPath )
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _encodeException( exception ):
+    if isinstance( exception, SystemExit ):
+        args = [ exception.code ]
+    else:
+        args = [ arg if isinstance( arg, ( str, int, float, bool, type( None ) ) )
+                 else str( arg ) for arg in exception.args ]
+
+    return { 'type': type( exception ).__name__, 'args': args }
+
+
+def _decodeException( data ):
+    """
+        Re-creates builtin exceptions, others are reported as RuntimeError.
+    """
+    excType = getattr( builtins, data[ 'type' ], None )
+
+    if isinstance( excType, type ) and issubclass( excType, BaseException ):
+        return excType( *data[ 'args' ] )
+
+    return RuntimeError( '%s: %s' % ( data[ 'type' ], ', '.join( map( str, data[ 'args' ] ) ) ) )
+
+
+def _getPath( name ):
+    return os.path.join( os.path.expanduser( '~' ), '.HRI', 'ToolBOS',
+                         name % socket.gethostname() )
+
+
+def _getPackageRoot():
+    import ToolBOSCore
+
+    return os.path.dirname( os.path.abspath( ToolBOSCore.__file__ ) )
+
+
+def _getMTime( path ):
+    try:
+        return os.stat( path ).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _getStamp( path ):
+    try:
+        st = os.stat( path )
+        return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+# EOF
@@ -34,8 +34,8 @@
 #
 
 
+import concurrent.futures
 import copy
-import glob
 import io
 import logging
 import os
@@ -85,6 +85,10 @@ class BuildSystemTools( object ):
         except ( KeyError, TypeError, ValueError ):
             self._parallelJobs = 1
 
+        # BST_BUILD_JOBS is set by default (see BashSrc), hence only
+        # affects the compilation, see setParallelJobs()
+        self._explicitJobs   = False
+
 
     def configure( self ):
         """
@@ -175,7 +179,8 @@ class BuildSystemTools( object ):
         try:
             dstSIT = SIT.getPath()
 
-            dc = DocumentationCreator( self._sourceTree, dstSIT, output, output )
+            dc = DocumentationCreator( self._sourceTree, dstSIT, output, output,
+                                       numThreads=self._getExplicitJobs() )
             dc.generate()
 
         except AssertionError as e:
@@ -237,14 +242,14 @@ class BuildSystemTools( object ):
 
     def runUnittest( self ):
         """
-            There is no default Python-implementation for unittest.
+            Executes unittest.sh (or the "unittest" script specified in
+            pkgInfo.py) if present.
 
-            Hence we only search for and execute shellscripts
-            such as unittest.sh.
+            Otherwise all Python unittests (test/**/Test*.py) are executed
+            in parallel, see UnittestRunner.runTests(). The results are
+            written as JUnit XML into <buildDir>/unittest.
         """
-        dummy = lambda: True
-
-        return self._execTask( 'unittest', dummy )
+        return self._execTask( 'unittest', self._runPythonUnittests )
 
 
     def setStdOut( self, stdout ):
@@ -268,9 +273,19 @@ class BuildSystemTools( object ):
         self._detectModulePath()
 
 
-    def setParallelJobs( self, number ):
+    def setParallelJobs( self, number, explicit=True ):
+        """
+            Sets the number of compile jobs.
+
+            If 'explicit' is True (i.e. specified by the user), it also
+            limits the number of unittests and the threads for
+            documentation creation, which otherwise use all CPUs.
+        """
         FastScript.requireIsIntNotZero( number )
+        FastScript.requireIsBool( explicit )
+
         self._parallelJobs = number
+        self._explicitJobs = explicit
         self._detectBuildCommand()
 
         # set env.var. so that child programs (incl. custom compile.sh
@@ -557,19 +572,16 @@ class BuildSystemTools( object ):
     def _distclean_inTree( self ):
         requireTopLevelDir( os.getcwd() )
 
-        subDirList = FastScript.getDirsInDirRecursive()
-        subDirList.append( '.' )
-
         # do not cache those variables as their change would not be reflected
         # in such case (interactive sessions will continue to use the value
         # as it was at module loading time)
         verbose = True if os.getenv( 'VERBOSE' ) == 'TRUE' else False
         dryRun  = True if os.getenv( 'DRY_RUN' ) == 'TRUE' else False
 
-        patternList = _getDistcleanPatterns()
+        matcher = _compileDistcleanPatterns( _getDistcleanPatterns() )
+        plan    = _getDistcleanPlan( '.', matcher )
 
-        for subDir in subDirList:
-            _cleanDir( subDir, patternList, verbose, dryRun )
+        _removeList( plan, verbose, dryRun )
 
 
         # specifically check for empty directories
@@ -578,11 +590,28 @@ class BuildSystemTools( object ):
                 content = os.listdir( candidate )
 
                 if not content:                      # is empty dir.
-                    FastScript.remove( candidate )
+                    FastScript.remove( candidate, dryRun=dryRun )
 
         return True
 
 
+    def _runPythonUnittests( self ):
+        from ToolBOSCore.BuildSystem import UnittestRunner
+
+        resultDir = os.path.join( self._buildDir, 'unittest' )
+
+        return UnittestRunner.runTests( self._sourceTree, resultDir,
+                                        self._getExplicitJobs() )
+
+
+    def _getExplicitJobs( self ):
+        """
+            Returns the number of parallel jobs if specified by the user
+            (BST.py -j), or None to use all CPUs.
+        """
+        return self._parallelJobs if self._explicitJobs else None
+
+
     def _runScript( self, name, filePath=None ):
         FastScript.requireIsTextNonEmpty( name )
 
@@ -714,7 +743,7 @@ def getDefaultDistcleanPatterns():
                   '*_pylint.log',
 
                   # install procedure files
-                  'install/??shSrc', 'bin/??shSrc',
+                  'install/??shSrc', 'install/BashSrc.flat', 'bin/??shSrc',
                   'examples/??shSrc', 'test/??shSrc',
                   'doc/autoDoxyfile', 'doc/doxygen*', 'doc/*.tag',
                   'doc/html',
@@ -737,6 +766,7 @@ def setEnv():
     """
     try:
         p = PackageDetector()
+        p.detectCategory()
     except AssertionError:
         # XIF packages are generated on-the-fly during configure-phase.
         # We don't consider such packages for now (experimental code).
@@ -849,35 +879,126 @@ def _getDistcleanPatterns():
     return resultList
 
 
-## ALERT! Mind to specify correctly as tuple with the comma, otherwise
-##        it is a tuple of characters ;-) leading to that "." gets
-##        entirely deleted!
-##
-#  Example:
-##
-## _removeList( ( 'pkgInfo.py', ), verbose, dryRun )
+def _compileDistcleanPatterns( patternList ):
+    """
+        Compiles the given glob-style distclean patterns into a single
+        regular expression, to be matched against paths relative to the
+        top-level directory.
+
+        Like previously when applying glob.glob() in each subdirectory,
+        a pattern matches at any depth (f.i. 'qt/*.h' matches
+        'src/qt/foo.h'), wildcards do not cross path separators and
+        do not match hidden files unless the pattern starts with a dot.
+    """
+    FastScript.requireIsIterable( patternList )
+
+    alternatives = []
+
+    for pattern in patternList:
+        components = []
+
+        for component in pattern.strip( '/' ).split( '/' ):
+            regexp = _translateGlob( component )
+
+            if not component.startswith( '.' ):
+                regexp = r'(?!\.)' + regexp
+
+            components.append( regexp )
+
+        alternatives.append( '/'.join( components ) )
+
+    return re.compile( r'(?:^|/)(?:%s)$' % '|'.join( alternatives ) )
+
+
+def _translateGlob( component ):
+    """
+        Translates a single path component with glob wildcards into a
+        regular expression where '*' and '?' never match a '/'.
+    """
+    i      = 0
+    n      = len( component )
+    result = ''
+
+    while i < n:
+        c  = component[i]
+        i += 1
+
+        if c == '*':
+            result += '[^/]*'
+
+        elif c == '?':
+            result += '[^/]'
+
+        elif c == '[':
+            j = component.find( ']', i + 1 if component[i:i+1] == '!' else i )
+
+            if j == -1:
+                result += re.escape( c )
+            else:
+                content = component[i:j].replace( '\\', '\\\\' )
+                i       = j + 1
+
+                if content.startswith( '!' ):
+                    content = '^' + content[1:]
+
+                result += '[%s]' % content
 
-def _removeList( pathList, verbose, dryRun ):
-    # pathList was just detected via glob.glob(), avoid additional check
-    # if file exists (for speed-up reasons, but also this check would fail
-    # in case of broken links)
-    for path in pathList:
-        if dryRun:
-            logging.info( '-- DRY RUN --   not really deleting %s', path )
         else:
-            FastScript.remove( path )
+            result += re.escape( c )
 
+    return result
 
-def _cleanDir( path, patternList, verbose, dryRun ):
-    FastScript.requireIsText( path )
-    FastScript.requireIsIterable( patternList )
 
-    for pattern in patternList:
-        patternFullPath = os.path.join( path, pattern )
-        matchingList    = glob.glob( patternFullPath )
+def _getDistcleanPlan( topLevelDir, matcher ):
+    """
+        Walks <topLevelDir> only once and returns the list of all files
+        and directories matching the compiled distclean patterns.
+
+        Matching directories are not descended into as they get deleted
+        as a whole anyway. Symlinks to directories are not followed.
+    """
+    FastScript.requireIsTextNonEmpty( topLevelDir )
+
+    result = []
+    stack  = [ '' ]
+
+    while stack:
+        relDir = stack.pop()
+
+        try:
+            it = os.scandir( os.path.join( topLevelDir, relDir ) )
+        except OSError as details:
+            logging.debug( details )
+            continue
+
+        with it:
+            for entry in it:
+                relPath = os.path.join( relDir, entry.name )
+
+                if matcher.search( relPath ):
+                    result.append( os.path.join( topLevelDir, relPath ) )
+
+                elif entry.is_dir( follow_symlinks=False ):
+                    stack.append( relPath )
+
+    result.sort()
+
+    return result
+
+
+def _removeList( pathList, verbose, dryRun ):
+    # pathList was just detected by walking the tree, avoid additional check
+    # if file exists (for speed-up reasons, but also this check would fail
+    # in case of broken links)
+    if dryRun:
+        for path in pathList:
+            logging.info( '-- DRY RUN --   not really deleting %s', path )
+        return
 
-        if matchingList:
-            _removeList( matchingList, verbose, dryRun )
+    with concurrent.futures.ThreadPoolExecutor() as tp:
+        for future in [ tp.submit( FastScript.remove, path )
+                        for path in pathList ]:
+            future.result()
 
 
 # EOF
@@ -36,13 +36,47 @@
 
 import logging
 import os
+import re
 
 from ToolBOSCore.Packages.PackageDetector import PackageDetector
+from ToolBOSCore.Platforms                import Platforms
 from ToolBOSCore.Settings                 import ProcessEnv
 from ToolBOSCore.Storage                  import SIT
 from ToolBOSCore.Util                     import FastScript
 
 
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# fingerprint of all inputs of the last successful doxygen run,
+# matched by the 'doc/doxygen*' pattern of "BST.py --distclean"
+fingerprintFile  = 'doxygen.fingerprint'
+
+# directories not considered as doxygen input, anywhere resp. at top-level,
+# in addition build output such as lib/<platform> or bin/<platform>
+_skipDirs        = ( '.git', '.svn', '__pycache__' )
+_skipTopDirs     = _skipDirs + ( 'build', 'sources', 'precompiled', 'install' )
+
+# doxygen output and Doxyfiles (hashed by content) within the doc/ directory
+_docOutput       = ( 'html', 'latex', 'man', 'rtf', 'xml', 'Doxyfile',
+                     'autoDoxyfile', 'userDoxyfile', 'doxygen.tag',
+                     fingerprintFile )
+
+# thread settings do not affect the output, hence not part of the fingerprint
+_threadSettings  = re.compile( r'^(NUM_PROC_THREADS|DOT_NUM_THREADS)\s*=.*$\n?',
+                               re.MULTILINE )
+
+# { doxygen binary: version string }
+_doxygenVersions = {}
+
+
+#----------------------------------------------------------------------------
+# Public classes and functions
+#----------------------------------------------------------------------------
+
+
 class DocumentationCreator( object ):
     """
         API to create HTML documentation for a package.
@@ -51,10 +85,13 @@ class DocumentationCreator( object ):
         instances.
 
         'details' should be a PackageDetector instance to use.
+
+        'numThreads' limits the number of threads used by the
+        documentation tool (default: number of CPUs).
     """
 
     def __init__( self, projectRoot, sitPath=None, stdout=None,
-                  stderr=None, details=None ):
+                  stderr=None, details=None, numThreads=None ):
 
         FastScript.requireIsDir( projectRoot )
 
@@ -84,7 +121,7 @@ class DocumentationCreator( object ):
         else:
             handler = DoxygenBackend
 
-        self.backend = handler( details, sitPath, stdout, stderr )
+        self.backend = handler( details, sitPath, stdout, stderr, numThreads )
 
 
     def generate( self ):
@@ -98,6 +135,9 @@ class DocumentationCreator( object ):
 
             It internally follows the Strategy Design Pattern to select the
             appropriate documentation tool depending on the package type.
+
+            The documentation tool is not executed again if none of its
+            inputs changed since the last run.
         """
         self.backend.setup()
         self.backend.execute()
@@ -106,14 +146,19 @@ class DocumentationCreator( object ):
 
 class AbstractBackend( object ):
 
-    def __init__( self, details, sitPath, stdout=None, stderr=None ):
+    def __init__( self, details, sitPath, stdout=None, stderr=None,
+                  numThreads=None ):
         FastScript.requireIsInstance( details, PackageDetector)
 
-        self.details = details
-        self.sitPath = sitPath
-        self.docDir  = os.path.join( self.details.topLevelDir, 'doc' )
-        self.stdout  = stdout
-        self.stderr  = stderr
+        if numThreads is not None:
+            FastScript.requireIsIntNotZero( numThreads )
+
+        self.details    = details
+        self.sitPath    = sitPath
+        self.docDir     = os.path.join( self.details.topLevelDir, 'doc' )
+        self.stdout     = stdout
+        self.stderr     = stderr
+        self.numThreads = numThreads or os.cpu_count() or 1
 
         FastScript.requireIsDir( self.details.topLevelDir )
 
@@ -148,8 +193,10 @@ class DoxygenBackend( AbstractBackend ):
         Creates package documentations using 'doxygen'.
     """
 
-    def __init__( self, details, sitPath, stdout=None, stderr=None ):
-        super( DoxygenBackend, self ).__init__( details, sitPath, stdout, stderr )
+    def __init__( self, details, sitPath, stdout=None, stderr=None,
+                  numThreads=None ):
+        super( DoxygenBackend, self ).__init__( details, sitPath, stdout, stderr,
+                                                numThreads )
 
         if not os.path.isdir( self.docDir ):
             FastScript.mkdir( self.docDir )
@@ -161,6 +208,8 @@ class DoxygenBackend( AbstractBackend ):
         self.mainDoxyfile = os.path.join( self.docDir, 'Doxyfile' )
         self.autoDoxyfile = os.path.join( self.docDir, 'autoDoxyfile' )
         self.userDoxyfile = os.path.join( self.docDir, 'userDoxyfile' )
+        self.fingerprint  = os.path.join( self.docDir, fingerprintFile )
+        self.depTagFiles  = []
 
 
     def setup( self ):
@@ -173,8 +222,18 @@ class DoxygenBackend( AbstractBackend ):
 
 
     def execute( self ):
-        logging.info( 'running doxygen...' )
         doxygenBinary = self._findDoxygen()
+        fingerprint   = self.getFingerprint()
+
+        if self._isUpToDate( fingerprint ):
+            logging.info( 'documentation up-to-date, skipping doxygen' )
+            return
+
+        logging.info( 'running doxygen...' )
+
+        # invalidate first, so that an aborted run is not considered
+        # up-to-date next time
+        FastScript.remove( self.fingerprint )
 
         try:
             FastScript.execProgram( doxygenBinary,
@@ -183,6 +242,58 @@ class DoxygenBackend( AbstractBackend ):
                                     workingDir=self.docDir )
         except OSError:
             logging.error( 'unable to execute doxygen (maybe not in $PATH)?' )
+            return
+
+        FastScript.setFileContent( self.fingerprint, fingerprint + '\n' )
+
+
+    def getFingerprint( self ):
+        """
+            Returns a hash of all inputs of doxygen, i.e. the doxygen
+            version, the Doxyfiles in effect, the tagfiles of the
+            dependencies, and name, size and modification time of the
+            files within the package (except build output).
+
+            Must be called after setup().
+        """
+        import hashlib
+
+        sha = hashlib.sha1()
+
+        def update( *items ):
+            sha.update( repr( items ).encode( 'utf-8', 'surrogateescape' ) )
+
+        update( _getDoxygenVersion( ProcessEnv.which( 'doxygen' ) ) )
+
+        for filePath in ( self.mainDoxyfile, self.autoDoxyfile, self.userDoxyfile ):
+            content = FastScript.getFileContent( filePath ) or ''
+            update( filePath, _threadSettings.sub( '', content ) )
+
+        for filePath in self.depTagFiles:
+            update( filePath, _getStat( filePath ) )
+
+        topLevelDir  = self.details.topLevelDir
+        platformDirs = set( Platforms.getPlatformNames() )
+
+        for dirPath, dirNames, fileNames in os.walk( topLevelDir ):
+            if dirPath == self.docDir:
+                dirNames[:]  = [ name for name in dirNames  if name not in _docOutput ]
+                fileNames[:] = [ name for name in fileNames if name not in _docOutput ]
+
+            elif dirPath == topLevelDir:
+                dirNames[:]  = [ name for name in dirNames  if name not in _skipTopDirs ]
+
+            else:
+                dirNames[:]  = [ name for name in dirNames  if name not in _skipDirs and
+                                                               name not in platformDirs ]
+
+            dirNames.sort()
+
+            for fileName in sorted( fileNames ):
+                filePath = os.path.join( dirPath, fileName )
+                update( os.path.relpath( filePath, topLevelDir ), _getStat( filePath ) )
+
+        return sha.hexdigest()
 
 
     def cleanup( self ):
@@ -216,7 +327,13 @@ class DoxygenBackend( AbstractBackend ):
 
 
     def _createAutoDoxyfile( self ):
-        content = 'TAGFILES = '
+        # passed via Doxyfile rather than environment which is shared by
+        # concurrent builds, see generateAll()
+        content = 'PROJECT_NAME = "%s %s"\n' % ( self.details.packageName,
+                                                 self.details.packageVersion )
+        content += 'TAGFILES = '
+
+        self.depTagFiles = []
 
         logging.debug( 'cross-linking doxygen documentation into %s', self.sitPath )
 
@@ -242,15 +359,40 @@ class DoxygenBackend( AbstractBackend ):
 
             if depTagFileExists and depHTMLDirExists:
                 content += '%s=%s ' % ( depTagFile, depHTMLDir )
+                self.depTagFiles.append( depTagFile )
                 logging.debug( '  linking %s', depTagFile )
             else:
                 logging.debug( '  not linking' )
 
             logging.debug( '' )
 
+        content += '\n'
+
+        # NUM_PROC_THREADS is not known to doxygen < 1.9 (warning)
+        version = _getDoxygenVersion( ProcessEnv.which( 'doxygen' ) )
+
+        if _parseVersion( version ) >= ( 1, 9 ):
+            content += 'NUM_PROC_THREADS = %d\n' % self.numThreads
+
+        content += 'DOT_NUM_THREADS = %d\n' % self.numThreads
+
         FastScript.setFileContent( self.autoDoxyfile, content )
 
 
+    def _isUpToDate( self, fingerprint ):
+        if FastScript.getEnv( 'BST_DOC_FORCE' ) == 'TRUE':
+            return False
+
+        for name in ( 'html', 'doxygen.tag' ):
+            if not os.path.exists( os.path.join( self.docDir, name ) ):
+                return False
+
+        try:
+            return FastScript.getFileContent( self.fingerprint ).strip() == fingerprint
+        except OSError:
+            return False
+
+
     def _findDoxygen( self ):
         found = ProcessEnv.which( 'doxygen' )
 
@@ -261,4 +403,104 @@ class DoxygenBackend( AbstractBackend ):
             raise EnvironmentError( '"doxygen" not installed' )
 
 
+def generateAll( projectRoots, sitPath=None, maxWorkers=None ):
+    """
+        Creates the documentation of multiple packages, up to
+        'maxWorkers' of them in parallel (default: number of CPUs).
+        The CPUs are shared among the packages being processed.
+
+        The output of each package gets captured and only shown in case
+        of errors.
+
+        Returns a dict { projectRoot: success }.
+    """
+    import concurrent.futures
+    import io
+    import subprocess
+
+    FastScript.requireIsList( projectRoots )
+
+    if not projectRoots:
+        return {}
+
+    numCPUs    = os.cpu_count() or 1
+    maxWorkers = min( maxWorkers or numCPUs, len( projectRoots ) )
+    numThreads = max( 1, numCPUs // maxWorkers )
+
+    def generate( projectRoot ):
+        output = io.StringIO()
+
+        try:
+            DocumentationCreator( projectRoot, sitPath, output, output,
+                                  numThreads=numThreads ).generate()
+            return True
+
+        except ( AssertionError, EnvironmentError, ValueError,
+                 subprocess.CalledProcessError ) as e:
+            logging.info( output.getvalue() )
+            logging.error( '%s: failed to create documentation: %s', projectRoot, e )
+            return False
+
+    logging.debug( 'creating documentation of %d packages (%d parallel jobs)',
+                   len( projectRoots ), maxWorkers )
+
+    with concurrent.futures.ThreadPoolExecutor( maxWorkers ) as tp:
+        results = tp.map( generate, projectRoots )
+
+        return dict( zip( projectRoots, results ) )
+
+
+#----------------------------------------------------------------------------
+# Private functions
+#----------------------------------------------------------------------------
+
+
+def _getDoxygenVersion( doxygenBinary ):
+    """
+        Returns the output of "doxygen --version", or an empty string
+        if not available. The result is cached per binary.
+    """
+    import io
+    import subprocess
+
+    if not doxygenBinary:
+        return ''
+
+    try:
+        return _doxygenVersions[ doxygenBinary ]
+    except KeyError:
+        pass
+
+    output = io.StringIO()
+
+    try:
+        FastScript.execProgram( '"%s" --version' % doxygenBinary,
+                                stdout=output, stderr=output )
+        version = output.getvalue().strip()
+    except ( OSError, subprocess.CalledProcessError ):
+        version = ''
+
+    _doxygenVersions[ doxygenBinary ] = version
+
+    return version
+
+
+def _parseVersion( version ):
+    """
+        Returns the leading numbers of a version string as tuple,
+        e.g. "1.9.1 (ef9b20a...)" --> ( 1, 9, 1 )
+    """
+    match = re.match( r'\d+(\.\d+)*', version )
+
+    return tuple( map( int, match.group( 0 ).split( '.' ) ) ) if match else ()
+
+
+def _getStat( filePath ):
+    try:
+        stat = os.stat( filePath )
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
+
 # EOF
@@ -47,6 +47,7 @@ from ToolBOSCore.Packages                 import PackageCreator
 from ToolBOSCore.Packages.PackageDetector import PackageDetector
 from ToolBOSCore.Platforms                import Platforms
 from ToolBOSCore.Settings                 import ToolBOSConf
+from ToolBOSCore.Storage                  import SITJournal
 from ToolBOSCore.Util                     import FastScript
 
 
@@ -760,6 +761,7 @@ class InstallProcedure( object ):
             Collect basic files used by the ToolBOS SDK itself.
         """
         self.copyMandatory( 'install/BashSrc',          'BashSrc'    )
+        self.copyOptional(  'install/BashSrc.flat',     'BashSrc.flat' )
         self.copyMandatory( 'install/packageVar.cmake', 'packageVar.cmake' )
         self.copyMandatory( 'install/pkgInfo.py',       'pkgInfo.py' )
 
@@ -922,20 +924,18 @@ class InstallProcedure( object ):
 
         logging.info( 'skipping excluded files:' )
 
-        toSkip = set()
+        excluded = tuple( excluded )
+        toSkip   = set()
 
         for pair in self.index:
-            FastScript.requireIsTuple( pair )
-
             src = pair[0]
 
-            for candidate in excluded:
-                if src.startswith( candidate ):
-                    logging.info( 'skipping %s', src )
-                    toSkip.add( pair )
+            if src.startswith( excluded ):
+                logging.info( 'skipping %s', src )
+                toSkip.add( pair )
 
-        for pair in toSkip:
-            self.index.remove( pair )
+        if toSkip:
+            self.index = [ pair for pair in self.index if pair not in toSkip ]
 
 
     def _executeHook( self, name ):
@@ -1160,6 +1160,7 @@ class InstallProcedure( object ):
                 # apply groupID to installRoot
                 logging.debug( 'chgrp %s %s', groupName, installRoot )
                 os.lchown( installRoot, -1, groupID )
+                FastScript.countEvent( 'chown' )
 
             except OSError as details:
                 logging.debug( details )
@@ -1175,6 +1176,7 @@ class InstallProcedure( object ):
 
                     try:
                         os.lchown( path, -1, groupID )
+                        FastScript.countEvent( 'chown' )
                     except OSError as details:
                         logging.debug( details )
                         warn = True
@@ -1185,6 +1187,7 @@ class InstallProcedure( object ):
 
                     try:
                         os.lchown( path, -1, groupID )
+                        FastScript.countEvent( 'chown' )
                     except OSError as details:
                         logging.debug( details )
                         warn = True
@@ -1202,6 +1205,7 @@ class InstallProcedure( object ):
                 # apply umask to installRoot
                 logging.debug( 'chmod %o %s', dirMode, installRoot )
                 os.chmod( installRoot, dirMode )   # should not be a symlink
+                FastScript.countEvent( 'chmod' )
 
             except OSError as details:
                 logging.debug( details )
@@ -1217,6 +1221,7 @@ class InstallProcedure( object ):
 
                     try:
                         os.chmod( path, dirMode )
+                        FastScript.countEvent( 'chmod' )
                     except OSError as details:
                         logging.debug( details )
                         warn = True
@@ -1233,6 +1238,8 @@ class InstallProcedure( object ):
                     else:
                         fileMode = 0o666 & ~umask
 
+                    FastScript.countEvent( 'stats' )
+
                     # <THEORY> (does not work due to bug in Ubuntu 12.04)
                     # logging.debug( 'chmod %o %s', fileMode, path )
                     # os.lchmod( path, fileMode )
@@ -1244,6 +1251,7 @@ class InstallProcedure( object ):
 
                         try:
                             os.chmod( path, fileMode )
+                            FastScript.countEvent( 'chmod' )
                         except OSError as details:
                             logging.debug( details )
                             warn = True
@@ -1322,10 +1330,18 @@ class GlobalInstallProcedure( InstallProcedure ):
 
         logging.debug( '' )
 
+        if not self.dryRun:
+            SITJournal.beginChange( self.sitRootPath, self.details.canonicalPath )
+
         self._installWorker( self.sitRootPath )
         self._patchlevel_updateGlobalSymlink()
         self._updateProxyDir()
 
+        if not self.dryRun:
+            # let proxy directories of all users pick up the change
+            SITJournal.addEntry( self.sitRootPath, 'install',
+                                 self.details.canonicalPath )
+
 
     def setPermissions( self ):
         self._setPermissions( self.installRoot, self.sitRootPath )
@@ -1576,21 +1592,220 @@ class TarExportProcedure( InstallProcedure ):
     def postInstall( self ):
         """
             Packs the prepared content into a bzip2-compressed tarball.
+
+            The archive is built reproducibly (sorted entries, normalized
+            mtimes and owners), hence identical content always results in
+            an identical tarball. If a tarball cache is configured, a
+            previously created archive with the same manifest hash is
+            re-used instead of compressing everything again.
         """
-        import tarfile
+        cacheDir = getTarballCacheDir()
 
-        t = tarfile.open( self._fileName, 'w:bz2' )
-        logging.info( 'writing %s...', self._fileName )
+        if not cacheDir:
+            self._writeTarball( self._fileName )
+            return
 
-        for entry in self.index:
-            key = entry[0]
-            dst = entry[1]
+        manifestHash = self._computeManifestHash()
+        cachedFile   = os.path.join( cacheDir, manifestHash + '.tar.bz2' )
+        logging.debug( 'manifest hash: %s', manifestHash )
+
+        if os.path.isfile( cachedFile ):
+            logging.info( 'writing %s (cached)...', self._fileName )
+
+            # refresh timestamp so that LRU eviction keeps recently used files
+            os.utime( cachedFile )
+            FastScript.copy( cachedFile, self._fileName )
+
+        else:
+            self._writeTarball( self._fileName )
+
+            try:
+                FastScript.mkdir( cacheDir )
+
+                # write under temp. name first so that concurrent pipelines
+                # never see a partially written file in the cache
+                fd, tmpFile = tempfile.mkstemp( dir=cacheDir, suffix='.tmp' )
+                os.close( fd )
+                FastScript.copy( self._fileName, tmpFile )
+                os.replace( tmpFile, cachedFile )
+
+                evictTarballCache( cacheDir, getTarballCacheSize() )
+
+            except OSError as details:
+                logging.warning( 'unable to store tarball in cache: %s', details )
+
+
+    def _computeManifestHash( self ):
+        """
+            Returns a SHA-256 hexdigest over the sorted list of staged
+            files (incl. the content of staged directories), including
+            their relative path, access mode, content and (in case of
+            symlinks) link target.
+
+            Owners are not considered as they get normalized when creating
+            the archive, timestamps are represented by $SOURCE_DATE_EPOCH.
+        """
+        import hashlib
+
+        manifest = hashlib.sha256()
+        mtime    = _getSourceDateEpoch()
+
+        manifest.update( b'%d\0' % mtime )
+
+        for dst, src in self._getStagedEntries():
+            st = os.lstat( src )
+
+            manifest.update( dst.encode() + b'\0' )
+            manifest.update( b'%o\0' % stat.S_IMODE( st.st_mode ) )
+
+            if stat.S_ISLNK( st.st_mode ):
+                manifest.update( b'L' + os.readlink( src ).encode() + b'\0' )
+
+            elif stat.S_ISDIR( st.st_mode ):
+                manifest.update( b'D' )
+
+            elif stat.S_ISREG( st.st_mode ):
+                fileHash = hashlib.sha256()
+
+                with open( src, 'rb' ) as f:
+                    for chunk in iter( lambda: f.read( 1024 * 1024 ), b'' ):
+                        fileHash.update( chunk )
+
+                manifest.update( b'F' + fileHash.digest() )
+
+        return manifest.hexdigest()
+
+
+    def _getStagedEntries( self ):
+        """
+            Returns a sorted list of ( dst, src ) tuples of all staged
+            files, where staged directories are expanded recursively
+            (without following symlinks).
+        """
+        result = {}
+
+        for dst in ( entry[1] for entry in self.index ):
             src = os.path.join( self._tmpDir, dst )
+            result[ dst ] = src
+
+            if os.path.isdir( src ) and not os.path.islink( src ):
+                for dirPath, dirNames, fileNames in os.walk( src ):
+                    relDir = os.path.join( dst, os.path.relpath( dirPath, src ) )
+
+                    for name in dirNames + fileNames:
+                        path = os.path.normpath( os.path.join( relDir, name ) )
+                        result[ path ] = os.path.join( dirPath, name )
+
+        return sorted( result.items() )
+
+
+    def _writeTarball( self, fileName ):
+        """
+            Writes the staged content in sorted order into a
+            bzip2-compressed tarball, with timestamps and ownership
+            normalized so that the result is byte-identical across runs.
+
+            The timestamp can be set via $SOURCE_DATE_EPOCH (default: 0).
+        """
+        import tarfile
+
+        mtime = _getSourceDateEpoch()
+
+        def normalize( tarInfo ):
+            tarInfo.mtime = mtime
+            tarInfo.uid   = 0
+            tarInfo.gid   = 0
+            tarInfo.uname = ''
+            tarInfo.gname = ''
+            return tarInfo
+
+        logging.info( 'writing %s...', fileName )
+
+        with tarfile.open( fileName, 'w:bz2' ) as t:
+            for dst, src in self._getStagedEntries():
+                logging.debug( dst )
+                t.add( src, dst, recursive=False, filter=normalize )
+
+
+#----------------------------------------------------------------------------
+# Tarball cache
+#----------------------------------------------------------------------------
+
+
+def getTarballCacheDir():
+    """
+        Returns the directory where previously created tarballs are
+        cached, or None if caching is disabled.
+
+        Can be set via $BST_TARBALL_CACHE or the 'BST_tarballCacheDir'
+        setting in ToolBOS.conf. The environment variable takes
+        precedence, an empty value disables the cache.
+    """
+    cacheDir = FastScript.getEnv( 'BST_TARBALL_CACHE' )
+
+    if cacheDir is None:
+        try:
+            cacheDir = ToolBOSConf.getConfigOption( 'BST_tarballCacheDir' )
+        except KeyError:
+            pass                                # variable not set by user
+
+    if cacheDir:
+        return os.path.expanduser( FastScript.expandVars( cacheDir ) )
+    else:
+        return None
+
+
+def getTarballCacheSize():
+    """
+        Returns the max. total size of the tarball cache (in MB), as
+        configured via 'BST_tarballCacheSize' in ToolBOS.conf.
+    """
+    try:
+        maxSize = ToolBOSConf.getConfigOption( 'BST_tarballCacheSize' )
+    except KeyError:
+        maxSize = 1024
+
+    FastScript.requireIsInt( maxSize )
+
+    return maxSize
+
+
+def evictTarballCache( cacheDir, maxSize ):
+    """
+        Removes least-recently used tarballs from <cacheDir> until the
+        total size of the remaining ones is at most <maxSize> MB.
+
+        Returns the list of removed files.
+    """
+    FastScript.requireIsTextNonEmpty( cacheDir )
+    FastScript.requireIsInt( maxSize )
+
+    entries = []
+    removed = []
+
+    with os.scandir( cacheDir ) as it:
+        for entry in it:
+            if entry.name.endswith( '.tar.bz2' ) and entry.is_file():
+                st = entry.stat()
+                entries.append( ( st.st_mtime, st.st_size, entry.path ) )
+
+    entries.sort( reverse=True )                # most recently used first
+    limit     = maxSize * 1024 * 1024
+    totalSize = 0
+
+    for mtime, size, path in entries:
+        totalSize += size
+
+        if totalSize > limit:
+            logging.debug( 'evicting %s from tarball cache', path )
+            FastScript.remove( path )
+            removed.append( path )
+
+    return removed
 
-            logging.debug( dst )
-            t.add( src, dst )
 
-        t.close()
+def _getSourceDateEpoch():
+    return int( FastScript.getEnv( 'SOURCE_DATE_EPOCH' ) or 0 )
 
 
 # EOF
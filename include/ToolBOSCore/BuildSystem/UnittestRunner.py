@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+#
+#  Parallel execution of the Python unittests of a package
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import concurrent.futures
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# filename pattern of unittest modules, searched within 'testDir'
+testPattern   = 'Test*.py'
+testDir       = 'test'
+
+junitFile     = 'junit.xml'
+timingsFile   = 'timings.json'
+
+# directories not searched for tests
+_skipDirs     = ( '__pycache__', 'ReferenceData', 'build' )
+
+# terminal escape sequences (colors) and other characters not allowed
+# in XML 1.0, removed from the output written into the JUnit file
+_ansiExpr     = re.compile( r'\x1b\[[0-9;?]*[ -/]*[@-~]' )
+_xmlExpr      = re.compile( '[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]' )
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def discoverTests( topLevelDir ):
+    """
+        Returns a sorted list of all unittest modules (test/**/Test*.py)
+        of the package, relative to 'topLevelDir'.
+    """
+    import fnmatch
+
+    FastScript.requireIsDir( topLevelDir )
+
+    result = []
+
+    for dirPath, dirNames, fileNames in os.walk( os.path.join( topLevelDir, testDir ) ):
+        dirNames[:] = [ name for name in dirNames
+                        if name not in _skipDirs and not name.startswith( '.' ) ]
+
+        for fileName in fnmatch.filter( fileNames, testPattern ):
+            filePath = os.path.join( dirPath, fileName )
+            result.append( os.path.relpath( filePath, topLevelDir ) )
+
+    result.sort()
+
+    return result
+
+
+def getShards( testModules, timings=None ):
+    """
+        Groups the test modules by directory: Modules within the same
+        directory typically share files (reference data, output files),
+        hence they get executed one after the other within their
+        directory, while different directories can run in parallel.
+
+        Returns a list of shards (= lists of modules), the slowest shard
+        first according to the 'timings' of a previous run
+        ( { module: seconds } ). Shards without known timings come first
+        as they might be the slowest ones.
+    """
+    FastScript.requireIsList( testModules )
+
+    if timings is None:
+        timings = {}
+
+    shards = {}
+
+    for module in testModules:
+        shards.setdefault( os.path.dirname( module ), [] ).append( module )
+
+    def duration( shard ):
+        try:
+            return sum( timings[ module ] for module in shard )
+        except KeyError:
+            return float( 'inf' )
+
+    return sorted( shards.values(), key=duration, reverse=True )
+
+
+def runTests( topLevelDir, resultDir, maxWorkers=None ):
+    """
+        Runs all unittest modules of the package, each one in a separate
+        Python process, distributed over 'maxWorkers' processes in
+        parallel (default: number of CPUs).
+
+        Writes the results as JUnit XML and the duration of each
+        module and test into 'resultDir'.
+
+        Returns True if all tests passed.
+    """
+    FastScript.requireIsDir( topLevelDir )
+    FastScript.requireIsTextNonEmpty( resultDir )
+
+    testModules = discoverTests( topLevelDir )
+
+    if not testModules:
+        logging.info( 'no unittests found (%s/**/%s)', testDir, testPattern )
+        return True
+
+    timingsPath = os.path.join( resultDir, timingsFile )
+    timings     = _loadTimings( timingsPath )
+    shards      = getShards( testModules, timings.get( 'modules' ) )
+    maxWorkers  = min( maxWorkers or os.cpu_count() or 1, len( shards ) )
+    results     = []
+
+    logging.info( 'running %d unittest modules (%d parallel jobs)',
+                  len( testModules ), maxWorkers )
+
+    FastScript.mkdir( resultDir )
+
+    # each shard is executed by child processes, the threads only wait
+    with concurrent.futures.ThreadPoolExecutor( maxWorkers ) as tp:
+        futures = [ tp.submit( _runShard, topLevelDir, shard ) for shard in shards ]
+
+        for future in concurrent.futures.as_completed( futures ):
+            for result in future.result():
+                _showResult( result )
+                results.append( result )
+
+    results.sort( key=lambda result: result[ 'module' ] )
+
+    _writeJUnit( results, os.path.join( resultDir, junitFile ) )
+    _writeTimings( results, timingsPath )
+
+    failed = [ result[ 'module' ] for result in results if not _isSuccess( result ) ]
+
+    if failed:
+        logging.error( '%d of %d unittest modules failed:', len( failed ), len( results ) )
+
+        for module in failed:
+            logging.error( '    %s', module )
+
+    return not failed
+
+
+#----------------------------------------------------------------------------
+# Private functions
+#----------------------------------------------------------------------------
+
+
+def _runShard( topLevelDir, shard ):
+    """
+        Executes the modules of one shard sequentially, within their
+        directory and with a private temp. directory.
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory( prefix='BST-unittest-' ) as tmpDir:
+        for module in shard:
+            results.append( _runModule( topLevelDir, module, tmpDir ) )
+
+    return results
+
+
+def _runModule( topLevelDir, module, tmpDir ):
+    """
+        Runs one unittest module in a child process and returns its
+        result dict.
+    """
+    import ToolBOSCore
+
+    resultFile = os.path.join( tmpDir, 'result.json' )
+    workDir    = os.path.join( topLevelDir, os.path.dirname( module ) )
+    incDir     = os.path.dirname( os.path.dirname( os.path.abspath( ToolBOSCore.__file__ ) ) )
+    env        = dict( FastScript.getEnv() )
+    code       = 'from ToolBOSCore.BuildSystem import UnittestRunner; ' \
+                 'UnittestRunner._execModule( %r, %r )' % \
+                 ( os.path.basename( module ), resultFile )
+
+    # isolate the tests from each other, and make sure the runner is found
+    # (appended, so that a ToolBOSCore under test takes precedence)
+    env[ 'TMPDIR' ]     = tmpDir
+    env[ 'PYTHONPATH' ] = ':'.join( filter( None, ( env.get( 'PYTHONPATH' ), incDir ) ) )
+
+    FastScript.remove( resultFile )
+
+    startTime = time.monotonic()
+
+    proc = subprocess.run( [ sys.executable, '-c', code ], cwd=workDir, env=env,
+                           stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                           stderr=subprocess.STDOUT, universal_newlines=True )
+
+    FastScript.countEvent( 'subprocesses' )
+
+    result = { 'module'    : module,
+               'time'      : time.monotonic() - startTime,
+               'returncode': proc.returncode,
+               'output'    : proc.stdout,
+               'tests'     : [] }
+
+    try:
+        with open( resultFile ) as f:
+            result[ 'tests' ] = json.load( f )
+
+    except ( OSError, ValueError ):
+        # e.g. crashed or failed to import, report as error of the module
+        result[ 'tests' ] = [ { 'classname': module,
+                                'name'     : '<module>',
+                                'time'     : result[ 'time' ],
+                                'status'   : 'error',
+                                'message'  : 'exit code %d' % proc.returncode,
+                                'details'  : proc.stdout } ]
+
+    return result
+
+
+def _execModule( fileName, resultFile ):
+    """
+        Entry point within the child process: Loads and runs the tests
+        of the given module, and writes the outcome of each test into
+        'resultFile' (JSON).
+    """
+    import importlib.util
+
+    sys.path.insert( 0, os.getcwd() )
+
+    moduleName = os.path.splitext( fileName )[0]
+    spec       = importlib.util.spec_from_file_location( moduleName, fileName )
+    module     = importlib.util.module_from_spec( spec )
+
+    sys.modules[ moduleName ] = module
+    spec.loader.exec_module( module )
+
+    suite  = unittest.defaultTestLoader.loadTestsFromModule( module )
+    runner = unittest.TextTestRunner( stream=sys.stdout, verbosity=2,
+                                      resultclass=_TimingResult )
+    result = runner.run( suite )
+
+    with open( resultFile, 'w' ) as f:
+        json.dump( result.records, f )
+
+    sys.exit( 0 if result.wasSuccessful() else 1 )
+
+
+class _TimingResult( unittest.TextTestResult ):
+    """
+        Records duration and outcome of each test.
+    """
+    def __init__( self, *args, **kwargs ):
+        super( _TimingResult, self ).__init__( *args, **kwargs )
+
+        self.records    = []
+        self._startTime = None
+
+
+    def startTest( self, test ):
+        self._startTime = time.monotonic()
+        super( _TimingResult, self ).startTest( test )
+
+
+    def addSuccess( self, test ):
+        super( _TimingResult, self ).addSuccess( test )
+        self._record( test, 'passed' )
+
+
+    def addFailure( self, test, err ):
+        super( _TimingResult, self ).addFailure( test, err )
+        self._record( test, 'failure', err )
+
+
+    def addError( self, test, err ):
+        super( _TimingResult, self ).addError( test, err )
+        self._record( test, 'error', err )
+
+
+    def addSkip( self, test, reason ):
+        super( _TimingResult, self ).addSkip( test, reason )
+        self._record( test, 'skipped', message=reason )
+
+
+    def addExpectedFailure( self, test, err ):
+        super( _TimingResult, self ).addExpectedFailure( test, err )
+        self._record( test, 'passed' )
+
+
+    def addUnexpectedSuccess( self, test ):
+        super( _TimingResult, self ).addUnexpectedSuccess( test )
+        self._record( test, 'failure', message='unexpected success' )
+
+
+    def _record( self, test, status, err=None, message=None ):
+        duration = time.monotonic() - self._startTime if self._startTime else 0.0
+
+        if err:
+            details = self._exc_info_to_string( err, test )
+
+            if message is None:
+                message = str( err[1] ).split( '\n' )[0]
+        else:
+            details = None
+
+        self.records.append( { 'classname': '%s.%s' % ( type( test ).__module__,
+                                                        type( test ).__name__ ),
+                               'name'     : getattr( test, '_testMethodName', str( test ) ),
+                               'time'     : duration,
+                               'status'   : status,
+                               'message'  : message,
+                               'details'  : details } )
+
+
+def _isSuccess( result ):
+    return result[ 'returncode' ] == 0 and \
+           all( test[ 'status' ] in ( 'passed', 'skipped' ) for test in result[ 'tests' ] )
+
+
+def _showResult( result ):
+    if _isSuccess( result ):
+        logging.info( '%-60s [OK]      %6.2fs', result[ 'module' ], result[ 'time' ] )
+    else:
+        logging.info( '%-60s [FAILED]  %6.2fs', result[ 'module' ], result[ 'time' ] )
+        logging.info( '\n%s', result[ 'output' ] )
+
+
+def _loadTimings( filePath ):
+    try:
+        with open( filePath ) as f:
+            timings = json.load( f )
+
+        FastScript.requireIsDict( timings )
+        return timings
+
+    except ( AssertionError, OSError, ValueError ):
+        return {}
+
+
+def _writeTimings( results, filePath ):
+    """
+        Stores the duration (in seconds) of each module and each test,
+        used to schedule the slowest modules first next time.
+    """
+    modules = {}
+    tests   = {}
+
+    for result in results:
+        modules[ result[ 'module' ] ] = round( result[ 'time' ], 3 )
+
+        for test in result[ 'tests' ]:
+            testID = '%s::%s.%s' % ( result[ 'module' ], test[ 'classname' ], test[ 'name' ] )
+            tests[ testID ] = round( test[ 'time' ], 3 )
+
+    FastScript.setFileContent( filePath,
+                               json.dumps( { 'modules': modules, 'tests': tests },
+                                           indent=4, sort_keys=True ) + '\n' )
+
+
+def _writeJUnit( results, filePath ):
+    """
+        Writes the results in JUnit XML format, with one <testsuite>
+        per module.
+    """
+    import xml.etree.ElementTree as ET
+
+    root   = ET.Element( 'testsuites' )
+    totals = { 'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0 }
+
+    for result in results:
+        tests  = result[ 'tests' ]
+        counts = { 'tests'   : len( tests ),
+                   'failures': sum( test[ 'status' ] == 'failure' for test in tests ),
+                   'errors'  : sum( test[ 'status' ] == 'error'   for test in tests ),
+                   'skipped' : sum( test[ 'status' ] == 'skipped' for test in tests ) }
+
+        suite = ET.SubElement( root, 'testsuite', name=result[ 'module' ],
+                               time='%.3f' % result[ 'time' ],
+                               **{ key: str( value ) for key, value in counts.items() } )
+
+        for test in tests:
+            case = ET.SubElement( suite, 'testcase', classname=test[ 'classname' ],
+                                  name=test[ 'name' ], time='%.3f' % test[ 'time' ] )
+
+            if test[ 'status' ] != 'passed':
+                element = ET.SubElement( case, test[ 'status' ],
+                                         message=_toXMLText( test[ 'message' ] or '' ) )
+                element.text = _toXMLText( test[ 'details' ] )
+
+        ET.SubElement( suite, 'system-out' ).text = _toXMLText( result[ 'output' ] )
+
+        for key, value in counts.items():
+            totals[ key ] += value
+
+    for key, value in totals.items():
+        root.set( key, str( value ) )
+
+    root.set( 'time', '%.3f' % sum( result[ 'time' ] for result in results ) )
+
+    FastScript.setFileContent( filePath,
+                               ET.tostring( root, encoding='unicode' ) + '\n' )
+
+
+def _toXMLText( text ):
+    """
+        Strips terminal escape sequences and characters which are not
+        allowed in XML 1.0 (e.g. other control characters).
+    """
+    if not text:
+        return text
+
+    return _xmlExpr.sub( '', _ansiExpr.sub( '', text ) )
+
+
+# EOF
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+#
+#  Extraction of exported symbols from Windows libraries
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+
+import concurrent.futures
+import logging
+import os
+import re
+import sys
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+#
+# In the dumpbin.exe output we expect to find a sequence like
+#
+# 002 00000000 SECT1  notype       Static       | .drectve
+# 004 00000000 SECT2  notype       Static       | .debug$S
+# 006 00000000 SECT3  notype       Static       | .rdata
+# 008 00000000 SECT3  notype       External     | ??_C@_0EB@NFPJKBDG@ABCDEFGHIJKLMNOPQRSTUVWXYZabcdef@ (`string')
+# 009 00000000 SECT4  notype       Static       | .rdata
+# 00B 00000000 SECT4  notype       External     | ??_C@_06PNMEMOHD@?$CGapos?$DL?$AA@ (`string')
+# 00C 00000000 SECT5  notype       Static       | .rdata
+# 00E 00000000 SECT5  notype       External     | ??_C@_06DDLNFFBN@?$CGquot?$DL?$AA@ (`string')
+#
+
+# We are interested to know allocation directive: Static or External and the right part after pipe (|):
+#
+# For Static allocation the right part complete the allocation directive starting with dot (.). Therefore
+# we are interested only to look at certain dot directive like .text*, .data* or .rdata* because it will
+# decide where the next the symbols will be allocated.
+#
+# For External allocation, the right part specify function names, that can be mangled or not. We are interested
+# in the first part just before the optional function argument list. If the function name starts with an underscore
+# (_) and we are handling symbols for 32bit windows arch than we have to remove it because such architecture
+# requires so. By the way this isn't required for the 64bit arch
+#
+# Regarding the UNDEF pattern in the section, basically it handle symbols defined as public: static class, so
+# we need to take also them, but not the one starting with _imp_ (import from other dlls) or _Cxx (C++ exceptions)
+#
+# Finally some clue about the microsoft C++ mangling symbols starting with a certain pattern:
+#
+#  ?_7 - vftable
+#  ?_8 - vbtable
+#  ?_9 - vcall
+#  ?_A - typeof
+#  ?_B - local static guard
+#  ?_C - string
+#  ?_D - vbase destructor
+#  ?_E - vector deleting destructor
+#  ?_F - default constructor closure
+#  ?_G - scalar deleting destructor
+#  ?_H - vector constructor iterator
+#  ?_I - vector destructor iterator
+#  ?_J - vector vbase constructor iterator
+#  ?_K - virtual displacement map
+#  ?_L - eh vector constructor iterator
+#  ?_M - eh vector destructor iterator
+#  ?_N - eh vector vbase constructor iterator
+#  ?_O - copy constructor closure
+#  ?_P<name> - udt returning <name>
+#  ?_Q - <unknown>
+#  ?_R0 - RTTI Type Descriptor
+#  ?_R1 - RTTI Base Class Descriptor at (a,b,c,d)
+#  ?_R2 - RTTI Base Class Array
+#  ?_R3 - RTTI Class Hierarchy Descriptor
+#  ?_R4 - RTTI Complete Object Locator
+#  ?_S - local vftable
+#  ?_T - local vftable constructor closure
+#  ?_U - new[]
+#  ?_V - delete[]
+
+_lineExpr  = re.compile( r"[0-9a-fA-F]+ (?P<length>([0-9a-fA-F]+)) (?P<table>(SECT[0-9A-F]+|UNDEF)).*notype.*(?P<alloc>(Static|External)) .*\| (?P<token>[\?\.\@\$_A-Za-z0-9]+)" )
+
+# This will filter the function name, we are interested only the part containing the symbol without @<number>
+_tokenExpr = re.compile( r"(?P<token>.*)@[0-9]+$" )
+
+_sectionNamePrefixes = ( '.text$x', '.text$mn' , '.debug$S', '.debug$T' )
+
+# symbols with these prefixes resp. substrings are never exported
+_excludedPrefixes    = ( '??_G', '??_E', '??_M', '?__type_info',
+                         '_imp_', '__imp_', '_Cxx', '__Cxx' )
+
+_excludedSubstrings  = ( '@@UAEPAXI@Z', '@@QAEPAXI@Z', '@AEPAXI@Z', '_fltused',
+                         'AEPAXI@Z', 'DllMain', 'exception@std', 'real@' )
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def iterSymbols( lines, bits=32, knownSymbols=None ):
+    """
+        Generator which parses the given "dumpbin.exe /SYMBOLS" output
+        (any iterable of lines, e.g. an open file) and yields the
+        symbols to export, each only once.
+
+        Symbols contained in the 'knownSymbols' set are skipped. New
+        symbols get added to this set.
+    """
+    FastScript.requireIsIn( bits, ( 32, 64 ) )
+
+    if knownSymbols is None:
+        knownSymbols = set()
+
+    exportSym = False
+    section   = ''
+
+    for line in lines:
+        # cheap pre-check before applying the regex
+        if 'notype' not in line or '| ' not in line:
+            continue
+
+        res = _lineExpr.match( line )
+
+        if res is None:
+            continue
+
+        alloc = res.group( 'alloc' )
+        sym   = res.group( 'token' )
+
+        # check for allocation directive
+        if alloc == 'Static':
+            # We are interested only in section allocation
+            if sym.startswith( '.' ):
+                section   = sym
+                exportSym = sym == '.text' or sym.startswith( ( '.data', '.bss' ) ) or \
+                            sym in _sectionNamePrefixes
+
+            continue
+
+        # This will detect global variables (section length > 0)
+        if int( res.group( 'length' ), 16 ) > 0:
+            exportSym = True
+
+        if not exportSym:
+            continue
+
+        # Check whether or not we have both public vectors and scalars
+        # Both scalar and vector destructor couldn't be exported
+        # floating point symbols must not be exported
+        undefSym = res.group( 'table' ) == 'UNDEF'
+
+        if ( undefSym and section == '.text' ) or \
+           ( undefSym and section in _sectionNamePrefixes and not sym.startswith( '?' ) ) or \
+           sym.startswith( _excludedPrefixes ) or \
+           any( item in sym for item in _excludedSubstrings ):
+            continue
+
+        # Checks if the symbol terminate with @<number>, and in case
+        # remove the @<number> but only if it isn't a mangled symbol
+        if '@' in sym:
+            res = _tokenExpr.match( sym )
+
+            if res is not None and not sym.startswith( '?' ):
+                sym = res.group( 'token' )
+
+        # Win32 has the first _ (underscore) to remove
+        if bits == 32 and sym.startswith( '_' ):
+            sym = sym[1:]
+
+        if sym in knownSymbols:
+            continue
+
+        knownSymbols.add( sym )
+        logging.debug( 'found symbol: %s', sym )
+
+        yield sym
+
+
+def writeExports( fd, symbols ):
+    """
+        Writes a module-definition (.def) file with the given symbols
+        into the open file 'fd', while iterating over 'symbols'.
+    """
+    fd.write( 'EXPORTS\n' )
+
+    for sym in symbols:
+        fd.write( '\t%s\n' % sym )
+
+
+def dumpSymbols( inputFile=None, outputFile=None, bits=32, extraSymbols=() ):
+    """
+        Reads the "dumpbin.exe /SYMBOLS" output from 'inputFile' and
+        writes the .def file to 'outputFile'. The 'extraSymbols' will be
+        exported in any case.
+
+        If 'inputFile' resp. 'outputFile' is None or '-', stdin resp.
+        stdout will be used.
+    """
+    FastScript.requireIsIterable( extraSymbols )
+
+    knownSymbols = set()
+    extraSymbols = [ sym for sym in extraSymbols if sym ]
+
+    def allSymbols( lines ):
+        for sym in extraSymbols:
+            if sym not in knownSymbols:
+                knownSymbols.add( sym )
+                yield sym
+
+        yield from iterSymbols( lines, bits, knownSymbols )
+
+    if inputFile and inputFile != '-':
+        FastScript.requireIsFileNonEmpty( inputFile )
+        logging.debug( 'reading from %s', inputFile )
+        inFd = open( inputFile, 'r', errors='replace' )
+    else:
+        logging.debug( 'reading from stdin' )
+        inFd = sys.stdin
+
+    try:
+        if outputFile and outputFile != '-':
+            logging.debug( 'writing %s', outputFile )
+            tmpFile = '%s.%d' % ( outputFile, os.getpid() )
+
+            with open( tmpFile, 'w' ) as outFd:
+                writeExports( outFd, allSymbols( inFd ) )
+
+            os.replace( tmpFile, outputFile )
+        else:
+            writeExports( sys.stdout, allSymbols( inFd ) )
+    finally:
+        if inFd is not sys.stdin:
+            inFd.close()
+
+
+def dumpSymbolsBatch( jobs, bits=32, extraSymbols=(), maxWorkers=None ):
+    """
+        Processes several library dumps in parallel. 'jobs' is a list of
+        ( inputFile, outputFile ) tuples, see dumpSymbols().
+
+        Raises an error if processing any of the files failed.
+    """
+    FastScript.requireIsIterable( jobs )
+
+    jobs = list( jobs )
+
+    if len( jobs ) < 2:
+        for inputFile, outputFile in jobs:
+            dumpSymbols( inputFile, outputFile, bits, extraSymbols )
+
+        return
+
+    extraSymbols = list( extraSymbols )
+
+    with concurrent.futures.ProcessPoolExecutor( maxWorkers ) as pool:
+        futures = { pool.submit( dumpSymbols, inputFile, outputFile,
+                                 bits, extraSymbols ): inputFile
+                    for inputFile, outputFile in jobs }
+
+        for future in concurrent.futures.as_completed( futures ):
+            try:
+                future.result()
+            except ( AssertionError, OSError ) as details:
+                raise EnvironmentError( '%s: %s' % ( futures[ future ], details ) )
+
+
+# EOF
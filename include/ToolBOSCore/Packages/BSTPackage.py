@@ -43,6 +43,7 @@ from ToolBOSCore.Packages.AbstractPackage import AbstractPackage
 from ToolBOSCore.Packages.DebianPackage   import DebianPackage
 from ToolBOSCore.Packages.MetaInfoCache   import MetaInfoCache
 from ToolBOSCore.Packages.PackageDetector import PackageDetector
+from ToolBOSCore.Packages.PackageRecord   import PackageRecord
 from ToolBOSCore.Platforms.Platforms      import getHostPlatform
 from ToolBOSCore.Storage                  import SIT
 from ToolBOSCore.Storage.PkgInfoInterface import PkgInfoInterface
@@ -57,7 +58,25 @@ class BSTPackage( AbstractPackage ):
     def __init__( self, url=None ):
         super( BSTPackage, self ).__init__( url )
 
-        self.detector = None
+        self.record    = None      # PackageRecord
+        self._detector = None
+
+
+    @property
+    def detector( self ):
+        """
+            The full PackageDetector, created on demand if only the
+            PackageRecord is known.
+        """
+        if self._detector is None and self.record is not None:
+            self._detector = self._createDetector()
+
+        return self._detector
+
+
+    @detector.setter
+    def detector( self, detector ):
+        self._detector = detector
 
 
     def getDepInstallCmd_APT( self ):
@@ -78,46 +97,47 @@ class BSTPackage( AbstractPackage ):
 
 
     def open( self, topLevelDir ):
-        self.detector = PackageDetector( topLevelDir )
-        self.detector.retrieveMakefileInfo()
-        self.url      = 'sit://' + self.detector.canonicalPath
+        self._detector = PackageDetector( topLevelDir )
+        self._detector.retrieveMakefileInfo()
+
+        self.record    = PackageRecord.fromDetector( self._detector )
+        self.url       = 'sit://' + self.record.canonicalPath
 
 
     def retrieveDependencies( self, recursive,
                               normalDeps=True, buildDeps=False,
-                              recommendations=False, suggestions=False ):
-        FastScript.requireIsNotNone( self.detector, 'Please call .open() first' )
+                              recommendations=False, suggestions=False,
+                              _visited=None ):
+        """
+            Populates self.depSet and self.depTree.
+
+            In recursive mode, each SIT package is opened only once:
+            packages appearing multiple times in the tree share the same
+            (sub-)tree object. '_visited' is only used internally.
+        """
+        FastScript.requireIsNotNone( self.record, 'Please call .open() first' )
         FastScript.requireIsBool( recursive )
         FastScript.requireIsBool( normalDeps )
         FastScript.requireIsBool( buildDeps )
         FastScript.requireIsBool( recommendations )
         FastScript.requireIsBool( suggestions )
 
-        self.detector.retrieveMakefileInfo()
-
         self.depSet  = set()
         self.depTree = list()
         debPrefix    = 'deb://'
         sitPrefix    = 'sit://'
         hostPlatform = getHostPlatform()
 
+        if _visited is None:
+            _visited = {}                  # { packageURL: ( depPkg, error ) }
 
-        if normalDeps:
-            self.depSet = set( self.detector.dependencies )
 
-            try:
-                self.depSet.update( self.detector.dependsArch[ hostPlatform ] )
-            except KeyError:
-                pass                             # no such setting, this is OK
+        if normalDeps:
+            self.depSet = set( self.record.getDependencies( hostPlatform ) )
 
 
         if buildDeps:
-            self.depSet.update( self.detector.buildDependencies )
-
-            try:
-                self.depSet.update( self.detector.buildDependsArch[ hostPlatform ] )
-            except KeyError:
-                pass                             # no such setting, this is OK
+            self.depSet.update( self.record.getBuildDependencies( hostPlatform ) )
 
 
         # create a temporary copy of self.depSet while iterating,
@@ -127,14 +147,20 @@ class BSTPackage( AbstractPackage ):
 
             error = False
 
-            if packageURL.startswith( sitPrefix ):
+            if packageURL.startswith( sitPrefix ) and packageURL in _visited:
+                depPkg, error = _visited[ packageURL ]
+
+            elif packageURL.startswith( sitPrefix ):
                 depPkg = BSTProxyInstalledPackage( packageURL )
+                _visited[ packageURL ] = ( depPkg, error )
+
                 try:
                     depPkg.open()
 
                     if recursive:
                         depPkg.retrieveDependencies( recursive, normalDeps, buildDeps,
-                                                     recommendations, suggestions )
+                                                     recommendations, suggestions,
+                                                     _visited )
                     else:
                         depPkg.depSet  = set()
                         depPkg.depTree = list()
@@ -144,6 +170,8 @@ class BSTPackage( AbstractPackage ):
                     depPkg.depTree = list()
                     error          = True
 
+                _visited[ packageURL ] = ( depPkg, error )
+
             elif packageURL.startswith( debPrefix ):
                 depPkg = DebianPackage( packageURL )
 
@@ -158,12 +186,17 @@ class BSTPackage( AbstractPackage ):
                 raise ValueError( 'Unknown URL prefix in "%s"' % packageURL )
 
             if not error:
-                self.depSet.update( depPkg.depSet )
+                # depSet is still None if we hit a cyclic dependency
+                self.depSet.update( depPkg.depSet or () )
 
             self.depSet.add( packageURL )
             self.depTree.append( depPkg )
 
 
+    def _createDetector( self ):
+        return self.record.getDetector()
+
+
 
 class BSTSourcePackage( BSTPackage ):
     """
@@ -232,48 +265,92 @@ class BSTInstalledPackage( BSTPackage ):
 
 
     def open( self, topLevelDir ):
-        super( BSTInstalledPackage, self ).open( topLevelDir )
+        # only keep the PackageRecord, the full PackageDetector gets
+        # created on demand
+        detector = PackageDetector( topLevelDir, lightweight=True )
+        detector.retrieveMakefileInfo()
+
+        self.record    = PackageRecord.fromDetector( detector )
+        self.url       = 'sit://' + self.record.canonicalPath
+        self._detector = None
 
 
     def isInstalled( self ):
-        # if package could not be opened then self.detector is None,
-        # hence accessing self.detector.topLevelDir won't work
-        if self.detector is None:
+        # if package could not be opened then self.record is None,
+        # hence accessing self.record.topLevelDir won't work
+        if self.record is None:
             return False
 
-        FastScript.requireIsTextNonEmpty( self.detector.topLevelDir )
+        FastScript.requireIsTextNonEmpty( self.record.topLevelDir )
         FastScript.requireIsTextNonEmpty( self._sitPath )
 
         return os.path.exists( os.path.join( self._sitPath,
-                                             self.detector.topLevelDir ) )
+                                             self.record.topLevelDir ) )
+
 
+    def retrieveReverseDependencies( self, recursive, _visited=None ):
+        """
+            Populates self.revDepSet and self.revDepTree.
 
-    def retrieveReverseDependencies( self, recursive ):
+            In recursive mode, packages appearing multiple times in the
+            tree share the same (sub-)tree object. '_visited' is only
+            used internally.
+        """
         self._ensureMetaInfoCache()
 
         self.revDepSet  = set()
         self.revDepTree = list()
 
+        if _visited is None:
+            _visited = {}                  # { packageURL: depPackage }
+
         for depURL in self._metaInfoCache.getReverseDependencies( self.url ):
             ProjectProperties.requireIsURL( depURL )
 
+            if depURL in _visited:
+                depPackage = _visited[ depURL ]
+
+                if recursive:
+                    self.revDepSet.update( depPackage.revDepSet or () )
+
+                self.revDepSet.add( depURL )
+                self.revDepTree.append( depPackage )
+                continue
+
             # no Debian packages can appear in reverse dependencies of SIT packages
             depPackage = BSTInstalledPackage( depURL )
-            depPackage.detector = self._metaInfoCache.getDetector( depURL )
+            depPackage.record = self._metaInfoCache.getRecord( depURL )
+            _visited[ depURL ] = depPackage
 
             if recursive:
-                depPackage.retrieveReverseDependencies( recursive )
+                depPackage.retrieveReverseDependencies( recursive, _visited )
                 self.revDepSet.update( depPackage.revDepSet )
 
             self.revDepSet.add( depURL )
             self.revDepTree.append( depPackage )
 
 
+    def _createDetector( self ):
+        # share the detector among all instances of the same package,
+        # if the record stems from the MetaInfoCache
+        if self._metaInfoCache:
+            try:
+                if self._metaInfoCache.getRecord( self.url ) is self.record:
+                    return self._metaInfoCache.getDetector( self.url )
+            except KeyError:
+                pass
+
+        return super( BSTInstalledPackage, self )._createDetector()
+
+
     def _ensureMetaInfoCache( self ):
         """
             Creates and populates the internal MetaInfoCache,
             if not already existing.
         """
+        FastScript.countCacheAccess( 'metaInfoCache',
+                                     bool( BSTInstalledPackage._metaInfoCache ) )
+
         if not BSTInstalledPackage._metaInfoCache:
             BSTInstalledPackage._metaInfoCache = MetaInfoCache()
             BSTInstalledPackage._metaInfoCache.populate()
@@ -302,6 +379,20 @@ class BSTProxyInstalledPackage( BSTInstalledPackage ):
 
         topLevelDir = os.path.join( SIT.getPath(), package )
 
+        # re-use the record if the MetaInfoCache was already populated
+        # for this SIT (e.g. for reverse dependencies, or by BSTDaemon)
+        if self._metaInfoCache:
+            try:
+                record = self._metaInfoCache.getRecord( 'sit://' + package )
+            except KeyError:
+                record = None
+
+            if record is not None and record.topLevelDir == topLevelDir:
+                self.record    = record
+                self.url       = 'sit://' + record.canonicalPath
+                self._detector = None
+                return
+
         super( BSTProxyInstalledPackage, self ).open( topLevelDir )
 
 
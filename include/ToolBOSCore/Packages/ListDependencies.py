@@ -35,17 +35,42 @@
 #
 
 
+import collections
+import json
 import logging
 import os
+import sys
 
-from ToolBOSCore.BuildSystem.BuildSystemTools import requireTopLevelDir
-from ToolBOSCore.Packages.AbstractPackage     import AbstractPackage
-from ToolBOSCore.Packages                     import BSTPackage, ProjectProperties
-from ToolBOSCore.Util                         import FastScript
+from ToolBOSCore.Packages.AbstractPackage import AbstractPackage
+from ToolBOSCore.Packages                 import BSTPackage, ProjectProperties
+from ToolBOSCore.Util                     import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# max. number of lines of a subtree to keep for re-use in full tree mode
+_memoLimit = 10000
 
 
 def listDependencies( canonicalPath, reverse=False, recursive=True,
-                      missingOnly=False, asList=False, showDuplicates=False ):
+                      missingOnly=False, asList=False, showDuplicates=False,
+                      maxDepth=None, outputFormat='tree' ):
+    """
+        Prints the [reverse] dependencies of the given package, either
+        as list, as tree, or the dependency graph in 'json' or 'dot'
+        (Graphviz) format.
+
+        'maxDepth' limits the depth of tree, JSON and DOT output.
+    """
+    from ToolBOSCore.BuildSystem.BuildSystemTools import requireTopLevelDir
+
+    FastScript.requireIsIn( outputFormat, ( 'tree', 'json', 'dot' ) )
+
+    if maxDepth is not None:
+        FastScript.requireIsIntNotZero( maxDepth )
 
     if missingOnly:
         asList  = True
@@ -70,7 +95,7 @@ def listDependencies( canonicalPath, reverse=False, recursive=True,
 
             package = BSTPackage.BSTSourcePackage()
             package.open( os.getcwd() )
-            canonicalPath = package.detector.canonicalPath
+            canonicalPath = package.record.canonicalPath
 
 
         # strip-off the SIT part if provided, and convert to URL-style
@@ -94,8 +119,12 @@ def listDependencies( canonicalPath, reverse=False, recursive=True,
 
     if asList:
         _showAsList( package, reverse, missingOnly )
+    elif outputFormat == 'json':
+        _showAsJSON( package, reverse, maxDepth )
+    elif outputFormat == 'dot':
+        _showAsDOT( package, reverse, maxDepth )
     else:
-        _showAsTree( package, reverse, recursive, showDuplicates )
+        _showAsTree( package, reverse, recursive, showDuplicates, maxDepth )
 
 
 #----------------------------------------------------------------------------
@@ -132,51 +161,258 @@ def _showAsList( package, reverse, missingOnly ):
             print( packageURL )
 
 
-def _showAsTree( package, reverse, recursive, showDuplicates ):
+def _showAsTree( package, reverse, recursive, showDuplicates, maxDepth=None,
+                 output=None ):
     """
-        Convert BSTPackage-tree representation to traditional
-        FastScript-tree format, to re-use existing code.
+        Prints the dependency tree, line by line while traversing it.
     """
     FastScript.requireIsInstance( package, AbstractPackage )
     FastScript.requireIsBool( reverse )
     FastScript.requireIsBool( recursive )
     FastScript.requireIsBool( showDuplicates )
 
-    treeData = _convertToTree( package, reverse, recursive,
-                               showDuplicates, set() )
-    FastScript.requireIsList( treeData )
+    if output is None:
+        output = sys.stdout
+
+    if not recursive:
+        maxDepth = 1
 
-    treeText = FastScript.getTreeView( treeData )
-    FastScript.requireIsText( treeText)
+    graph = _removeCycles( _getGraph( package, reverse ), package.url )
 
-    print( treeText.strip() )
+    for line in _iterTreeLines( graph, package.url, showDuplicates, maxDepth ):
+        output.write( line )
+        output.write( '\n' )
 
 
-def _convertToTree( package, reverse, recursive, showDuplicates, duplicateData ):
+def _showAsJSON( package, reverse, maxDepth=None, output=None ):
+    """
+        Prints the dependency graph as JSON object, mapping each package
+        to the list of its direct [reverse] dependencies.
+    """
     FastScript.requireIsInstance( package, AbstractPackage )
-    FastScript.requireIsBool( reverse )
-    FastScript.requireIsBool( recursive )
-    FastScript.requireIsBool( showDuplicates )
 
-    treeData = []
-    origData = package.revDepTree if reverse else package.depTree
-    FastScript.requireIsList( origData )
+    if output is None:
+        output = sys.stdout
+
+    graph = _getGraph( package, reverse, maxDepth )
+    data  = { 'package':   package.url,
+              'reverse':   reverse,
+              'graph':     graph }
+
+    json.dump( data, output, indent=4 )
+    output.write( '\n' )
+
+
+def _showAsDOT( package, reverse, maxDepth=None, output=None ):
+    """
+        Prints the dependency graph in Graphviz DOT format, edges point
+        from the depending package to its dependency.
+    """
+    FastScript.requireIsInstance( package, AbstractPackage )
+
+    if output is None:
+        output = sys.stdout
+
+    graph = _getGraph( package, reverse, maxDepth )
+
+    output.write( 'digraph dependencies {\n' )
+    output.write( '    %s [shape=box];\n' % json.dumps( package.url ) )
+
+    for node, children in graph.items():
+        for child in children:
+            edge = ( child, node ) if reverse else ( node, child )
+            output.write( '    %s -> %s;\n' % tuple( map( json.dumps, edge ) ) )
+
+    output.write( '}\n' )
+
+
+def _getGraph( package, reverse, maxDepth=None ):
+    """
+        Converts the BSTPackage-tree into an adjacency map
+        { packageURL: [ child URLs ] }, with the children in the order
+        of the tree.
+
+        Packages further away than 'maxDepth' are omitted.
+    """
+    graph = { package.url: [] }
+    queue = collections.deque( [ ( package, 0 ) ] )
+
+    # breadth-first, so that each package is expanded at its min. depth
+    while queue:
+        parent, depth = queue.popleft()
+
+        for child in _getChildren( parent, reverse ):
+            FastScript.requireIsInstance( child, AbstractPackage )
+
+            graph[ parent.url ].append( child.url )
+
+            if child.url not in graph:
+                graph[ child.url ] = []
+
+                if maxDepth is None or depth + 1 < maxDepth:
+                    queue.append( ( child, depth + 1 ) )
+
+    return graph
+
+
+def _removeCycles( graph, root ):
+    """
+        Returns a copy of the graph without the edges which would close
+        a cycle, so that it can be rendered as tree.
+    """
+    result = { url: [] for url in graph }
+    done   = set()
+    active = { root }
+    stack  = [ ( root, iter( graph[ root ] ) ) ]
+
+    while stack:
+        parent, children = stack[-1]
+        child = next( children, None )
+
+        if child is None:
+            stack.pop()
+            active.discard( parent )
+            done.add( parent )
+            continue
 
-    for depPackage in origData:
-        FastScript.requireIsInstance( depPackage, AbstractPackage )
+        if child in active:
+            logging.warning( 'cyclic dependency: %s -> %s', parent, child )
+            continue
 
-        if showDuplicates or depPackage.url not in duplicateData:
-            treeData.append( depPackage.url )
-            duplicateData.add( depPackage.url )
+        result[ parent ].append( child )
 
-            if recursive:
-                tmp = _convertToTree( depPackage, reverse, recursive,
-                                      showDuplicates, duplicateData )
+        if child not in done:
+            active.add( child )
+            stack.append( ( child, iter( graph[ child ] ) ) )
+
+    return result
+
+
+def _getChildren( package, reverse ):
+    return ( package.revDepTree if reverse else package.depTree ) or []
+
+
+def _iterTreeLines( graph, root, showDuplicates, maxDepth=None ):
+    """
+        Yields the lines of the tree view, e.g.:
+
+            |---sit://Libraries/Foo/1.0
+            |   `---sit://Libraries/Bar/1.0
+            `---sit://Libraries/Baz/1.0
+
+        By default each package is shown only once (incl. its subtree).
+    """
+    if showDuplicates:
+        counts = {}
+        memo   = {}
+        yield from _iterFullTree( graph, root, '', maxDepth, counts, memo )
+    else:
+        yield from _iterUniqueTree( _getUniqueTree( graph, root, maxDepth ), '' )
+
+
+def _getUniqueTree( graph, root, maxDepth ):
+    """
+        Returns the tree as nested ( url, [ children ] ) records, listing
+        each package only at its first occurrence.
+
+        This is needed upfront because it decides which sibling is the
+        last one shown on each level.
+    """
+    seen   = set()
+    result = []
+    stack  = [ ( iter( graph[ root ] ), 0, result ) ]
+
+    while stack:
+        children, depth, parentList = stack[-1]
+        child = next( children, None )
+
+        if child is None:
+            stack.pop()
+            continue
+
+        if child in seen:
+            continue
+
+        seen.add( child )
+        record = ( child, [] )
+        parentList.append( record )
+
+        if maxDepth is None or depth + 1 < maxDepth:
+            stack.append( ( iter( graph[ child ] ), depth + 1, record[1] ) )
+
+    return result
+
+
+def _iterUniqueTree( records, prefix ):
+    for i, ( url, subRecords ) in enumerate( records ):
+        isLast = i == len( records ) - 1
+
+        yield '%s%s---%s' % ( prefix, '`' if isLast else '|', url )
+
+        if subRecords:
+            yield from _iterUniqueTree( subRecords,
+                                        prefix + ( '    ' if isLast else '|   ' ) )
+
+
+def _iterFullTree( graph, url, prefix, depthLeft, counts, memo ):
+    """
+        Yields all lines below 'url', repeating the subtrees of packages
+        which appear several times.
+
+        Subtrees up to _memoLimit lines get rendered once and re-used.
+    """
+    children = graph.get( url, () )
+
+    if depthLeft is not None:
+        if depthLeft <= 0:
+            return
+
+        depthLeft -= 1
+
+    for i, child in enumerate( children ):
+        isLast      = i == len( children ) - 1
+        childPrefix = prefix + ( '    ' if isLast else '|   ' )
+
+        yield '%s%s---%s' % ( prefix, '`' if isLast else '|', child )
+
+        if _countLines( graph, child, depthLeft, counts ) <= _memoLimit:
+            key = ( child, depthLeft )
+
+            try:
+                lines = memo[ key ]
+            except KeyError:
+                lines = tuple( _iterFullTree( graph, child, '', depthLeft,
+                                              counts, memo ) )
+                memo[ key ] = lines
+
+            for line in lines:
+                yield childPrefix + line
+        else:
+            yield from _iterFullTree( graph, child, childPrefix, depthLeft,
+                                      counts, memo )
+
+
+def _countLines( graph, url, depthLeft, counts ):
+    """
+        Returns the number of lines of the full subtree below 'url'.
+    """
+    key = ( url, depthLeft )
+
+    try:
+        return counts[ key ]
+    except KeyError:
+        pass
+
+    if depthLeft is not None and depthLeft <= 0:
+        result = 0
+    else:
+        childDepth = None if depthLeft is None else depthLeft - 1
+        result     = sum( 1 + _countLines( graph, child, childDepth, counts )
+                          for child in graph.get( url, () ) )
 
-                if tmp:
-                    treeData.append( tmp )
+    counts[ key ] = result
 
-    return treeData
+    return result
 
 
 # EOF
@@ -38,6 +38,7 @@ import os
 
 from ToolBOSCore.Packages                 import ProjectProperties
 from ToolBOSCore.Packages.PackageDetector import PackageDetector
+from ToolBOSCore.Packages.PackageRecord   import PackageRecord
 from ToolBOSCore.Storage                  import SIT
 from ToolBOSCore.Util                     import FastScript
 
@@ -45,7 +46,8 @@ from ToolBOSCore.Util                     import FastScript
 class MetaInfoCache( object ):
 
     def __init__( self ):
-        self._cache = {}
+        self._cache     = {}
+        self._detectors = {}
 
 
     def populate( self ):
@@ -53,25 +55,52 @@ class MetaInfoCache( object ):
             Scans all package in SIT and stores the ground-truth pkgInfo.py
             information into one giant hashtable for later fast access.
 
-            The assignment is "packageURL": { pkgInfo data }
+            The assignment is "packageURL": PackageRecord
         """
         sitPath        = SIT.getPath()
         canonicalPaths = SIT.getCanonicalPaths( sitPath )
         FastScript.requireIsListNonEmpty( canonicalPaths )
 
+        self._detectors = {}
 
         for canonicalPath in canonicalPaths:
-            ProjectProperties.requireIsCanonicalPath( canonicalPath )
+            packageURL = 'sit://' + canonicalPath
 
-            packageURL  = 'sit://' + canonicalPath
-            installRoot = os.path.join( sitPath, canonicalPath )
-            detector    = PackageDetector( installRoot )
-            detector.retrieveMakefileInfo()
+            self._cache[ packageURL ] = self.createRecord( sitPath, canonicalPath )
 
-            self._cache[ packageURL ] = detector
+
+    @staticmethod
+    def createRecord( sitPath, canonicalPath ):
+        """
+            Reads the pkgInfo.py of the given package within 'sitPath'
+            and returns its PackageRecord.
+        """
+        ProjectProperties.requireIsCanonicalPath( canonicalPath )
+
+        installRoot = os.path.join( sitPath, canonicalPath )
+        detector    = PackageDetector( installRoot, lightweight=True )
+        detector.retrieveMakefileInfo()
+
+        return PackageRecord.fromDetector( detector )
 
 
     def getDetector( self, packageURL ):
+        """
+            Returns a full PackageDetector for the package, created upon
+            first request only (consider using getRecord() instead).
+        """
+        try:
+            return self._detectors[ packageURL ]
+        except KeyError:
+            pass
+
+        detector = self.getRecord( packageURL ).getDetector()
+        self._detectors[ packageURL ] = detector
+
+        return detector
+
+
+    def getRecord( self, packageURL ):
         ProjectProperties.requireIsURL( packageURL )
 
         return self._cache[ packageURL ]
@@ -82,10 +111,10 @@ class MetaInfoCache( object ):
 
         result = set()
 
-        for candidateURL, detector in self._cache.items():
+        for candidateURL, record in self._cache.items():
             ProjectProperties.requireIsURL( candidateURL )
 
-            if packageURL in detector.dependencies:
+            if packageURL in record.dependencies:
                 result.add( candidateURL )
 
         return result
@@ -94,7 +123,8 @@ class MetaInfoCache( object ):
     def setCache( self, cache ):
         FastScript.requireIsDict( cache )
 
-        self._cache = cache
+        self._cache     = cache
+        self._detectors = {}
 
 
 # EOF
@@ -41,8 +41,8 @@ import shutil
 
 from ToolBOSCore.Packages.PackageDetector   import PackageDetector
 from ToolBOSCore.Packages.ProjectProperties import requireIsCanonicalPath
-from ToolBOSCore.Storage                    import SIT
-from ToolBOSCore.Storage.BashSrc            import BashSrcWriter
+from ToolBOSCore.Storage                    import SIT, SITJournal
+from ToolBOSCore.Storage.BashSrc            import BashSrcWriter, FlatBashSrcWriter
 from ToolBOSCore.Storage.PackageVar         import PackageVarCmakeWriter
 from ToolBOSCore.Storage.PkgInfoWriter      import PkgInfoWriter
 from ToolBOSCore.Util                       import FastScript
@@ -86,6 +86,17 @@ def makeShellfiles( projectRoot ):
     else:
         BashSrcWriter( details ).write( './install/BashSrc'    )
 
+        # pre-resolved environment of all dependencies, to speed-up sourcing
+        # (requires the dependencies to be installed, otherwise the BashSrc
+        # falls back to sourcing them recursively)
+        FastScript.remove( './install/BashSrc.flat' )
+
+        if details.inheritedProjects:
+            try:
+                FlatBashSrcWriter( details ).write( './install/BashSrc.flat' )
+            except ( AssertionError, EnvironmentError ) as e:
+                logging.debug( 'not generating BashSrc.flat: %s', e )
+
     # Note: pkgInfo.py is always generated (merged)
     PkgInfoWriter( details ).write( './install/pkgInfo.py' )
 
@@ -135,8 +146,15 @@ def uninstall( canonicalPath, cleanGlobalInstallation, dryRun=False ):
 
     if cleanGlobalInstallation:
         logging.info( 'cleaning global-installation' )
+
+        if not dryRun:
+            SITJournal.beginChange( sitRootPath, canonicalPath )
+
         FastScript.remove( installRoot_root, dryRun )
 
+        if not dryRun:
+            SITJournal.addEntry( sitRootPath, 'uninstall', canonicalPath )
+
 
 def randomizeValidityFlags():
     """
@@ -34,6 +34,7 @@
 #
 
 
+import functools
 import logging
 import os
 import subprocess
@@ -43,6 +44,7 @@ from ToolBOSCore.Platforms       import Platforms
 from ToolBOSCore.Storage         import CMakeLists
 from ToolBOSCore.Storage.PkgInfo import getPkgInfoContent
 from ToolBOSCore.Util            import FastScript
+from ToolBOSCore.Util            import FileInventory
 
 
 class PackageDetector( object ) :
@@ -53,9 +55,18 @@ class PackageDetector( object ) :
         To avoid repetitive reads of the pkgInfo.py file, you may cache
         its values in a dict and provide it as parameter. This may improve
         performance by avoiding redundant file I/O.
+
+        Properties such as the directory names, the package category or
+        the current user are determined upon first access only.
+
+        With 'lightweight=True' the user- and VCS-related lookups are
+        skipped entirely (userName equals userAccount, maintainer and
+        Git info stay None), e.g. for bulk-scanning SIT packages.
+        Only the pkgInfo.py gets read then, not the CMakeLists.txt, so
+        the category is determined from the SIT path.
     """
 
-    def __init__( self, projectRoot=None, pkgInfoContent=None ):
+    def __init__( self, projectRoot=None, pkgInfoContent=None, lightweight=False ):
         if not projectRoot:
             projectRoot = ProjectProperties.detectTopLevelDir()
 
@@ -67,14 +78,14 @@ class PackageDetector( object ) :
         if pkgInfoContent is not None:
             FastScript.requireIsDict( pkgInfoContent )
 
+        FastScript.requireIsBool( lightweight )
+
+        self._lightweight      = lightweight
 
         # general meta-info
-        self.canonicalPath     = None
-        self.cmakelistsContent = None
         self.hasCMakeLists     = None
         self.installRoot       = None
         self.isDeprecated      = None
-        self.packageCategory   = None
         self.packageName       = None
         self.packageVersion    = None   # e.g. "2.0"
         self.packageVersionRaw = None   # e.g. "2.0-rc3" (corresponds to dir.name)
@@ -126,17 +137,12 @@ class PackageDetector( object ) :
         self.vcsRevision       = None
         self.vcsRoot           = None
 
-        # current user (likely the maintainer when working on source tree)
-        self.userAccount       = None
-        self.userName          = None
-
         # maintainer (filesystem owner when accessing SIT packages)
         self.maintainerAccount = None
         self.maintainerName    = None
 
 
-        cmakePath              = os.path.join( projectRoot, 'CMakeLists.txt' )
-        self.hasCMakeLists     = os.path.exists( cmakePath )
+        self.hasCMakeLists     = os.path.exists( os.path.join( projectRoot, 'CMakeLists.txt' ) )
         self.buildCommand      = None
 
         self.topLevelDir       = projectRoot
@@ -145,63 +151,148 @@ class PackageDetector( object ) :
         self.packageVersionRaw = ProjectProperties.getPackageVersion( self.topLevelDir, True )
         self.versionTokens     = ProjectProperties.splitVersion( self.packageVersionRaw )
 
+        self.scripts           = {}
+
+        # FastScript.requireIsTextNonEmpty( self.maintainerAccount ) # might be empty
+        # FastScript.requireIsTextNonEmpty( self.maintainerName )    # might be empty
         FastScript.requireIsTextNonEmpty( self.packageName )
         FastScript.requireIsTextNonEmpty( self.packageVersion )
+        FastScript.requireIsTextNonEmpty( self.packageVersionRaw )
+        FastScript.requireIsTextNonEmpty( self.topLevelDir )
 
 
-        # compute typical directory names (may not be present!)
-        hostPlatform           = Platforms.getHostPlatform()
-        FastScript.requireIsTextNonEmpty( hostPlatform )
+    #------------------------------------------------------------------------
+    # Lazily computed properties
+    #------------------------------------------------------------------------
 
-        self.binDir            = os.path.join( self.topLevelDir, 'bin' )
-        self.binDirArch        = os.path.join( self.topLevelDir, 'bin', hostPlatform )
-        self.buildDir          = os.path.join( self.topLevelDir, 'build' )
-        self.buildDirArch      = os.path.join( self.topLevelDir, 'build', hostPlatform )
-        self.examplesDir       = os.path.join( self.topLevelDir, 'examples' )
-        self.examplesDirArch   = os.path.join( self.topLevelDir, 'examples', hostPlatform )
-        self.includeDir        = os.path.join( self.topLevelDir, 'include' )
-        self.installDir        = os.path.join( self.topLevelDir, 'install' )
-        self.libDir            = os.path.join( self.topLevelDir, 'lib' )
-        self.libDirArch        = os.path.join( self.topLevelDir, 'lib', hostPlatform )
-        self.srcDir            = os.path.join( self.topLevelDir, 'src' )
-        self.testDir           = os.path.join( self.topLevelDir, 'test' )
-        self.testDirArch       = os.path.join( self.topLevelDir, 'test', hostPlatform )
 
-        self.scripts           = {}
+    @functools.cached_property
+    def canonicalPath( self ):
+        if self.packageCategory:
+            return os.path.join( self.packageCategory,
+                                 self.packageName,
+                                 self.packageVersion )
+        else:
+            return None
 
-        if self.hasCMakeLists:
+
+    @functools.cached_property
+    def cmakelistsContent( self ):
+        if self.hasCMakeLists and not self._lightweight:
             # source tree, C/C++ package
-            self.cmakelistsContent = FastScript.getFileContent( cmakePath )
+            return FastScript.getFileContent( os.path.join( self.topLevelDir,
+                                                            'CMakeLists.txt' ) )
+        else:
+            # source tree w/o CMakeLists.txt, package installed in SIT,
+            # or lightweight mode
+            return None
+
+
+    @functools.cached_property
+    def hostPlatform( self ):
+        hostPlatform = Platforms.getHostPlatform()
+        FastScript.requireIsTextNonEmpty( hostPlatform )
+
+        return hostPlatform
+
 
+    @functools.cached_property
+    def packageCategory( self ):
+        if self.hasCMakeLists and not self._lightweight:
             if self.cmakelistsContent:
-                self.packageCategory = CMakeLists.getCategory( self.cmakelistsContent )
+                return CMakeLists.getCategory( self.cmakelistsContent )
             else:
-                logging.debug( 'skipping empty %s', cmakePath )
+                logging.debug( 'skipping empty %s/CMakeLists.txt', self.topLevelDir )
+                return None
 
-        else:
-            # source tree w/o CMakeLists.txt, or package installed in SIT
-            self.cmakelistsContent = None
+        try:
+            return ProjectProperties.getPackageCategoryFromPath( self.topLevelDir )
+        except AssertionError:
+            raise AssertionError( 'unable to detect package category' )
 
-            try:
-                self.packageCategory = ProjectProperties.getPackageCategoryFromPath( projectRoot )
-            except AssertionError:
-                raise AssertionError( 'unable to detect package category' )
 
-        if self.packageCategory:
-            self.canonicalPath      = os.path.join( self.packageCategory,
-                                                    self.packageName,
-                                                    self.packageVersion )
+    @functools.cached_property
+    def userAccount( self ):
+        # current user (likely the maintainer when working on source tree)
+        userAccount = FastScript.getCurrentUserName()
+        FastScript.requireIsTextNonEmpty( userAccount )
 
-        self._retrieveCurrentUser()
+        return userAccount
+
+
+    @functools.cached_property
+    def userName( self ):
+        if self._lightweight:
+            return self.userAccount
+
+        return FastScript.getCurrentUserFullName() or self.userAccount
+
+
+    # compute typical directory names (may not be present!)
+
+    @functools.cached_property
+    def binDir( self ):
+        return os.path.join( self.topLevelDir, 'bin' )
+
+
+    @functools.cached_property
+    def binDirArch( self ):
+        return os.path.join( self.topLevelDir, 'bin', self.hostPlatform )
+
+
+    @functools.cached_property
+    def buildDir( self ):
+        return os.path.join( self.topLevelDir, 'build' )
+
+
+    @functools.cached_property
+    def buildDirArch( self ):
+        return os.path.join( self.topLevelDir, 'build', self.hostPlatform )
 
-        # FastScript.requireIsTextNonEmpty( self.maintainerAccount ) # might be empty
-        # FastScript.requireIsTextNonEmpty( self.maintainerName )    # might be empty
-        FastScript.requireIsTextNonEmpty( self.packageName )
-        FastScript.requireIsTextNonEmpty( self.packageVersion )
-        FastScript.requireIsTextNonEmpty( self.packageVersionRaw )
-        FastScript.requireIsTextNonEmpty( self.topLevelDir )
-        FastScript.requireIsTextNonEmpty( self.userAccount )
-        FastScript.requireIsTextNonEmpty( self.userName )
+
+    @functools.cached_property
+    def examplesDir( self ):
+        return os.path.join( self.topLevelDir, 'examples' )
+
+
+    @functools.cached_property
+    def examplesDirArch( self ):
+        return os.path.join( self.topLevelDir, 'examples', self.hostPlatform )
+
+
+    @functools.cached_property
+    def includeDir( self ):
+        return os.path.join( self.topLevelDir, 'include' )
+
+
+    @functools.cached_property
+    def installDir( self ):
+        return os.path.join( self.topLevelDir, 'install' )
+
+
+    @functools.cached_property
+    def libDir( self ):
+        return os.path.join( self.topLevelDir, 'lib' )
+
+
+    @functools.cached_property
+    def libDirArch( self ):
+        return os.path.join( self.topLevelDir, 'lib', self.hostPlatform )
+
+
+    @functools.cached_property
+    def srcDir( self ):
+        return os.path.join( self.topLevelDir, 'src' )
+
+
+    @functools.cached_property
+    def testDir( self ):
+        return os.path.join( self.topLevelDir, 'test' )
+
+
+    @functools.cached_property
+    def testDirArch( self ):
+        return os.path.join( self.topLevelDir, 'test', self.hostPlatform )
 
 
     #------------------------------------------------------------------------
@@ -209,6 +300,18 @@ class PackageDetector( object ) :
     #------------------------------------------------------------------------
 
 
+    def detectCategory( self ):
+        """
+            Returns the SIT category of the package, or None if not
+            specified in CMakeLists.txt. Throws an AssertionError if it
+            cannot be detected at all.
+
+            Otherwise the category is detected upon first access of
+            'packageCategory' only.
+        """
+        return self.packageCategory
+
+
     def isExternal( self ):
         """
             Returns 'True' if the package is an open source or commercial
@@ -251,13 +354,11 @@ class PackageDetector( object ) :
             return False
 
         else:
-            logging.info( 'searching in filesystem' )
-
-            for directory in dirs:
-                hasCFile   = self._search( directory, '.c' )
-                hasCppFile = self._search( directory, '.cpp' )
+            inventory = self._getFileInventory()
 
-                if hasCFile or hasCppFile:
+            for directory in ( 'bin', 'examples', 'test' ):
+                if inventory.hasFiles( '.c',   directory ) or \
+                   inventory.hasFiles( '.cpp', directory ):
                     return True
 
             return False
@@ -287,7 +388,7 @@ class PackageDetector( object ) :
             file isn't considered a Python module.
         """
         if files is None:
-            files = FastScript.getFilesInDirRecursive( '.' )
+            files = self._getFileInventory().getFiles( '.py' )
 
         FastScript.requireIsIterable( files )
 
@@ -304,7 +405,7 @@ class PackageDetector( object ) :
             Returns True if it finds an __init__.py file anywhere within the
             package.
         """
-        return self._search( self.topLevelDir, '__init__.py' )
+        return self._getFileInventory().hasFiles( '__init__.py' )
 
 
     #------------------------------------------------------------------------
@@ -360,7 +461,13 @@ class PackageDetector( object ) :
 
             This function needs to be called before accessing the
             corresponding member fields.
+
+            In lightweight mode, this does nothing.
         """
+        if self._lightweight:
+            logging.debug( 'lightweight mode: skipping VCS lookup' )
+            return
+
         self._retrieveGitInfo()
 
         if self.gitFound:
@@ -426,11 +533,7 @@ class PackageDetector( object ) :
 
     def _parseCMakeLists( self ):
         if self.hasCMakeLists:
-            filename          = os.path.join( self.topLevelDir, 'CMakeLists.txt' )
-            logging.debug( 'reading %s', filename )
-
-            content           = FastScript.getFileContent( filename )
-            self.dependencies = CMakeLists.getDependencies( content )
+            self.dependencies = CMakeLists.getDependencies( self.cmakelistsContent )
 
 
     def _parsePkgInfo( self ):
@@ -531,15 +634,11 @@ class PackageDetector( object ) :
                          'invalid value of "installMode" in pkgInfo.py' )
 
 
-    def _retrieveCurrentUser( self ):
-        self.userAccount = FastScript.getCurrentUserName()
-        self.userName    = FastScript.getCurrentUserFullName()
-
-        if not self.userName:
-            self.userName = self.userAccount
-
-
     def retrieveMaintainer( self ):
+        if self._lightweight:
+            logging.debug( 'lightweight mode: skipping maintainer lookup' )
+            return
+
         try:
             data = self.pkgInfoContent[ 'maintainer' ]
         except ( KeyError, TypeError ):     # TypeError: pkgInfo might be None
@@ -615,6 +714,14 @@ class PackageDetector( object ) :
         return os.path.exists( path )
 
 
+    def _getFileInventory( self ):
+        """
+            Returns the (shared) inventory of all files within the package,
+            used to answer the content-type queries with a single scan.
+        """
+        return FileInventory.getFileInventory( self.topLevelDir )
+
+
     def _hasSourceFiles( self, extension ):
         """
             Searches in the "src" directory (and below) for files named
@@ -625,7 +732,7 @@ class PackageDetector( object ) :
 
             Note that a 'dot' needs to be provided if desired.
         """
-        return self._search( os.path.join( self.topLevelDir, 'src' ), extension )
+        return self._getFileInventory().hasFiles( extension, 'src' )
 
 
     def _replace( self, string, substMap ):
@@ -646,24 +753,4 @@ class PackageDetector( object ) :
         return resultList
 
 
-    def _search( self, path, extension ):
-        """
-            Searches in 'path' (and below) for files named "*extension"
-            and returns True/False if found, e.g.:
-
-                if search( path, '.py' ) == True:
-                    ...
-
-            Note that a 'dot' needs to be provided if desired.
-        """
-        logging.debug( 'searching in %s for *%s files', path, extension )
-
-        for path, dirs, files in os.walk( path ):
-            for fileName in files:
-                if fileName.endswith( extension ):
-                    return True
-
-        return False
-
-
 # EOF
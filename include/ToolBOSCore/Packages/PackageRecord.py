@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+#  Compact, immutable summary of a package's meta-information
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+
+import sys
+
+from ToolBOSCore.Util import FastScript
+
+
+class PackageRecord( object ):
+    """
+        Lightweight, read-only subset of the PackageDetector information
+        (canonical path, version, dependencies), e.g. to hold thousands of
+        SIT packages in memory at once.
+
+        Dependency URLs are interned, so that the same URL used by many
+        packages is stored only once.
+
+        The full PackageDetector can be obtained via getDetector(), which
+        re-reads the package information on demand.
+    """
+
+    __slots__ = ( 'canonicalPath', 'topLevelDir', 'versionTokens',
+                  'dependencies', 'dependsArch',
+                  'buildDependencies', 'buildDependsArch',
+                  'recommendations', 'suggestions',
+                  'hasCMakeLists' )
+
+
+    def __init__( self, canonicalPath, topLevelDir, versionTokens=(),
+                  dependencies=(), dependsArch=(),
+                  buildDependencies=(), buildDependsArch=(),
+                  recommendations=(), suggestions=(),
+                  hasCMakeLists=False ):
+
+        FastScript.requireIsTextNonEmpty( topLevelDir )
+
+        # '*Arch' settings are stored as tuples of ( platform, URLs ) pairs
+        if isinstance( dependsArch, dict ):
+            dependsArch = _internMapping( dependsArch )
+
+        if isinstance( buildDependsArch, dict ):
+            buildDependsArch = _internMapping( buildDependsArch )
+
+        init = super( PackageRecord, self ).__setattr__
+
+        init( 'canonicalPath',     canonicalPath )
+        init( 'topLevelDir',       topLevelDir )
+        init( 'versionTokens',     tuple( versionTokens ) )
+        init( 'dependencies',      _internList( dependencies ) )
+        init( 'dependsArch',       tuple( dependsArch ) )
+        init( 'buildDependencies', _internList( buildDependencies ) )
+        init( 'buildDependsArch',  tuple( buildDependsArch ) )
+        init( 'recommendations',   _internList( recommendations ) )
+        init( 'suggestions',       _internList( suggestions ) )
+        init( 'hasCMakeLists',     bool( hasCMakeLists ) )
+
+
+    @classmethod
+    def fromDetector( cls, detector ):
+        """
+            Creates a PackageRecord from a PackageDetector on which
+            retrieveMakefileInfo() has been called.
+        """
+        return cls( detector.canonicalPath,
+                    detector.topLevelDir,
+                    detector.versionTokens or (),
+                    detector.dependencies,
+                    detector.dependsArch or {},
+                    detector.buildDependencies,
+                    detector.buildDependsArch or {},
+                    detector.recommendations,
+                    detector.suggestions,
+                    detector.hasCMakeLists )
+
+
+    def getBuildDependencies( self, platform=None ):
+        """
+            Returns the build-dependencies incl. the ones specific for
+            the given platform (if any).
+        """
+        return self.buildDependencies + self._lookupArch( self.buildDependsArch, platform )
+
+
+    def getDependencies( self, platform=None ):
+        """
+            Returns the dependencies incl. the ones specific for the
+            given platform (if any).
+        """
+        return self.dependencies + self._lookupArch( self.dependsArch, platform )
+
+
+    def getDetector( self ):
+        """
+            Creates a full PackageDetector for this package, with
+            retrieveMakefileInfo() already called.
+        """
+        from ToolBOSCore.Packages.PackageDetector import PackageDetector
+
+        detector = PackageDetector( self.topLevelDir )
+        detector.retrieveMakefileInfo()
+
+        return detector
+
+
+    def __eq__( self, other ):
+        if not isinstance( other, PackageRecord ):
+            return NotImplemented
+
+        return self._getValues() == other._getValues()
+
+
+    def __hash__( self ):
+        return hash( self._getValues() )
+
+
+    def __reduce__( self ):
+        # needed for pickling since attributes can't be set afterwards
+        return self.__class__, self._getValues()
+
+
+    def __repr__( self ):
+        return '<PackageRecord %s>' % ( self.canonicalPath or self.topLevelDir )
+
+
+    def __setattr__( self, name, value ):
+        raise AttributeError( 'PackageRecord is read-only' )
+
+
+    def __delattr__( self, name ):
+        raise AttributeError( 'PackageRecord is read-only' )
+
+
+    def _getValues( self ):
+        return tuple( getattr( self, name ) for name in self.__slots__ )
+
+
+    @staticmethod
+    def _lookupArch( mapping, platform ):
+        if platform:
+            for key, value in mapping:
+                if key == platform:
+                    return value
+
+        return ()
+
+
+def _internList( urls ):
+    return tuple( sys.intern( url ) if isinstance( url, str ) else url
+                  for url in urls )
+
+
+def _internMapping( mapping ):
+    return tuple( ( key, _internList( mapping[ key ] ) )
+                  for key in sorted( mapping ) )
+
+
+# EOF
@@ -54,8 +54,8 @@ from ToolBOSCore.Util    import FastScript
 
 missingPkgMsg            = '[ATTENTION: PACKAGE MISSING OR PERMISSION DENIED]'
 
-_regExpCanonicalPathUnix = None
-_regExpCanonicalPathWin  = None
+_regExpCanonicalPathUnix = re.compile( r'^\w+\S*/\S+/\d+\.\d+$' )
+_regExpCanonicalPathWin  = re.compile( r'^\w+\S*\\\\\S+\\\\\d+\.\d+$' )
 
 _sitPkgCache             = None
 
@@ -73,15 +73,6 @@ def isCanonicalPath( path ):
     """
     FastScript.requireIsTextNonEmpty( path )
 
-    global _regExpCanonicalPathUnix
-    global _regExpCanonicalPathWin
-
-    #if not _regExpCanonicalPathUnix:
-    _regExpCanonicalPathUnix = re.compile( r'^\w+\S*/\S+/\d+\.\d+$' )
-
-    #if not _regExpCanonicalPathWin:
-    _regExpCanonicalPathWin = re.compile( r'^\w+\S*\\\\\S+\\\\\d+\.\d+$' )
-
     if _regExpCanonicalPathUnix.match( path ) or \
         _regExpCanonicalPathWin.match( path ):
         return True
@@ -413,9 +404,11 @@ def isInstalled_sitPackage( package, sitPath ):
 
     try:
         installed                   = _sitPkgCache[ installRoot ]
+        FastScript.countCacheAccess( 'sitPkgCache', True )
     except KeyError:
         installed                   = os.path.isdir( installRoot )
         _sitPkgCache[ installRoot ] = installed
+        FastScript.countCacheAccess( 'sitPkgCache', False )
 
     return installed
 
@@ -108,6 +108,8 @@ def isInstalled( packageName ):
 
     FastScript.requireIsTextNonEmpty( packageName )
 
+    FastScript.countCacheAccess( 'debPkgCache', bool( _debPkgCache ) )
+
     if not _debPkgCache:
         try:
             _debPkgCache = getSystemPackages()
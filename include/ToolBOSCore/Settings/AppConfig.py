@@ -35,11 +35,20 @@
 
 
 import logging
+import marshal
 import os
+import re
+import sys
 
 from ToolBOSCore.Util import FastScript
 
 
+# configfiles which (might) evaluate the environment of the process, the
+# merged settings then can't be re-used by other processes
+_envDependent = re.compile( r'\b(?:environ|getenv|getEnv|expanduser|expandvars|'
+                            r'getcwd|gethostname|getuser)\b' )
+
+
 class AppConfig( object ):
 
     def __init__( self, appName, defaultDir, userDir, machineDir='/etc',
@@ -62,6 +71,7 @@ class AppConfig( object ):
         self._userFile        = os.path.join( userDir,     fileName )
         self._cwdFile         = os.path.join( os.getcwd(), fileName )
         self._addFiles        = addFiles if addFiles is not None else []
+        self._snapshotFile    = os.path.join( userDir, '.%s.snapshot' % fileName )
 
         FastScript.requireIsFileNonEmpty( self._defaultFile )
 
@@ -298,7 +308,18 @@ class AppConfig( object ):
         order = self._getEvalOrder()
         order.reverse()
 
+        snapshotKey = self._getSnapshotKey( order )
+        cacheable   = True
+
+        if self._loadSnapshot( snapshotKey ):
+            return
+
         for filePath in order:
+            if cacheable and self._isEnvDependent( filePath ):
+                logging.debug( '%s: depends on environment, not creating settings snapshot',
+                               filePath )
+                cacheable = False
+
             fileSettings = self._readFile( filePath )
             FastScript.requireIsDict( fileSettings )
 
@@ -329,6 +350,110 @@ class AppConfig( object ):
 
         FastScript.requireIsDictNonEmpty( self._allSettings )
 
+        if cacheable:
+            self._saveSnapshot( snapshotKey )
+
+
+    def _isEnvDependent( self, filePath ):
+        """
+            Returns a boolean whether or not the configfile (possibly)
+            evaluates environment variables, the home directory, the
+            hostname etc. Its settings then are not only determined
+            by the file content, which is all the snapshot key covers.
+        """
+        try:
+            with open( filePath ) as f:
+                return bool( _envDependent.search( f.read() ) )
+
+        except OSError:
+            return False
+
+
+    def _getSnapshotKey( self, order ):
+        """
+            Returns a tuple identifying the current state of all configfiles
+            (path, mtime and size of each), used to check if the merged
+            settings snapshot is still up-to-date.
+
+            Non-existing files are represented by None regardless of their
+            path, so that the snapshot remains valid when changing to
+            another directory without a configfile.
+        """
+        key = [ sys.version_info[:2] ]
+
+        for filePath in order:
+            try:
+                st = os.stat( filePath )
+                key.append( ( filePath, st.st_mtime_ns, st.st_size ) )
+            except OSError:
+                key.append( None )
+
+        return tuple( key )
+
+
+    def _loadSnapshot( self, key ):
+        """
+            Loads the merged settings from the snapshot file, if it was
+            created for the same state of configfiles.
+
+            Returns a boolean whether or not the snapshot could be used.
+        """
+        try:
+            with open( self._snapshotFile, 'rb' ) as f:
+                snapshot = marshal.load( f )
+
+            if snapshot[0] != key:
+                return False
+
+            ( self._cwdSettings,
+              self._userSettings,
+              self._machineSettings,
+              self._defaultSettings,
+              self._allSettings ) = snapshot[1:]
+
+        except ( OSError, EOFError, ValueError, TypeError ):
+            return False
+
+        logging.debug( 'using settings snapshot %s', self._snapshotFile )
+
+        return True
+
+
+    def _saveSnapshot( self, key ):
+        """
+            Stores the merged settings so that subsequent processes do not
+            need to evaluate all configfiles again.
+
+            Settings which cannot be serialized (e.g. modules imported
+            within a configfile) disable the snapshot.
+        """
+        snapshot = ( key,
+                     self._cwdSettings,
+                     self._userSettings,
+                     self._machineSettings,
+                     self._defaultSettings,
+                     self._allSettings )
+
+        try:
+            content = marshal.dumps( snapshot )
+        except ValueError as details:
+            logging.debug( 'unable to create settings snapshot: %s', details )
+            return
+
+        tmpFile = '%s.%d' % ( self._snapshotFile, os.getpid() )
+
+        try:
+            FastScript.mkdir( os.path.dirname( self._snapshotFile ) )
+
+            with open( tmpFile, 'wb' ) as f:
+                f.write( content )
+
+            os.replace( tmpFile, self._snapshotFile )
+
+        except OSError as details:
+            logging.debug( 'unable to write settings snapshot: %s', details )
+            FastScript.remove( tmpFile, ignoreErrors=True )
+
 
 class AppConfigFactory( AppConfig ):
 
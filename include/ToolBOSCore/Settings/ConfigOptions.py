@@ -62,6 +62,10 @@ class ConfigOptions( object ):
         self._machineConfPath = os.path.join( machineConfDir, self._settingsFile )
         self._cwdConfPath     = os.path.join( cwdConfDir,     self._settingsFile )
 
+        # in-memory store of evaluated configfiles, to not exec them again
+        # upon each lookup: { filePath: ( ( mtime, size ), symbols ) }
+        self._layers          = {}
+
 
     def addPath( self, path ):
         FastScript.requireIsTextNonEmpty( path )
@@ -90,13 +94,7 @@ class ConfigOptions( object ):
         order.reverse()
 
         for fileName in order:
-            try:
-                fileSymbols = FastScript.execFile( fileName )
-                logging.debug( 'evaluating %s', fileName )
-            except( AssertionError, IOError, OSError ):
-                fileSymbols = {}
-
-            allSymbols.update( fileSymbols )
+            allSymbols.update( self._getLayer( fileName ) )
 
         result = {}
         for key, value in allSymbols.items():
@@ -125,19 +123,19 @@ class ConfigOptions( object ):
             If none of the files contains the specified variable,
             a key error will be thrown.
         """
-        FastScript.requireIsTextNonEmpty( varName )
+        return self._lookup( varName )[1]
 
-        for fileName in self._getEvalOrder( ):
-            try:
-                result = self._getConfigOptionFromFile( varName, fileName )
-
-                return result
 
-            except( AssertionError, IOError, KeyError, OSError ):
-                pass
+    def getConfigOptionSource( self, varName ):
+        """
+            Returns the path of the configfile which provides the effective
+            value of 'varName', e.g. to tell the user where a certain
+            setting comes from.
 
-        # nowhere found
-        raise KeyError( "Config option '%s' is nowhere set." % varName )
+            If none of the files contains the specified variable,
+            a key error will be thrown.
+        """
+        return self._lookup( varName )[0]
 
 
     def getUserConfigOptions( self ):
@@ -148,14 +146,9 @@ class ConfigOptions( object ):
             like in the current working directory or the system-wide or default
             configs.
         """
-        # read current settings (if any)
-        try:
-            config = FastScript.execFile( self._userConfPath )
-        except IOError as e:                     # no such file
-            logging.info( e )
-            config = {}
-
-        return config
+        # read current settings (if any), return a copy so that the caller
+        # can not accidentally modify the cached values
+        return dict( self._getLayer( self._userConfPath ) )
 
 
     def setUserConfigOption( self, varName, value ):
@@ -201,21 +194,66 @@ class ConfigOptions( object ):
                 logging.debug( 'rm %s', fileName )
                 FastScript.remove( fileName )
 
+                self._layers[ fileName ] = ( None, {} )
+
         except KeyError:
             logging.debug( '%s: No such user config option', varName )
 
 
-    def _getConfigOptionFromFile( self, varName, fileName ):
+    def _getLayer( self, fileName ):
+        """
+            Returns the symbols defined in the configfile 'fileName'.
+
+            The file is only evaluated again if its modification time or
+            size has changed since the last call. Non-existing or
+            unreadable files result in an empty dict.
+        """
+        FastScript.requireIsTextNonEmpty( fileName )
+
+        try:
+            st    = os.stat( fileName )
+            stamp = ( st.st_mtime_ns, st.st_size )
+        except OSError:
+            stamp = None
+
+        try:
+            cachedStamp, symbols = self._layers[ fileName ]
+
+            if cachedStamp == stamp:
+                return symbols
+
+        except KeyError:
+            pass
+
+        symbols = {}
+
+        if stamp is not None:
+            try:
+                symbols = FastScript.execFile( fileName )
+                logging.debug( 'evaluating %s', fileName )
+            except( AssertionError, IOError, OSError ):
+                pass
+
+        self._layers[ fileName ] = ( stamp, symbols )
+
+        return symbols
+
+
+    def _lookup( self, varName ):
         """
-            This function attempts to find a variable 'varName' defined in
-            the file 'fileName'.
+            Returns a tuple ( fileName, value ) with the effective value of
+            'varName' and the configfile it was found in.
         """
         FastScript.requireIsTextNonEmpty( varName )
-        FastScript.requireIsFileNonEmpty( fileName )
 
-        value = FastScript.execFile( fileName )[varName]
+        for fileName in self._getEvalOrder( ):
+            try:
+                return fileName, self._getLayer( fileName )[ varName ]
+            except KeyError:
+                pass
 
-        return value
+        # nowhere found
+        raise KeyError( "Config option '%s' is nowhere set." % varName )
 
 
     def _getEvalOrder( self ):
@@ -272,5 +310,10 @@ class ConfigOptions( object ):
         FastScript.mkdir( dirName )
         FastScript.setFileContent( self._userConfPath, content )
 
+        # keep in-memory store coherent without evaluating the file again
+        st = os.stat( self._userConfPath )
+        self._layers[ self._userConfPath ] = ( ( st.st_mtime_ns, st.st_size ),
+                                               dict( config ) )
+
 
 #EOF
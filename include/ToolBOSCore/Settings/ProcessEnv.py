@@ -41,13 +41,27 @@
 
 
 import logging
+import marshal
 import os
+import re
 import sys
 
 from ToolBOSCore.Packages        import PackageDetector, ProjectProperties
 from ToolBOSCore.Storage         import SIT
 from ToolBOSCore.Storage.PkgInfo import getPkgInfoContent
-from ToolBOSCore.Util            import FastScript
+from ToolBOSCore.Util            import FastScript, SearchPathIndex
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+_varExpr = re.compile( r'\$(?:(\w+)|\{([^}]*)\})' )
+
+# max. number of environment closures cached in ~/.HRI/ToolBOS/EnvCache,
+# the least-recently used ones get evicted
+envCacheSize = 256
 
 
 #----------------------------------------------------------------------------
@@ -78,6 +92,10 @@ def source( package ):
         Python equivalent of "source BashSrc" from SIT, in order to setup
         PATH, LD_LIBRARY_PATH,... within the Python process.
 
+        The environment settings of the package and all its dependencies
+        are collected upfront (see getEnvClosure()) and then applied at
+        once. Packages already listed in $TOOLBOSCORE_SOURCED are skipped.
+
         @anchor ProcessEnv_source
     """
     ProjectProperties.requireIsCanonicalPath( package )
@@ -86,62 +104,118 @@ def source( package ):
     FastScript.requireMsg( sourced, '$TOOLBOSCORE_SOURCED must not be empty' )
 
     # avoid double-sourcing
-    if package in sourced:
+    if package in sourced.split():
         return True
 
     ProjectProperties.requireIsInstalled( package )
 
-
-    logging.debug( 'source "${SIT}/' + package + '/BashSrc"   # actually pkgInfo.py' )
-    sourced = '%s %s' % ( package, sourced )
-    FastScript.setEnv( 'TOOLBOSCORE_SOURCED', sourced )
-
-
-    # load pkgInfo.py (if exists)
     try:
-        content = getPkgInfoContent( project=package )
-    except AssertionError:
-        return True             # no such file, this is OK
+        closure = getEnvClosure( package )
     except ( IOError, OSError ) as details:
         logging.error( details )
         return False
 
+    _applyEnvClosure( closure, sourced )
 
-    # setup environment of this package
-    try:
-        envVars = content['envVars']
-    except KeyError:
-        envVars = []            # no such setting, this is OK
+
+    # special treatment of PYTHONPATH:
+    # After sourcing add new entries in PYTHONPATH to sys.path
+    _expandSysPath()
+
+    return True
 
 
-    sitPath = SIT.getPath()
+def getEnvClosure( package, sitPath=None ):
+    """
+        Returns a list of ( canonicalPath, envVars ) tuples for the given
+        package and all its (recursive) SIT dependencies, in the same order
+        as BashSrc files would source them, with each package listed once.
 
-    for name, value in envVars:
+        '${INSTALL_ROOT}' is already replaced within the envVars, any other
+        variables get expanded when applying the settings.
 
-        # replace known placeholdes
-        value = value.replace( '${INSTALL_ROOT}',
-                               os.path.join( sitPath, package ) )
+        The result is cached on disk and only re-computed if any pkgInfo.py
+        within the dependency closure has changed.
+    """
+    ProjectProperties.requireIsCanonicalPath( package )
 
-        FastScript.setEnv_withExpansion( name, value )
+    if not sitPath:
+        sitPath = SIT.getPath()
 
+    cacheFile = _getEnvCacheFile( package, sitPath )
 
-    # source dependent packages
     try:
-        # TODO: eventually extend to sourcing recommended/suggested packages
-        depList = content['depends']
-    except ( AssertionError, KeyError ):
-        depList = []            # no such setting, this is OK
+        with open( cacheFile, 'rb' ) as f:
+            stamps, closure = marshal.load( f )
 
-    for dep in depList:
-        if not dep.startswith( 'deb://' ):
-            source( SIT.strip( dep ) )
+        if all( _getPkgInfoStamp( path ) == stamp for path, stamp in stamps ):
+            logging.debug( 'using cached environment of %s', package )
 
+            # refresh timestamp so that LRU eviction keeps recently used files
+            try:
+                os.utime( cacheFile )
+            except OSError:
+                pass
 
-    # special treatment of PYTHONPATH:
-    # After sourcing add new entries in PYTHONPATH to sys.path
-    _expandSysPath()
+            return closure
 
-    return True
+    except ( OSError, EOFError, ValueError, TypeError ):
+        pass
+
+
+    closure   = []
+    stamps    = []
+    seen      = set()
+    cacheable = _collectEnvClosure( package, sitPath, closure, stamps, seen )
+
+    if cacheable:
+        tmpFile = '%s.%d' % ( cacheFile, os.getpid() )
+
+        try:
+            FastScript.mkdir( os.path.dirname( cacheFile ) )
+
+            with open( tmpFile, 'wb' ) as f:
+                marshal.dump( ( stamps, closure ), f )
+
+            os.replace( tmpFile, cacheFile )
+
+            evictEnvCache( os.path.dirname( cacheFile ), envCacheSize )
+
+        except OSError as details:
+            logging.debug( 'unable to cache environment: %s', details )
+
+    return closure
+
+
+def evictEnvCache( cacheDir, maxEntries ):
+    """
+        Removes least-recently used environment closures from <cacheDir>
+        until at most <maxEntries> remain. This includes temp. files left
+        over from aborted processes.
+
+        Returns the list of removed files.
+    """
+    FastScript.requireIsTextNonEmpty( cacheDir )
+    FastScript.requireIsInt( maxEntries )
+
+    entries = []
+
+    with os.scandir( cacheDir ) as it:
+        for entry in it:
+            try:
+                if entry.is_file():
+                    entries.append( ( entry.stat().st_mtime, entry.path ) )
+            except OSError:
+                pass                            # removed concurrently
+
+    entries.sort( reverse=True )                # most recently used first
+    removed = [ path for mtime, path in entries[ maxEntries: ] ]
+
+    for path in removed:
+        logging.debug( 'evicting %s from environment cache', path )
+        FastScript.remove( path )
+
+    return removed
 
 
 def sourceFromHere():
@@ -166,17 +240,25 @@ def sourceFromHere():
 def which( command ):
     """
         Python equivalent of the shell command "which <command>".
+
+        The directories in $PATH are indexed once and the results get
+        cached, see SearchPathIndex.
     """
     path = FastScript.getEnv( 'PATH' )
     FastScript.requireIsTextNonEmpty( path )
 
-    for item in path.split( ':' ):
-        candidate = os.path.join( item, command )
+    return SearchPathIndex.getSearchPathIndex( 'PATH' ).find( command )
+
 
-        if os.path.exists( candidate ):
-            return candidate
+def whichAll( commands ):
+    """
+        Bulk version of which(): Returns a dict mapping each command to
+        its path, or None if not found.
+    """
+    path = FastScript.getEnv( 'PATH' )
+    FastScript.requireIsTextNonEmpty( path )
 
-    return None
+    return SearchPathIndex.getSearchPathIndex( 'PATH' ).findAll( commands )
 
 
 def requireCommand( command:str ) -> None:
@@ -189,6 +271,136 @@ def requireCommand( command:str ) -> None:
         raise EnvironmentError( f'{command}: command not found' )
 
 
+def _applyEnvClosure( closure, sourced ):
+    """
+        Applies the envVars of all not-yet-sourced packages of the closure
+        to a copy of the environment, and finally updates the process
+        environment in one step.
+    """
+    env         = dict( os.environ )
+    sourcedList = sourced.split()
+    sourcedSet  = set( sourcedList )
+
+    for package, envVars in closure:
+        if package in sourcedSet:
+            continue
+
+        logging.debug( 'source "${SIT}/' + package + '/BashSrc"   # actually pkgInfo.py' )
+        sourcedSet.add( package )
+        sourcedList.insert( 0, package )
+
+        for name, value in envVars:
+            env[ name ] = _expandVars( value, env )
+            logging.debug( 'export %s="%s"', name, env[ name ] )
+
+    env[ 'TOOLBOSCORE_SOURCED' ] = ' '.join( sourcedList )
+
+    delta = { key: value for key, value in env.items()
+              if os.environ.get( key ) != value }
+
+    os.environ.update( delta )
+
+
+def _collectEnvClosure( package, sitPath, closure, stamps, seen ):
+    """
+        Recursively collects the envVars of 'package' and its dependencies
+        into 'closure', and the pkgInfo.py timestamps into 'stamps'.
+
+        Returns False if any pkgInfo.py could not be read, in which case
+        the result must not be cached.
+    """
+    if package in seen:
+        return True
+
+    seen.add( package )
+    ProjectProperties.requireIsInstalled( package )
+
+    installRoot = os.path.join( sitPath, package )
+    pkgInfoPath = os.path.join( installRoot, 'pkgInfo.py' )
+    stamps.append( ( pkgInfoPath, _getPkgInfoStamp( pkgInfoPath ) ) )
+
+
+    # load pkgInfo.py (if exists)
+    try:
+        content = getPkgInfoContent( filename=pkgInfoPath )
+    except AssertionError:
+        closure.append( ( package, [] ) )
+        return True             # no such file, this is OK
+    except ( IOError, OSError ) as details:
+        logging.error( details )
+        closure.append( ( package, [] ) )
+        return False
+
+
+    # setup environment of this package
+    try:
+        envVars = content['envVars']
+    except KeyError:
+        envVars = []            # no such setting, this is OK
+
+    # replace known placeholdes
+    envVars = [ ( name, value.replace( '${INSTALL_ROOT}', installRoot ) )
+                for name, value in envVars ]
+
+    closure.append( ( package, envVars ) )
+
+
+    # source dependent packages
+    try:
+        # TODO: eventually extend to sourcing recommended/suggested packages
+        depList = content['depends']
+    except ( AssertionError, KeyError ):
+        depList = []            # no such setting, this is OK
+
+    status = True
+
+    for dep in depList:
+        if not dep.startswith( 'deb://' ):
+            if not _collectEnvClosure( SIT.strip( dep ), sitPath,
+                                       closure, stamps, seen ):
+                status = False
+
+    return status
+
+
+def _expandVars( value, env ):
+    """
+        Like os.path.expandvars() but expands from the given dict instead
+        of the process environment. Unknown variables are left unchanged.
+    """
+    def replace( match ):
+        name = match.group( 1 ) or match.group( 2 )
+
+        return env.get( name, match.group( 0 ) )
+
+    return _varExpr.sub( replace, value )
+
+
+def _getEnvCacheFile( package, sitPath ):
+    """
+        Returns the path of the on-disk cache for the environment closure
+        of 'package' within 'sitPath'.
+    """
+    import hashlib
+
+    key = hashlib.sha1( ( '%s:%s' % ( sitPath, package ) ).encode() )
+
+    return os.path.join( os.path.expanduser( '~' ), '.HRI', 'ToolBOS',
+                         'EnvCache', key.hexdigest() )
+
+
+def _getPkgInfoStamp( path ):
+    """
+        Returns a tuple identifying the state of the given pkgInfo.py,
+        or None if it does not exist.
+    """
+    try:
+        st = os.stat( path )
+        return st.st_ino, st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
 def _expandSysPath():
     """
         Checks which entries of PYTHONPATH are not in sys.path, yet,
@@ -36,12 +36,26 @@
 
 import logging
 import os
+import re
 
 from ToolBOSCore.Packages import PackageDetector
 from ToolBOSCore.Storage  import SIT
 from ToolBOSCore.Util     import FastScript, TemplateEngine
 
 
+# first line of BashSrc files generated from BashSrc.mako, handcrafted ones
+# can not be flattened and get sourced as they are
+_generatedMarker = '# BashSrc auto-generated by ToolBOSCore'
+
+_projectExpr     = re.compile( r'^(PROJECT_NAME|FULL_VERSION|PROJECT_START_PATH)=.*$',
+                               re.MULTILINE )
+_depsExpr        = re.compile( r'^SIT_DEPENDENCIES=\((.*?)\)',
+                               re.MULTILINE | re.DOTALL )
+_blockExpr       = re.compile( r'^    export TOOLBOSCORE_SOURCED=.*?\n'
+                               r'(.*?)^    # source all dependencies',
+                               re.MULTILINE | re.DOTALL )
+
+
 class BashSrcWriter( object ):
 
     def __init__( self, details, overrides=None ):
@@ -91,4 +105,96 @@ class BashSrcWriter( object ):
         TemplateEngine.run( srcFile, dstFile, self.values )
 
 
+class FlatBashSrcWriter( object ):
+    """
+        Writes a "BashSrc.flat" file containing the environment settings
+        of all (recursive) dependencies, in the same order as the BashSrc
+        files would source each other, but with each package listed once.
+
+        The settings are taken from the dependencies' own BashSrc files
+        installed in the SIT. Handcrafted BashSrc files are not inlined,
+        instead they get sourced as they are.
+
+        The generated BashSrc uses this file instead of recursive sourcing,
+        unless any of the involved BashSrc files is newer than the flat file
+        or is not the same file anymore (e.g. the version symlink points to
+        another patchlevel). Installed files keep their original mtime,
+        hence the resolved paths are compared as well.
+    """
+
+    def __init__( self, details, sitPath=None ):
+        FastScript.require( isinstance( details, PackageDetector.PackageDetector ) )
+        FastScript.requireIsList( details.inheritedProjects )
+
+        self.details = details
+        self.sitPath = sitPath if sitPath else SIT.getPath()
+        self.entries = []
+
+
+    def collect( self ):
+        """
+            Parses the BashSrc files of all dependencies.
+
+            Throws an EnvironmentError if a dependency is not installed.
+        """
+        self.entries = []
+        seen         = { self.details.canonicalPath }
+
+        for package in self.details.inheritedProjects:
+            self._collect( package, seen )
+
+
+    def write( self, outputFile ):
+        self.collect()
+
+        logging.info( 'generating %s', os.path.relpath( outputFile, os.getcwd() ) )
+
+        srcFile = os.path.join( TemplateEngine.templateDir, 'BST', 'BashSrcFlat.mako' )
+        dstFile = outputFile
+        values  = { 'canonicalPath': self.details.canonicalPath,
+                    'entries'      : self.entries }
+
+        TemplateEngine.run( srcFile, dstFile, values )
+
+
+    def _collect( self, package, seen ):
+        if package in seen:
+            return
+
+        seen.add( package )
+
+        filePath = os.path.join( self.sitPath, package, 'BashSrc' )
+
+        try:
+            content = FastScript.getFileContent( filePath )
+        except ( AssertionError, IOError, OSError ):
+            raise EnvironmentError( '%s: No such file' % filePath )
+
+        blockMatch = _blockExpr.search( content )
+
+        realPath   = os.path.realpath( filePath )
+
+        if not content.startswith( _generatedMarker ) or not blockMatch:
+            logging.debug( '%s: handcrafted BashSrc, not inlining', package )
+            self.entries.append( { 'package' : package,
+                                   'realPath': realPath,
+                                   'inline'  : False } )
+            return
+
+        depsMatch = _depsExpr.search( content )
+        deps      = re.findall( r"'([^']+)'", depsMatch.group( 1 ) ) if depsMatch else []
+        block     = [ line.rstrip() for line in blockMatch.group( 1 ).splitlines()
+                      if line.strip() ]
+
+        self.entries.append( { 'package' : package,
+                               'realPath': realPath,
+                               'inline'  : True,
+                               'project' : [ m.group( 0 ) for m in
+                                             _projectExpr.finditer( content ) ],
+                               'block'   : block } )
+
+        for dep in deps:
+            self._collect( dep, seen )
+
+
 # EOF
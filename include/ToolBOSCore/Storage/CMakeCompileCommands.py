@@ -35,6 +35,8 @@
 
 
 import json
+import logging
+import os
 import shlex
 
 from ToolBOSCore.Util import FastScript
@@ -47,11 +49,17 @@ class CMakeCompileCommands:
             Creates an instance for accessing the specified CMake
             compile commands file, e.g. in case of BST.py found under
             'build/<platformName>/compile_commands.json'.
+
+            The file gets re-read automatically if it was modified
+            meanwhile (e.g. re-running CMake).
         """
         FastScript.requireIsFileNonEmpty( filePath )
         self._filePath = filePath
 
-        self._data = None
+        self._data     = None
+        self._index    = {}       # { sourceFile: entry }
+        self._args     = {}       # { sourceFile: [ compiler arguments ] }
+        self._stamp    = None
 
         self._loadFile()
 
@@ -66,19 +74,15 @@ class CMakeCompileCommands:
         """
         FastScript.requireIsFileNonEmpty( sourceFile )
 
-        for item in self._data:
-            # Each item in self._data is a JSON-encoded dictionary with 3 entries:
-            #
-            # item[0] == 'directory' == path to build directory
-            # item[1] == 'command'   == compiler command line
-            # item[2] == 'file'      == absolute path to sourcefile
-
-            itemAsDict = dict( item )
+        self._reloadIfModified()
 
-            if itemAsDict['file'] == sourceFile:
-                return itemAsDict['command']
+        entry = self._getEntry( sourceFile )
 
-        raise ValueError( '%s: No compile information found' % sourceFile )
+        try:
+            return entry['command']
+        except KeyError:
+            # newer CMake / other generators may use the 'arguments' form
+            return shlex.join( entry['arguments'] )
 
 
     def getDefinesAsString( self, sourceFile: str ) -> str:
@@ -94,14 +98,31 @@ class CMakeCompileCommands:
         """
         FastScript.requireIsFileNonEmpty( sourceFile )
 
-        command = self.getCompilerCommand( sourceFile )
-        result  = ''
+        self._reloadIfModified()
 
-        for candidate in shlex.split( command ):
-            if candidate.startswith( '-D' ):
-                result += candidate + ' '
+        return self._filterArguments( sourceFile, '-D' )
 
-        return result
+
+    def getDefinesForFiles( self, fileList ) -> dict:
+        """
+            Bulk version of getDefinesAsString(): Returns a dict mapping
+            each of the given sourcefiles to its defines-string, or None
+            if no information to this file are found.
+        """
+        FastScript.requireIsIterable( fileList )
+
+        self._reloadIfModified()
+
+        return self._filterArgumentsForFiles( fileList, '-D' )
+
+
+    def getFiles( self ) -> list:
+        """
+            Returns the list of sourcefiles with compile information.
+        """
+        self._reloadIfModified()
+
+        return [ self._getFilePath( entry ) for entry in self._data ]
 
 
     def getIncludePathsAsString( self, sourceFile: str ) -> str:
@@ -120,25 +141,137 @@ class CMakeCompileCommands:
         """
         FastScript.requireIsFileNonEmpty( sourceFile )
 
-        command = self.getCompilerCommand( sourceFile )
-        result  = ''
+        self._reloadIfModified()
+
+        return self._filterArguments( sourceFile, '-I' )
 
-        for candidate in shlex.split( command ):
-            if candidate.startswith( '-I' ):
+
+    def getIncludePathsForFiles( self, fileList ) -> dict:
+        """
+            Bulk version of getIncludePathsAsString(): Returns a dict
+            mapping each of the given sourcefiles to its include-paths
+            string, or None if no information to this file are found.
+        """
+        FastScript.requireIsIterable( fileList )
+
+        self._reloadIfModified()
+
+        return self._filterArgumentsForFiles( fileList, '-I' )
+
+
+    def _filterArguments( self, sourceFile, prefix ):
+        """
+            Returns the compiler arguments starting with 'prefix' as
+            space-separated string (with trailing space, if any).
+        """
+        result = ''
+
+        for candidate in self._getArguments( sourceFile ):
+            if candidate.startswith( prefix ):
                 result += candidate + ' '
 
         return result
 
 
+    def _filterArgumentsForFiles( self, fileList, prefix ):
+        result = {}
+
+        for sourceFile in fileList:
+            try:
+                result[ sourceFile ] = self._filterArguments( sourceFile, prefix )
+            except ValueError:
+                result[ sourceFile ] = None
+
+        return result
+
+
+    def _getArguments( self, sourceFile ):
+        """
+            Returns the compiler command of the sourcefile split into
+            its arguments. The result is cached.
+        """
+        try:
+            return self._args[ sourceFile ]
+        except KeyError:
+            pass
+
+        entry = self._getEntry( sourceFile )
+
+        try:
+            result = entry['arguments']
+        except KeyError:
+            result = shlex.split( entry['command'] )
+
+        self._args[ sourceFile ] = result
+
+        return result
+
+
+    def _getEntry( self, sourceFile ):
+        try:
+            return self._index[ sourceFile ]
+        except KeyError:
+            pass
+
+        try:
+            return self._index[ os.path.normpath( os.path.abspath( sourceFile ) ) ]
+        except KeyError:
+            raise ValueError( '%s: No compile information found' % sourceFile )
+
+
+    @staticmethod
+    def _getFilePath( entry ):
+        """
+            Returns the absolute path of the entry's sourcefile. Relative
+            paths are relative to the entry's build directory.
+        """
+        return os.path.normpath( os.path.join( entry.get( 'directory', '' ),
+                                               entry['file'] ) )
+
+
+    @staticmethod
+    def _getStamp( filePath ):
+        try:
+            stat = os.stat( filePath )
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+
     def _loadFile( self ):
         """
             Reads the JSON file and stores the data into a member variable.
+
+            Each entry in the file is a dictionary with these keys:
+
+              'directory' == path to build directory
+              'command'   == compiler command line (or 'arguments' list)
+              'file'      == path to sourcefile
+
+            All entries get indexed by their sourcefile. If a file is
+            listed several times, the first entry is used.
         """
+        self._stamp = self._getStamp( self._filePath )
+
         content    = FastScript.getFileContent( self._filePath )
         FastScript.requireIsTextNonEmpty( content )
 
         self._data = json.loads( content )
         FastScript.requireIsListNonEmpty( self._data )
 
+        self._index = {}
+        self._args  = {}
+
+        for entry in self._data:
+            self._index.setdefault( entry['file'], entry )
+            self._index.setdefault( self._getFilePath( entry ), entry )
+
+
+    def _reloadIfModified( self ):
+        if self._getStamp( self._filePath ) != self._stamp:
+            logging.debug( '%s: file modified, reloading', self._filePath )
+            self._loadFile()
+
 
 # EOF
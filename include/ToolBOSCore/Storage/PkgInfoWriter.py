@@ -36,7 +36,6 @@
 
 import io
 import os
-import pprint
 
 from ToolBOSCore.Packages import PackageDetector
 from ToolBOSCore.Storage  import AbstractWriter
@@ -61,6 +60,8 @@ class PkgInfoWriter( AbstractWriter.AbstractWriter ):
             if it should go into the source tree of the package.
             The stored fields vary depending on the target destination.
         """
+        import pprint
+
         FastScript.require( isinstance( details, PackageDetector.PackageDetector ) )
 
         super( PkgInfoWriter, self ).__init__( details )
@@ -39,6 +39,7 @@
 #----------------------------------------------------------------------------
 
 
+import collections
 import concurrent.futures
 import logging
 import os
@@ -46,10 +47,29 @@ import os.path
 import re
 import stat
 
-from ToolBOSCore.Storage import SIT
+from ToolBOSCore.Storage import SIT, SITJournal
 from ToolBOSCore.Util    import FastScript
 
 
+#----------------------------------------------------------------------------
+# Data types
+#----------------------------------------------------------------------------
+
+
+# A symlink within the proxy, with its absolute target path. 'isVersion'
+# indicates a link at version level, e.g. "Libraries/Spam/42.0" in which
+# case 'package' is its canonical path (otherwise None).
+
+BrokenLink = collections.namedtuple( 'BrokenLink',
+                                     ( 'path', 'target', 'isVersion', 'package' ) )
+
+_versionExpr = re.compile( r'^\d+\.\d+' )
+
+# number of directory levels scanned below a real directory at version
+# level (proxy installation)
+_installScanDepth = 1
+
+
 #----------------------------------------------------------------------------
 # Public functions
 #----------------------------------------------------------------------------
@@ -124,6 +144,36 @@ def findProxyInstallations( checkLinks = False ):
     return resultList
 
 
+def findBrokenLinks( sitProxy, maxWorkers=None ):
+    """
+        Returns a sorted list of BrokenLink records for all broken symlinks
+        below 'sitProxy', incl. symlinks to directories.
+
+        The scan follows the SIT layout: Symlinks at version level
+        (e.g. "Libraries/Spam/42.0") are checked but never descended,
+        and the 'parentTree' link is skipped.
+
+        The link targets are checked in a thread pool, grouped by their
+        parent directory which is read only once.
+    """
+    FastScript.requireIsTextNonEmpty( sitProxy )
+
+    links  = _collectLinks( sitProxy )
+    groups = {}
+    result = []
+
+    for link in links:
+        groups.setdefault( os.path.dirname( link.target ), [] ).append( link )
+
+    with concurrent.futures.ThreadPoolExecutor( maxWorkers ) as tp:
+        for brokenLinks in tp.map( _checkLinkTargets, groups.items() ):
+            result.extend( brokenLinks )
+
+    result.sort()
+
+    return result
+
+
 def updateProxyDir( removeBrokenSymlinks     = True,
                     removeEmptyCategories    = True,
                     linkNewPackagesIntoProxy = True,
@@ -131,10 +181,18 @@ def updateProxyDir( removeBrokenSymlinks     = True,
                     checkProxyLinkedVersion  = True,
                     removeProxyInstallations = False,
                     cleanHomeDirectory       = True,
-                    dryRun                   = False ):
+                    dryRun                   = False,
+                    fullResync               = False ):
     """
         Updates the SIT proxy directory of the current user.
 
+        By default only the packages listed in the change journal of the
+        root SIT since the last update are considered (see SITJournal).
+        A full rescan of both SIT trees is done if 'fullResync' is True,
+        if the proxy was never synchronized with the journal before, if
+        the journal is not usable (e.g. missing or rotated) or cannot be
+        trusted (see SITJournal.isJournalTrusted()).
+
         The user may influence which worker functions shall be called
         (default: all)
 
@@ -178,6 +236,7 @@ def updateProxyDir( removeBrokenSymlinks     = True,
     FastScript.requireIsBool( removeProxyInstallations )
     FastScript.requireIsBool( cleanHomeDirectory       )
     FastScript.requireIsBool( dryRun )
+    FastScript.requireIsBool( fullResync )
 
     FastScript.requireMsg( sitRoot != sitProxy,
                        '%s: Is not a proxy directory' % sitProxy )
@@ -209,6 +268,37 @@ def updateProxyDir( removeBrokenSymlinks     = True,
     if not pluginsEnabled:
         raise ValueError( 'Nothing to do. Please check your parameters.' )
 
+
+    # remember journal position before scanning, so that changes happening
+    # in the meantime will be considered at the next run
+    journalPosition = SITJournal.getJournalPosition( sitRoot )
+    treeStamp       = SITJournal.getTreeStamp( sitRoot )
+
+    if not fullResync and not removeProxyInstallations and \
+       SITJournal.isJournalTrusted( sitRoot, sitProxy, treeStamp ):
+        syncPosition   = SITJournal.getSyncPosition( sitProxy )
+        entries, newPosition = SITJournal.getEntries( sitRoot, syncPosition )
+
+        if entries is not None:
+            logging.info( 'applying %d change(s) from %s', len( entries ),
+                          os.path.join( sitRoot, SITJournal.journalFile ) )
+
+            proxyChanged = _applyJournalEntries( entries, sitRoot, sitProxy,
+                                                 pluginsEnabled, dryRun )
+
+            if cleanHomeDirectory:
+                _cleanHomeDirectory( [], [], sitRoot, sitProxy, dryRun )
+
+            SITJournal.setSyncPosition( sitProxy, newPosition, dryRun )
+
+            msg = 'Your proxy is up-to-date%s.' % ( ' now' if proxyChanged == True else '' )
+            logging.info( '' )
+            logging.info( msg )
+            return
+
+        logging.debug( 'no usable journal position, doing full resync' )
+
+
     with concurrent.futures.ThreadPoolExecutor() as tp:
         tp.submit( SIT.getProjectsWithErrorHandling, sitRoot, sitRootPkgList )
         tp.submit( SIT.getProjectsWithErrorHandling, sitProxy, sitProxyPkgList )
@@ -224,6 +314,9 @@ def updateProxyDir( removeBrokenSymlinks     = True,
         proxyChanged |= func( sitRootPkgList, sitProxyPkgList,
                               sitRoot, sitProxy, dryRun )
 
+    SITJournal.setSyncPosition( sitProxy, journalPosition, dryRun )
+    SITJournal.setFullSync( sitProxy, treeStamp, dryRun )
+
     msg = 'Your proxy is up-to-date%s.' % ( ' now' if proxyChanged == True else '' )
     logging.info( '' )
     logging.info( msg )
@@ -234,6 +327,150 @@ def updateProxyDir( removeBrokenSymlinks     = True,
 #----------------------------------------------------------------------------
 
 
+def _applyJournalEntries( entries, sitRoot, sitProxy, pluginsEnabled, dryRun ):
+    """
+        Incremental counterpart of the plugins: Only looks at the packages
+        listed in the journal entries, instead of scanning the whole trees.
+
+        Returns a boolean whether or not the proxy was changed.
+    """
+    requireIsProxyDir( sitProxy )
+
+    proxyChanged = False
+    changes      = {}
+
+    # only the last action per package is relevant
+    for action, canonicalPath in entries:
+        changes[ canonicalPath ] = action
+
+    for canonicalPath, action in sorted( changes.items() ):
+        logging.debug( 'journal: %s %s', action, canonicalPath )
+
+        if action == 'install':
+            if _linkNewPackagesIntoProxy in pluginsEnabled:
+                proxyChanged |= _linkVersionsIntoProxy( canonicalPath, sitRoot,
+                                                        sitProxy, dryRun )
+
+            if _checkProxyLinkTarget in pluginsEnabled:
+                _checkProxyLinkTarget( [ canonicalPath ], [ canonicalPath ],
+                                       sitRoot, sitProxy, dryRun )
+
+            if _checkProxyLinkedVersion in pluginsEnabled and not dryRun:
+                proxyChanged |= _checkProxyLinkedVersion( [ canonicalPath ],
+                                                          [ canonicalPath ],
+                                                          sitRoot, sitProxy,
+                                                          dryRun )
+
+        else:
+            if _removeBrokenSymlinks in pluginsEnabled:
+                proxyChanged |= _unlinkVersionsFromProxy( canonicalPath,
+                                                          sitProxy, dryRun )
+
+            if _removeEmptyCategories in pluginsEnabled:
+                proxyChanged |= _removeEmptyParents( canonicalPath,
+                                                     sitProxy, dryRun )
+
+    return proxyChanged
+
+
+def _getVersionEntries( pkgDir, version ):
+    """
+        Returns the entries within 'pkgDir' belonging to the given
+        2-digit version, e.g. "1.0" and patchlevels like "1.0.42".
+    """
+    try:
+        return [ entry for entry in os.listdir( pkgDir )
+                 if entry == version or entry.startswith( version + '.' ) ]
+    except OSError:
+        return []
+
+
+def _linkVersionsIntoProxy( canonicalPath, sitRoot, sitProxy, dryRun ):
+    """
+        Creates symlinks in the proxy for all versions / patchlevels of the
+        given package which are present in the root SIT but not yet in the
+        proxy.
+    """
+    pkgPath, version = os.path.split( canonicalPath )
+    pkgRootDir       = os.path.join( sitRoot,  pkgPath )
+    pkgProxyDir      = os.path.join( sitProxy, pkgPath )
+    proxyChanged     = False
+
+    for entry in sorted( _getVersionEntries( pkgRootDir, version ) ):
+        pkgRootPath  = os.path.join( pkgRootDir,  entry )
+        pkgProxyPath = os.path.join( pkgProxyDir, entry )
+
+        if os.path.lexists( pkgProxyPath ):
+            continue
+
+        if dryRun:
+            logging.info( '-- DRY RUN --   would link %s', SIT.strip( pkgProxyPath ) )
+            continue
+
+        FastScript.mkdir( pkgProxyDir )
+
+        try:
+            os.symlink( pkgRootPath, pkgProxyPath )
+            logging.info( 'linking %s', os.path.join( pkgPath, entry ) )
+            proxyChanged = True
+        except OSError as details:
+            logging.warning( details )
+
+    return proxyChanged
+
+
+def _unlinkVersionsFromProxy( canonicalPath, sitProxy, dryRun ):
+    """
+        Removes broken symlinks in the proxy pointing to versions /
+        patchlevels of the given (uninstalled) package.
+    """
+    pkgPath, version = os.path.split( canonicalPath )
+    pkgProxyDir      = os.path.join( sitProxy, pkgPath )
+    proxyChanged     = False
+
+    for entry in sorted( _getVersionEntries( pkgProxyDir, version ) ):
+        path = os.path.join( pkgProxyDir, entry )
+
+        if os.path.islink( path ) and not os.path.exists( path ):
+            if dryRun:
+                logging.info( '-- DRY RUN --   found broken symlink %s', path )
+            else:
+                logging.info( 'package was uninstalled: %s', SIT.strip( path ) )
+                os.remove( path )
+                proxyChanged = True
+
+    return proxyChanged
+
+
+def _removeEmptyParents( canonicalPath, sitProxy, dryRun ):
+    """
+        Removes the package- and category directories of the given package
+        within the proxy if they became empty.
+    """
+    whitelist    = ( os.path.join( sitProxy, 'Modules', 'Index' ), )
+    path         = os.path.dirname( os.path.join( sitProxy, canonicalPath ) )
+    proxyChanged = False
+
+    while path.startswith( sitProxy + os.sep ) and path not in whitelist:
+        try:
+            if os.listdir( path ):
+                break
+        except OSError:
+            break
+
+        if dryRun:
+            logging.info( '-- DRY RUN --   found empty dir. %s', path )
+            break
+
+        logging.info( 'rmdir %s', SIT.strip( path ) )
+        os.rmdir( path )
+        proxyChanged = True
+
+        path = os.path.dirname( path )
+
+    return proxyChanged
+
+
 def _getTreeDifferences( sitRootPkgList, sitProxyPkgList ):
     """
         Returns a list of packages that are installed in the global SIT
@@ -286,18 +523,18 @@ def _removeBrokenSymlinks( sitRootPkgList, sitProxyPkgList,
     requireIsProxyDir( sitProxy )
 
     logging.info( 'searching for broken symlinks...' )
-    brokenLinks = _findBrokenLinks( sitProxy )
+    brokenLinks = findBrokenLinks( sitProxy )
 
-    for path in brokenLinks:
+    for link in brokenLinks:
         if dryRun:
-            logging.info( '-- DRY RUN --   found broken symlink %s', path )
+            logging.info( '-- DRY RUN --   found broken symlink %s', link.path )
         else:
-            if path.endswith( '.py' ):
-                logging.info( 'deleting %s', path )
+            if link.isVersion:
+                logging.info( 'package was uninstalled: %s', link.package )
             else:
-                logging.info( 'package was uninstalled: %s', SIT.strip( path ) )
+                logging.info( 'deleting %s', link.path )
 
-            os.remove( path )
+            os.remove( link.path )
 
     return len(brokenLinks)
 
@@ -470,28 +707,105 @@ def _cleanHomeDirectory( sitRootPkgList, sitProxyPkgList,
     return False
 
 
-def _findBrokenLinks( sitProxy ):
+def _collectLinks( sitProxy ):
     """
-        Returns a list of broken symlinks below 'sitProxy'.
+        Returns a list of BrokenLink candidates, i.e. all symlinks within
+        the proxy regardless of their target.
+
+        Only the SIT layout (categories, packages and versions) is
+        scanned, plus the top-level entries of real directories at
+        version level (proxy installations), see _installScanDepth.
+        Symlinks are never followed.
     """
-    resultList = []
+    result = []
+    stack  = [ ( sitProxy, None ) ]       # levels left below version level
 
-    for root, dirs, files in os.walk( sitProxy ):
-        for fileName in files:
-            path = os.path.join( root, fileName )
+    while stack:
+        dirPath, levelsLeft = stack.pop()
 
-            if os.path.islink( path ):
-                try:
+        try:
+            it = os.scandir( dirPath )
+        except OSError as details:
+            logging.debug( details )
+            continue
 
-                    target = os.path.realpath( path )
+        with it:
+            for entry in it:
+                if dirPath == sitProxy and entry.name == SIT.parentLink:
+                    continue
 
-                    if not os.path.exists( target ):
-                        resultList.append( path )
+                isVersion = levelsLeft is None and bool( _versionExpr.match( entry.name ) )
 
-                except OSError as details:
-                    logging.debug( 'unable to read symlink: %s', details )
+                if entry.is_symlink():
+                    try:
+                        target = os.readlink( entry.path )
+                    except OSError as details:
+                        logging.debug( 'unable to read symlink: %s', details )
+                        continue
 
-    return resultList
+                    target  = os.path.join( dirPath, target )
+                    package = os.path.relpath( entry.path, sitProxy ) if isVersion else None
+
+                    # strip trailing slashes etc., otherwise the target is
+                    # not found in its parent directory, but leave '..' to
+                    # the OS as there might be symlinks in between
+                    if '..' not in target.split( os.sep ):
+                        target = os.path.normpath( target )
+
+                    result.append( BrokenLink( entry.path, target,
+                                               isVersion, package ) )
+
+                elif entry.is_dir( follow_symlinks=False ):
+                    if isVersion:
+                        childLevels = _installScanDepth - 1
+                    elif levelsLeft is None:
+                        childLevels = None
+                    else:
+                        childLevels = levelsLeft - 1
+
+                    if childLevels is None or childLevels >= 0:
+                        stack.append( ( entry.path, childLevels ) )
+
+    return result
+
+
+def _checkLinkTargets( group ):
+    """
+        Checks the symlinks of one target directory, returns the list
+        of broken ones.
+
+        The target directory is listed only once. Only if the target
+        itself is a symlink again, it gets resolved individually.
+    """
+    targetDir, links = group
+
+    try:
+        with os.scandir( targetDir ) as it:
+            listing = { entry.name: entry.is_symlink() for entry in it }
+
+    except ( FileNotFoundError, NotADirectoryError ):
+        return links                     # target directory does not exist
+
+    except OSError as details:
+        # e.g. execute-only directories of restricted packages can't be
+        # listed, but the links into them can still be resolved
+        logging.debug( details )
+        return [ link for link in links if not os.path.exists( link.path ) ]
+
+    result = []
+
+    for link in links:
+        name = os.path.basename( link.target )
+
+        if '..' in link.target.split( os.sep ) or listing.get( name, False ):
+            # relative path components or chained symlinks: resolve
+            if not os.path.exists( link.path ):
+                result.append( link )
+
+        elif name not in listing:
+            result.append( link )
+
+    return result
 
 
 # EOF
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+#
+#  Journal of global (un-)installations in the root SIT
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import fcntl
+import logging
+import os
+import time
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# journal within the root SIT, appended upon each global (un-)installation
+journalFile  = '.changes.journal'
+
+# last-synced journal position within the proxy SIT
+positionFile = '.changes.position'
+
+# state of the root SIT at the last full resync of the proxy SIT
+fullSyncFile = '.changes.fullsync'
+
+# max. age (in seconds) of the last full resync, afterwards the proxy SIT
+# gets fully resynchronized again regardless of the journal
+maxSyncAge   = 24 * 3600
+
+# 'resync' entries request a full resync of all proxy SITs, written if
+# the root SIT was found modified without journal entry
+actions      = ( 'install', 'uninstall', 'resync' )
+
+# number of bytes read from the end of the journal to find the last entry
+_tailSize    = 4096
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def addEntry( sitRoot, action, canonicalPath ):
+    """
+        Appends a line to the change journal of the given root SIT,
+        e.g. after a package has been installed globally. The line
+        includes the resulting tree stamp (see getTreeStamp()).
+
+        Failing to write the journal is not considered fatal (the proxy
+        directories will then do a full resync next time), hence only a
+        warning is shown.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+    FastScript.requireIsIn( action, actions )
+    FastScript.requireIsTextNonEmpty( canonicalPath )
+
+    filePath = os.path.join( sitRoot, journalFile )
+
+    try:
+        fd = os.open( filePath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o664 )
+
+        try:
+            fcntl.flock( fd, fcntl.LOCK_EX )
+
+            # after creating the journal, which modifies the root SIT
+            line = '%d\t%s\t%s\t%d\n' % ( time.time(), action, canonicalPath,
+                                          getTreeStamp( sitRoot ) )
+            os.write( fd, line.encode() )
+        finally:
+            os.close( fd )
+
+        logging.debug( 'journal: %s %s', action, canonicalPath )
+
+    except OSError as details:
+        logging.warning( 'unable to update SIT change journal: %s', details )
+
+
+def beginChange( sitRoot, canonicalPath ):
+    """
+        To be called before modifying the root SIT: If it has been
+        modified since the last journal entry without being recorded
+        (e.g. by older ToolBOSCore versions, rsync or manual removal),
+        a 'resync' entry gets added, so that proxy SITs do not miss that
+        change once further entries get appended.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+    FastScript.requireIsTextNonEmpty( canonicalPath )
+
+    lastStamp = getLastStamp( sitRoot )
+
+    if lastStamp is not None and getTreeStamp( sitRoot ) > lastStamp:
+        logging.debug( '%s: modified without journal entry', sitRoot )
+        addEntry( sitRoot, 'resync', canonicalPath )
+
+
+def getEntries( sitRoot, position ):
+    """
+        Returns a tuple ( entries, newPosition ) with all journal entries
+        added since 'position' (as returned by getPosition() or a previous
+        call), where 'entries' is a list of ( action, canonicalPath ).
+
+        If 'position' is None or not valid anymore (e.g. the journal was
+        rotated), or if a 'resync' entry was added in the meantime, then
+        None is returned as 'entries', meaning that a full resync is
+        necessary.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+
+    filePath = os.path.join( sitRoot, journalFile )
+
+    try:
+        with open( filePath, 'rb' ) as f:
+            st          = os.fstat( f.fileno() )
+            newPosition = ( st.st_ino, st.st_size )
+
+            if position is None or position[0] != st.st_ino or \
+               position[1] > st.st_size:
+                return None, newPosition
+
+            f.seek( position[1] )
+            content = f.read( st.st_size - position[1] )
+
+    except OSError:
+        return None, None
+
+
+    # do not consume an incomplete last line which might be written
+    # concurrently right now
+    content     = content[ : content.rfind( b'\n' ) + 1 ]
+    newPosition = ( position[0], position[1] + len( content ) )
+
+
+    entries = []
+
+    for line in content.decode( errors='replace' ).splitlines():
+        fields = line.split( '\t' )
+
+        if len( fields ) < 3 or fields[1] not in actions:
+            logging.debug( 'ignoring invalid journal entry: %s', line )
+            continue
+
+        if fields[1] == 'resync':
+            logging.debug( 'journal requests full resync' )
+            return None, newPosition
+
+        entries.append( ( fields[1], fields[2] ) )
+
+    return entries, newPosition
+
+
+def getJournalPosition( sitRoot ):
+    """
+        Returns the current end position of the journal, or None if there
+        is no journal.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+
+    try:
+        st = os.stat( os.path.join( sitRoot, journalFile ) )
+        return st.st_ino, st.st_size
+    except OSError:
+        return None
+
+
+def getLastStamp( sitRoot ):
+    """
+        Returns the tree stamp recorded with the last journal entry,
+        or None if there is no journal (entry).
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+
+    try:
+        with open( os.path.join( sitRoot, journalFile ), 'rb' ) as f:
+            size = os.fstat( f.fileno() ).st_size
+            f.seek( max( 0, size - _tailSize ) )
+            lines = f.read().splitlines()
+
+        return int( lines[-1].split( b'\t' )[3] )
+
+    except ( IndexError, OSError, ValueError ):
+        return None
+
+
+def getSyncPosition( sitProxy ):
+    """
+        Returns the journal position up to which the given proxy SIT has
+        been synchronized, or None if unknown.
+    """
+    FastScript.requireIsTextNonEmpty( sitProxy )
+
+    try:
+        content = FastScript.getFileContent( os.path.join( sitProxy, positionFile ) )
+        inode, offset = content.split()
+
+        return int( inode ), int( offset )
+
+    except ( AssertionError, IOError, OSError, ValueError ):
+        return None
+
+
+def getTreeStamp( sitRoot ):
+    """
+        Returns the latest modification time (in ns) of the root SIT
+        directory and the categories within, i.e. it changes whenever
+        packages or categories get added or removed.
+
+        Only a handful of directories get examined regardless of the
+        number of packages, hence new versions of already existing
+        packages are not visible here. Those get noticed from the
+        journal, or upon the periodic full resync (see maxSyncAge) if
+        installed by other means.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+
+    result = _getMTime( sitRoot )
+
+    try:
+        with os.scandir( sitRoot ) as it:
+            for entry in it:
+                if entry.is_dir( follow_symlinks=False ):
+                    result = max( result, entry.stat( follow_symlinks=False ).st_mtime_ns )
+    except OSError:
+        pass                                        # e.g. removed concurrently
+
+    return result
+
+
+def isJournalTrusted( sitRoot, sitProxy, treeStamp=None ):
+    """
+        Returns a boolean whether the proxy SIT can be updated from the
+        journal only.
+
+        This is not the case if the proxy was never fully synchronized,
+        if the last full resync is older than 'maxSyncAge', or if the
+        root SIT has been modified since the last journal entry without
+        being recorded (see getTreeStamp()).
+
+        'treeStamp' may be provided if already known.
+    """
+    FastScript.requireIsTextNonEmpty( sitRoot )
+    FastScript.requireIsTextNonEmpty( sitProxy )
+
+    if treeStamp is None:
+        treeStamp = getTreeStamp( sitRoot )
+
+    filePath = os.path.join( sitProxy, fullSyncFile )
+
+    try:
+        syncTime  = os.stat( filePath ).st_mtime
+        syncStamp = int( FastScript.getFileContent( filePath ) )
+    except ( IOError, OSError, ValueError ):
+        logging.debug( 'no previous full resync' )
+        return False
+
+    if time.time() - syncTime > maxSyncAge:
+        logging.debug( 'last full resync is older than %ds', maxSyncAge )
+        return False
+
+    # journal entries get written after the (un-)installation, hence
+    # any later modification was not recorded (earlier ones are marked
+    # by a 'resync' entry, see beginChange())
+    lastStamp = getLastStamp( sitRoot ) or 0
+
+    if treeStamp > max( syncStamp, lastStamp ):
+        logging.debug( '%s: modified without journal entry', sitRoot )
+        return False
+
+    return True
+
+
+def setFullSync( sitProxy, treeStamp, dryRun=False ):
+    """
+        Records that the proxy SIT has been fully synchronized with the
+        root SIT in the state given by 'treeStamp' (see getTreeStamp()).
+    """
+    FastScript.requireIsTextNonEmpty( sitProxy )
+    FastScript.requireIsInt( treeStamp )
+
+    if not dryRun:
+        FastScript.setFileContent( os.path.join( sitProxy, fullSyncFile ),
+                                   '%d\n' % treeStamp )
+
+
+def setSyncPosition( sitProxy, position, dryRun=False ):
+    """
+        Stores the journal position up to which the proxy SIT has been
+        synchronized. A 'position' of None removes the information.
+    """
+    FastScript.requireIsTextNonEmpty( sitProxy )
+
+    filePath = os.path.join( sitProxy, positionFile )
+
+    if dryRun:
+        return
+
+    if position is None:
+        FastScript.remove( filePath )
+    else:
+        FastScript.setFileContent( filePath, '%d %d\n' % position )
+
+
+#----------------------------------------------------------------------------
+# Private functions
+#----------------------------------------------------------------------------
+
+
+def _getMTime( path ):
+    try:
+        return os.stat( path ).st_mtime_ns
+    except OSError:
+        return 0
+
+
+# EOF
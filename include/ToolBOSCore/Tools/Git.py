@@ -38,11 +38,17 @@ import io
 import logging
 import os
 import re
+import shlex
+import subprocess
 import urllib.parse
 
 from ToolBOSCore.Util import FastScript
 
 
+# max. command line length for batched invocations (determined on demand)
+_argMax = None
+
+
 class LocalGitRepository:
 
     _modifiedFileExpr = re.compile( r'^\sM\s(.+)$' )
@@ -59,13 +65,14 @@ class LocalGitRepository:
 
             If 'output' is a StringIO object, the command's output will be
             redirected there (otherwise printed on screen).
+
+            The files are passed to as few "git" invocations as the
+            maximum command line length permits.
         """
         if not FastScript.isIterable( fileList ):
             fileList = [ fileList ]
 
-        for item in fileList:
-            cmd = 'git add %s' % item
-            FastScript.execProgram( cmd, stdout=output, stderr=output )
+        _execBatched( 'git add', fileList, output )
 
 
     def commitLocal( self, message, output=None, fileList=None ):
@@ -296,13 +303,14 @@ class LocalGitRepository:
 
             If 'output' is a StringIO object, the command's output will be
             redirected there (otherwise printed on screen).
+
+            The files are passed to as few "git" invocations as the
+            maximum command line length permits.
         """
         if not FastScript.isIterable( fileList ):
             fileList = [ fileList ]
 
-        for item in fileList:
-            cmd = 'git rm %s' % item
-            FastScript.execProgram( cmd, stdout=output, stderr=output )
+        _execBatched( 'git rm', fileList, output )
 
 
     def setDryRun( self, boolean ):
@@ -330,6 +338,102 @@ class LocalGitRepository:
         FastScript.execProgram( cmd, stdout=output, stderr=output )
 
 
+class BatchCheck:
+    """
+        Long-lived "git cat-file --batch-check" process for repeated
+        object and ref lookups within one repository, instead of starting
+        a new "git" process for each query.
+
+        Use as context manager, or call close() when done:
+
+            with BatchCheck() as objects:
+                for path in fileList:
+                    info = objects.lookup( 'HEAD:' + path )
+    """
+
+    def __init__( self, repoDir=None ):
+        if repoDir:
+            FastScript.requireIsDir( repoDir )
+
+        self._repoDir = repoDir
+        self._proc    = None
+
+
+    def __enter__( self ):
+        return self
+
+
+    def __exit__( self, *unused ):
+        self.close()
+
+
+    def close( self ):
+        """
+            Terminates the "git cat-file" process (if any).
+        """
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+
+
+    def lookup( self, name ):
+        """
+            Returns a tuple ( objectID, type, size ) for the given object
+            name (e.g. a commit ID, "HEAD", "v1.0" or "HEAD:src/main.c"),
+            or None if there is no such object.
+        """
+        FastScript.requireIsTextNonEmpty( name )
+
+        if '\n' in name:
+            raise ValueError( 'object name must not contain line breaks' )
+
+        proc = self._getProcess()
+
+        proc.stdin.write( name + '\n' )
+        proc.stdin.flush()
+
+        line = proc.stdout.readline()
+
+        if not line:
+            self.close()
+            raise EnvironmentError( '"git cat-file" terminated unexpectedly' )
+
+        tokens = line.split()
+
+        # e.g. "<name> missing" or "<name> ambiguous"
+        if len( tokens ) != 3 or not tokens[2].isdigit():
+            return None
+
+        return tokens[0], tokens[1], int( tokens[2] )
+
+
+    def lookupAll( self, names ):
+        """
+            Bulk version of lookup(): Returns a dict mapping each of the
+            given object names to its ( objectID, type, size ) tuple, or None.
+        """
+        FastScript.requireIsIterable( names )
+
+        return { name: self.lookup( name ) for name in names }
+
+
+    def _getProcess( self ):
+        if self._proc is None:
+            cmd = [ 'git', 'cat-file', '--batch-check' ]
+            logging.debug( 'executing: %s', ' '.join( cmd ) )
+
+            self._proc = subprocess.Popen( cmd, cwd=self._repoDir,
+                                           stdin=subprocess.PIPE,
+                                           stdout=subprocess.PIPE,
+                                           universal_newlines=True,
+                                           bufsize=1 )
+            FastScript.countEvent( 'subprocesses' )
+
+        return self._proc
+
+
 class RemoteGitRepository:
 
     def __init__( self, url ):
@@ -551,4 +655,55 @@ def git2https( gitURL:str ) -> str:
     return httpsURL
 
 
+def _execBatched( cmd, fileList, output=None ):
+    """
+        Executes 'cmd' with the given files appended as arguments, using
+        as few invocations as the maximum command line length permits.
+    """
+    FastScript.requireIsTextNonEmpty( cmd )
+
+    batch  = []
+    length = len( cmd )
+
+    for item in fileList:
+        arg = shlex.quote( item )
+
+        if batch and length + len( arg ) + 1 > _getArgMax():
+            FastScript.execProgram( '%s %s' % ( cmd, ' '.join( batch ) ),
+                                    stdout=output, stderr=output )
+            batch  = []
+            length = len( cmd )
+
+        batch.append( arg )
+        length += len( arg ) + 1
+
+    if batch:
+        FastScript.execProgram( '%s %s' % ( cmd, ' '.join( batch ) ),
+                                stdout=output, stderr=output )
+
+
+def _getArgMax():
+    """
+        Returns the max. length of a command line to use, leaving room
+        for the environment (which counts towards ARG_MAX as well).
+    """
+    global _argMax
+
+    if _argMax is None:
+        try:
+            argMax = os.sysconf( 'SC_ARG_MAX' )
+        except ( AttributeError, ValueError, OSError ):
+            argMax = -1
+
+        if argMax <= 0:
+            argMax = 32768                 # e.g. Windows
+
+        envSize = sum( len( key ) + len( value ) + 2
+                       for key, value in os.environ.items() )
+
+        _argMax = max( 4096, min( argMax - envSize, 1024 * 1024 ) // 2 )
+
+    return _argMax
+
+
 # EOF
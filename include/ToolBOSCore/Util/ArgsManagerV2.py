@@ -39,8 +39,7 @@ import logging
 import sys
 import textwrap
 
-from ToolBOSCore.Settings import AppConfig, ToolBOSConf
-from ToolBOSCore.Util     import FastScript
+from ToolBOSCore.Util import FastScript
 
 
 class ArgsManager( argparse.ArgumentParser ):
@@ -69,6 +68,7 @@ class ArgsManager( argparse.ArgumentParser ):
 
         self._allowUnknown   = False
         self._config         = None
+        self._epilogSet      = False
         self._examples       = []
         self._supportInfo    = None
         self._unhandled      = None
@@ -94,8 +94,6 @@ class ArgsManager( argparse.ArgumentParser ):
         # preparation
         self._addVerboseOption()
         self._addVersionOption()
-        self._setBugtrackerURL()
-        self._setEpilog()
 
         # commandline parsing
         self._handleVersionOption()
@@ -125,11 +123,27 @@ class ArgsManager( argparse.ArgumentParser ):
 
             If omitted, the global ToolBOSCore AppConfig-instance is used.
         """
+        from ToolBOSCore.Settings import AppConfig
+
         FastScript.requireIsInstance( config, AppConfig.AppConfig )
 
         self._config = config
 
 
+    def format_help( self ):
+        """
+            The epilog (examples, bugtracker URL) is only shown in the
+            help dialog, hence assemble it on demand. This saves loading
+            ToolBOS.conf in all other cases.
+        """
+        if not self._epilogSet:
+            self._setBugtrackerURL()
+            self._setEpilog()
+            self._epilogSet = True
+
+        return super( ArgsManager, self ).format_help()
+
+
     def _addVerboseOption( self ):
         self.add_argument( '-v', '--verbose',
                            action='store_true',
@@ -158,6 +172,8 @@ class ArgsManager( argparse.ArgumentParser ):
 
 
     def _setBugtrackerURL( self ):
+        from ToolBOSCore.Settings import ToolBOSConf
+
         config = self._config if self._config else ToolBOSConf.getGlobalToolBOSConf()
 
         try:
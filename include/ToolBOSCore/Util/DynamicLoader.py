@@ -36,10 +36,9 @@
 
 import ctypes
 import logging
-import os
 
 from ToolBOSCore.Platforms import Platforms
-from ToolBOSCore.Util      import FastScript
+from ToolBOSCore.Util      import FastScript, SearchPathIndex
 
 
 def computeLibName( name, version='' ):
@@ -70,6 +69,25 @@ def locate( libName ):
     """
     FastScript.requireIsTextNonEmpty( libName )
 
+    libPath = locateAll( [ libName ] )[ libName ]
+
+    if libPath is None:
+        raise EnvironmentError( '%s not found within LD_LIBRARY_PATH' % libName )
+
+    logging.debug( 'found %s', libPath )
+
+    return libPath
+
+
+def locateAll( libNames ):
+    """
+        Bulk version of locate(): Returns a dict mapping each library name
+        to its absolute path, or None if not found.
+
+        The directories in LD_LIBRARY_PATH (PATH on Windows) are indexed
+        once and the results get cached, see SearchPathIndex.
+    """
+    FastScript.requireIsIterable( libNames )
 
     if Platforms.getSystemType() == 'win':
         envName = 'PATH'
@@ -79,20 +97,7 @@ def locate( libName ):
     searchPath = FastScript.getEnv( envName )
     FastScript.requireIsTextNonEmpty( searchPath )
 
-
-    for path in searchPath.split( ':' ):
-        # logging.debug( path )
-
-        libPath = os.path.join( path, libName )
-
-        if os.path.exists( libPath ):
-            logging.debug( 'found %s', libPath )
-            return libPath
-        # else:
-        #     logging.debug( '%s: No such file', libPath )
-
-
-    raise EnvironmentError( '%s not found within LD_LIBRARY_PATH' % libName )
+    return SearchPathIndex.getSearchPathIndex( envName ).findAll( libNames )
 
 
 def loadLibrary( name, version='' ):
@@ -41,11 +41,10 @@ import glob
 import io
 import logging
 import os
-import platform
+import queue
 import re
-import shutil
-import socket
 import sys
+import threading
 
 
 #----------------------------------------------------------------------------
@@ -651,9 +650,160 @@ def requireIsWritableDir( path ):
 #----------------------------------------------------------------------------
 
 
+class _VerbatimFormatter( logging.Formatter ):
+    """
+        Formatter which omits the preamble for messages logged with
+        logVerbatim().
+    """
+    def format( self, record ):
+        if getattr( record, 'verbatim', False ):
+            return record.getMessage()
+
+        return super( _VerbatimFormatter, self ).format( record )
+
+
+class _DeferredFlushMixin( object ):
+    """
+        Stream handlers used within the log writer thread do not flush
+        after each record but once per batch of records.
+    """
+    _deferFlush = True
+
+    def flush( self ):
+        if not self._deferFlush:
+            super( _DeferredFlushMixin, self ).flush()
+
+    def flushBatch( self ):
+        self._deferFlush = False
+
+        try:
+            self.flush()
+        finally:
+            self._deferFlush = True
+
+
+class _FileHandler( _DeferredFlushMixin, logging.FileHandler ):
+    pass
+
+
+class _StreamHandler( _DeferredFlushMixin, logging.StreamHandler ):
+    pass
+
+
+class _QueueHandler( logging.Handler ):
+    """
+        Passes log records to the log writer thread. Blocks if the queue
+        is full (backpressure) instead of dropping records.
+    """
+    def emit( self, record ):
+        try:
+            # like logging.handlers.QueueHandler.prepare(): merge args and
+            # exception info into the message, the record may be modified
+            # by the caller after returning
+            message          = self.format( record )
+            record           = logging.makeLogRecord( record.__dict__ )
+            record.message   = message
+            record.msg       = message
+            record.args      = None
+            record.exc_info  = None
+            record.exc_text  = None
+            record.stack_info = None
+
+            _logWriter.put( record )
+
+        except Exception:
+            self.handleError( record )
+
+
+class _LogWriter( object ):
+    """
+        Background thread which writes log records to the file handlers
+        and stream loggers, so that the logging thread does not block on
+        (network) file I/O.
+    """
+
+    def __init__( self ):
+        self.handlers = []
+        self._queue   = None
+        self._thread  = None
+        self._lock    = threading.Lock()
+
+
+    def put( self, record ):
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+        self._queue.put( record )
+
+
+    def flush( self ):
+        """
+            Blocks until all queued records are written.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+
+    def reset( self ):
+        # e.g. after fork() the thread is gone and the queue may be locked
+        self._queue  = None
+        self._thread = None
+        self._lock   = threading.Lock()
+
+
+    def _run( self, recordQueue ):
+        while True:
+            batch = [ recordQueue.get() ]
+
+            try:
+                while len( batch ) < logBatchSize:
+                    batch.append( recordQueue.get_nowait() )
+            except queue.Empty:
+                pass
+
+            handlers = list( self.handlers )
+
+            for record in batch:
+                for handler in handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle( record )
+
+            for handler in handlers:
+                try:
+                    handler.flushBatch()
+                except ( AttributeError, OSError, ValueError ):
+                    pass
+
+            for _ in batch:
+                recordQueue.task_done()
+
+
+    def _start( self ):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._queue  = queue.Queue( maxsize=logQueueSize )
+            self._thread = threading.Thread( target=self._run,
+                                             args=( self._queue, ),
+                                             name='LogWriter',
+                                             daemon=True )
+            self._thread.start()
+
+
+# max. number of pending log records, loggers block when exceeded
+logQueueSize  = 10000
+
+# max. number of records written before flushing the files
+logBatchSize  = 256
+
+_logWriter    = _LogWriter()
+_queueHandler = _QueueHandler()
+
+
 # always write messages to console
 
-consoleFormatter = logging.Formatter( "[%(filename)s:%(lineno)d %(levelname)s] %(message)s" )
+consoleFormatter = _VerbatimFormatter( "[%(filename)s:%(lineno)d %(levelname)s] %(message)s" )
 consoleHandler   = logging.StreamHandler()
 consoleHandler.setFormatter( consoleFormatter )
 
@@ -671,8 +821,44 @@ rootLogger.addHandler( consoleHandler )
 rootLogger.setLevel( logging.INFO )
 
 
+def flushLogs():
+    """
+        Blocks until all pending log records have been written to the
+        log files and streams (see setOutputFile() and addStreamLogger()).
+    """
+    _logWriter.flush()
+
+
+def _addQueuedHandler( handler ):
+    _logWriter.handlers.append( handler )
+
+    if _queueHandler not in rootLogger.handlers:
+        rootLogger.addHandler( _queueHandler )
+
+
+def _removeQueuedHandler( handler ):
+    flushLogs()
+
+    try:
+        _logWriter.handlers.remove( handler )
+    except ValueError:
+        pass
+
+    if not _logWriter.handlers:
+        rootLogger.removeHandler( _queueHandler )
+
+
+def _shutdownLogging():
+    flushLogs()
+    logging.shutdown()
+
+
 # ensure flushing the streams at application exit
-atexit.register( logging.shutdown )
+atexit.register( _shutdownLogging )
+
+# pending records would get lost resp. buffered ones written twice
+if hasattr( os, 'register_at_fork' ):
+    os.register_at_fork( before=flushLogs, after_in_child=_logWriter.reset )
 
 
 def setOutputFile( filename, rotate=False, size=None, count=None ):
@@ -684,29 +870,33 @@ def setOutputFile( filename, rotate=False, size=None, count=None ):
         once they reach `size` bytes (default 5 MB), a maximum of `count` times
         (default 5).
 
+        The file is written by a background thread, use flushLogs() to
+        wait until all messages have been written.
     """
     global fileHandler
 
-    rootLogger = logging.getLogger()
-
     if filename is None:
         requireMsg( fileHandler, 'fileHandler not assigned, yet' )
-        rootLogger.removeHandler( fileHandler )
+        _removeQueuedHandler( fileHandler )
+        fileHandler.close()
     else:
         requireIsTextNonEmpty( filename )
 
         if rotate:
             from logging.handlers import RotatingFileHandler
 
+            class _RotatingFileHandler( _DeferredFlushMixin, RotatingFileHandler ):
+                pass
+
             size  = size or (5 * 1024 * 1024) # 5 MB
             count = count or 5
 
-            fileHandler = RotatingFileHandler( filename, maxBytes=size, backupCount=count )
+            fileHandler = _RotatingFileHandler( filename, maxBytes=size, backupCount=count )
         else:
-            fileHandler = logging.FileHandler( filename )
+            fileHandler = _FileHandler( filename )
 
         fileHandler.setFormatter( fileFormatter)
-        rootLogger.addHandler( fileHandler )
+        _addQueuedHandler( fileHandler )
 
 
 def setDebugLevel( level ):
@@ -800,8 +990,17 @@ def logVerbatim( level, message ):
 
         Use it to log verbatim.
     """
-    if level <= getDebugLevel():
-        consoleHandler.stream.write( message + '\n' )
+    requireIsInt( level )
+    requireIsText( message )
+
+    if level <= 0:
+        level = logging.WARNING
+    elif level <= 3:
+        level = logging.INFO
+    else:
+        level = logging.DEBUG
+
+    logging.log( level, message, extra={ 'verbatim': True } )
 
 
 def addStreamLogger( stream, debugLevel, preamble=True ):
@@ -809,6 +1008,9 @@ def addStreamLogger( stream, debugLevel, preamble=True ):
         By providing a file-like object the log messages of the checkers
         can be captured. 'stream' could be a StringIO instance.
 
+        The stream is written by a background thread, call flushLogs()
+        before reading it.
+
         'debugLevel' should be provided as constant from the 'logging'-
         framework, f.i. logging.INFO or logging.DEBUG
     """
@@ -818,12 +1020,134 @@ def addStreamLogger( stream, debugLevel, preamble=True ):
         formatString = "%(message)s"
 
 
-    streamFormatter = logging.Formatter( formatString )
-    logHandler      = logging.StreamHandler( stream )
+    streamFormatter = _VerbatimFormatter( formatString )
+    logHandler      = _StreamHandler( stream )
     logHandler.setFormatter( streamFormatter )
     logHandler.setLevel( debugLevel )
 
-    rootLogger.addHandler( logHandler )
+    _addQueuedHandler( logHandler )
+
+    return logHandler
+
+
+def removeStreamLogger( logHandler ):
+    """
+        Stops logging into the stream registered with addStreamLogger(),
+        after all pending messages have been written.
+    """
+    requireIsInstance( logHandler, logging.Handler )
+
+    _removeQueuedHandler( logHandler )
+
+
+#----------------------------------------------------------------------------
+# Performance counters
+#----------------------------------------------------------------------------
+
+
+# process-wide event counters, e.g. { 'subprocesses': 3, 'filesCopied': 42 }
+_counters      = collections.Counter()
+_countersLock  = threading.Lock()
+_countersStart = None
+
+
+def countEvent( name, value=1 ):
+    """
+        Increments the performance counter 'name' by 'value', e.g.:
+
+            countEvent( 'filesCopied' )
+            countEvent( 'bytesCopied', 4096 )
+
+        Counters are cheap and always enabled. If the environment variable
+        BST_METRICS is set to a filename, all counters get written to
+        this file in JSON format at exit, see dumpCounters(). Child
+        processes inheriting BST_METRICS write to '<filename>.<PID>'
+        instead, so that they do not overwrite the counters of the
+        top-level process.
+    """
+    with _countersLock:
+        _counters[ name ] += value
+
+
+def countCacheAccess( cacheName, hit ):
+    """
+        Counts a hit or miss of the cache 'cacheName', which will show up
+        as '<cacheName>Hits' / '<cacheName>Misses' counters.
+    """
+    countEvent( cacheName + ( 'Hits' if hit else 'Misses' ) )
+
+
+def getCounters():
+    """
+        Returns a copy of all performance counters as dict.
+    """
+    with _countersLock:
+        return dict( _counters )
+
+
+def resetCounters():
+    """
+        Sets all performance counters back to zero.
+    """
+    global _countersStart
+
+    import time
+
+    with _countersLock:
+        _counters.clear()
+        _countersStart = time.monotonic()
+
+
+def dumpCounters( filename ):
+    """
+        Writes all performance counters to the given file in JSON format,
+        together with the command line, PID and wall time of the process.
+    """
+    import json
+    import time
+
+    requireIsTextNonEmpty( filename )
+
+    data = { 'argv':     sys.argv,
+             'pid':      os.getpid(),
+             'wallTime': time.monotonic() - _countersStart,
+             'counters': getCounters() }
+
+    tmpFile = '%s.%d.tmp' % ( filename, os.getpid() )
+
+    with open( tmpFile, 'w' ) as fd:
+        json.dump( data, fd, indent=4, sort_keys=True )
+
+    os.replace( tmpFile, filename )
+
+
+def _dumpCountersAtExit():
+    filename = os.getenv( 'BST_METRICS' )
+
+    if not filename:
+        return
+
+    # child processes of the top-level process, see countEvent()
+    ownerPID = os.getenv( 'BST_METRICS_PID' )
+
+    if ownerPID and ownerPID != str( os.getpid() ):
+        filename = '%s.%d' % ( filename, os.getpid() )
+
+    try:
+        dumpCounters( filename )
+    except OSError as details:
+        logging.warning( 'unable to write metrics: %s', details )
+
+
+resetCounters()
+
+if os.getenv( 'BST_METRICS' ):
+    os.environ.setdefault( 'BST_METRICS_PID', str( os.getpid() ) )
+
+atexit.register( _dumpCountersAtExit )
+
+if hasattr( os, 'register_at_fork' ):
+    os.register_at_fork( after_in_child=resetCounters )
 
 
 #----------------------------------------------------------------------------
@@ -862,7 +1186,11 @@ def getDirsInDir( path = '.', excludePattern = None, onError = None ):
         return subdirList
 
     try:
-        for item in os.listdir( path ):
+        items = os.listdir( path )
+        countEvent( 'dirsListed' )
+        countEvent( 'stats', len( items ) + 1 )
+
+        for item in items:
             if os.path.isdir( os.path.join( path, item ) ):
                 if excludePattern:
                     if excludePattern.search( item ) is None:
@@ -912,7 +1240,11 @@ def getDirsInDirRecursive( path = '.',
     if not os.path.isdir( path ):
         return result
 
-    for item in os.listdir( path ):
+    items = os.listdir( path )
+    countEvent( 'dirsListed' )
+    countEvent( 'stats', 2 * len( items ) + 1 )
+
+    for item in items:
         # skip symlinks which are also returned by os.listdir():
         joinedPath = os.path.join( path, item )
 
@@ -958,7 +1290,11 @@ def getFilesInDir( path, excludePattern = '' ):
     if not os.path.isdir( path ):
         return subdirList
 
-    for item in os.listdir( path ):
+    items = os.listdir( path )
+    countEvent( 'dirsListed' )
+    countEvent( 'stats', len( items ) + 1 )
+
+    for item in items:
         if os.path.isfile( os.path.join( path, item ) ):
             if excludePattern == '' or re.search( excludePattern, item ) is None:
                 subdirList.append( item )
@@ -1031,14 +1367,18 @@ def remove( path, dryRun=False, ignoreErrors=False ):
         else:
             logging.debug( 'rm %s', path )
             os.remove( path )
+            countEvent( 'filesRemoved' )
 
     elif os.path.isdir( path ):
 
         if dryRun:
             logging.debug( '[DRY-RUN] rm -R %s', path )
         else:
+            import shutil
+
             logging.debug( 'rm -R %s', path )
             shutil.rmtree( path, ignoreErrors )
+            countEvent( 'dirsRemoved' )
 
 
 def copy( src, dst ):
@@ -1048,12 +1388,23 @@ def copy( src, dst ):
 
         If 'src' is a directory, it will be copied recursively.
     """
+    import shutil
+
+    def copyFile( srcFile, dstFile ):
+        result = shutil.copy2( srcFile, dstFile )   # also copies meta-infos
+
+        # 'dstFile' might be a directory, 'result' is the file created
+        countEvent( 'filesCopied' )
+        countEvent( 'bytesCopied', os.path.getsize( result ) )
+
+        return result
+
     if os.path.isdir( src ):
         logging.debug( 'cp -R %s %s', src, dst )
-        shutil.copytree( src, dst )
+        shutil.copytree( src, dst, copy_function=copyFile )
     else:
         logging.debug( 'cp %s %s', src, dst )
-        shutil.copy2( src, dst )    # this also copies file meta-infos
+        copyFile( src, dst )
 
 
 def copyWithRetry( src, dst, maxAttempts=3, waitSeconds=2 ):
@@ -1115,6 +1466,7 @@ def link( target, symlink, dryRun=False ):
     else:
         logging.debug( 'ln -s %s %s', target, symlink )
         os.symlink( target, symlink )
+        countEvent( 'symlinksCreated' )
 
 
 def mkdir( path, verbose=False ):
@@ -1140,6 +1492,7 @@ def mkdir( path, verbose=False ):
 
     try:
         os.makedirs( path )
+        countEvent( 'dirsCreated' )
     except ( AssertionError, OSError ) as details:
 
         if details.errno == 17:                     # 17 = directory exists
@@ -1160,6 +1513,7 @@ def getFileOwner( path ):
     requireIsTextNonEmpty( path )
 
     ownerID   = os.stat( path ).st_uid
+    countEvent( 'stats' )
     ownerName = getpwuid( ownerID ).pw_name
 
     return ownerName
@@ -1186,6 +1540,8 @@ def getDirSize( path ):
     for root, dirs, files in os.walk( path ):
         for f in files:
             fullPath = os.path.join( root, f )
+            countEvent( 'stats' )
+
             try:
                 size +=  os.path.getsize( fullPath )
             except OSError:
@@ -1214,6 +1570,8 @@ def getFileContent( filename, splitLines = False, asBinary=False ):
     else:
         mode = 'r'
 
+    countEvent( 'filesRead' )
+
     with open( filename, mode ) as f:
         logging.debug( 'reading file: %s', filename )
         return f.readlines() if splitLines else f.read()
@@ -1235,6 +1593,8 @@ def setFileContent( filename, content ):
     f.write( content )
     f.close()
 
+    countEvent( 'filesWritten' )
+
 
 def findFiles( path, regexp=None, ext=None ):
     """
@@ -1303,6 +1663,8 @@ def execFile( filename ):
     # if not os.path.isfile( filename ):
     #     raise IOError( "%s: No such file" % filename )
 
+    countEvent( 'filesExecuted' )
+
     result = {}
     with open( filename ) as fd:
         exec( fd.read(), None, result)
@@ -1338,6 +1700,8 @@ def execProgram( cmd, workingDir = None, host = 'localhost',
     """
     requireIsTextNonEmpty( cmd )
 
+    import platform
+
     from shlex      import split
     from subprocess import CalledProcessError
     from subprocess import PIPE
@@ -1387,6 +1751,7 @@ def execProgram( cmd, workingDir = None, host = 'localhost',
     p = Popen( cmd, stdin=inStream, stdout=outStream,
                stderr=errStream, cwd=localWorkingDir,
                encoding=encoding )
+    countEvent( 'subprocesses' )
 
 
     ( outData, errData ) = p.communicate( inData )
@@ -1432,6 +1797,8 @@ def getCommandLine( cmd, workingDir=None, host=None, user=None ):
         requireIsTextNonEmpty( workingDir )
 
 
+    import socket
+
     localHostname = socket.gethostname()
 
     if host in ( None, 'localhost', '127.0.0.1', '::1', localHostname ):
@@ -1917,7 +2284,7 @@ def flatten( i ):
     """
     for x in i:
         if isinstance( x, collections.abc.Iterable ) and not isinstance( x, ( str, bytes ) ):
-            yield from flattenList( x )
+            yield from flatten( x )
         else:
             yield x
 
@@ -2099,4 +2466,31 @@ def _getLastStringInList( searchList ):
     return index
 
 
+#----------------------------------------------------------------------------
+# Contracts
+#----------------------------------------------------------------------------
+
+
+def _noContract( *args, **kwargs ):
+    pass
+
+
+# The require*() checks can be turned off for production runs on trusted
+# input, either by running Python with "-O" or by setting the environment
+# variable TOOLBOSCORE_CONTRACTS=FALSE. All require*() functions are then
+# replaced by a no-op, so they do not cost more than a function call.
+#
+# Note: Code relying on an AssertionError raised by a require*() function
+#       (e.g. as "file not found" detection) will not see it anymore.
+
+contractsEnabled = __debug__ and os.getenv( 'TOOLBOSCORE_CONTRACTS' ) != 'FALSE'
+
+if not contractsEnabled:
+    for _name, _value in list( globals().items() ):
+        if _name.startswith( 'require' ) and callable( _value ):
+            globals()[ _name ] = _noContract
+
+    del _name, _value
+
+
 # EOF
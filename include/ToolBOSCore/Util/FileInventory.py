@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+#
+#  Cached inventory of all files within a directory tree
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+
+import logging
+import os
+import time
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# one inventory per top-level directory
+_inventories   = {}
+
+# min. time (in seconds) between two checks of the directories' mtimes,
+# so that a series of queries does not stat all directories again
+checkInterval  = 1.0
+
+# directories never scanned
+ignoredDirs    = frozenset( ( '.git', '.svn' ) )
+
+
+#----------------------------------------------------------------------------
+# Public classes and functions
+#----------------------------------------------------------------------------
+
+
+class FileInventory( object ):
+    """
+        Lists all files below a directory (e.g. a package's top-level
+        directory) in one pass, and answers queries such as "are there
+        any *.cpp files in src/?" from an index by extension resp. by
+        filename.
+
+        Symlinks to directories are not followed (like os.walk()).
+        The inventory gets rebuilt if the mtime of any directory changed,
+        i.e. files were added, removed or renamed.
+    """
+
+    def __init__( self, topLevelDir ):
+        FastScript.requireIsDir( topLevelDir )
+
+        self._topLevelDir = topLevelDir
+        self._dirs        = None     # { relDir: mtime }
+        self._byExtension = {}       # { '.cpp': [ relPath ] }
+        self._byName      = {}       # { 'pkgInfo.py': [ relPath ] }
+        self._lastCheck   = 0.0
+
+
+    def exists( self, relPath ):
+        """
+            Returns True if the file 'relPath' (relative to the top-level
+            directory) exists.
+        """
+        FastScript.requireIsTextNonEmpty( relPath )
+
+        self._update()
+
+        relPath = os.path.normpath( relPath )
+
+        return relPath in self._byName.get( os.path.basename( relPath ), () )
+
+
+    def getFiles( self, suffix=None, subDir=None ):
+        """
+            Returns the relative paths of all files whose name ends with
+            'suffix' (e.g. '.py' or '__init__.py'), optionally restricted
+            to the given subdirectory (e.g. 'src').
+        """
+        self._update()
+
+        if not suffix:
+            candidates = [ path for paths in self._byName.values() for path in paths ]
+
+        elif suffix.startswith( '.' ) and suffix.count( '.' ) == 1:
+            candidates = self._byExtension.get( suffix, () )
+
+        else:
+            candidates = [ path for name, paths in self._byName.items()
+                           if name.endswith( suffix ) for path in paths ]
+
+        if subDir:
+            prefix     = os.path.normpath( subDir ) + os.sep
+            candidates = [ path for path in candidates if path.startswith( prefix ) ]
+
+        return sorted( candidates )
+
+
+    def hasFiles( self, suffix, subDir=None ):
+        """
+            Returns True if there is any file whose name ends with 'suffix',
+            optionally restricted to the given subdirectory.
+        """
+        FastScript.requireIsTextNonEmpty( suffix )
+
+        return bool( self.getFiles( suffix, subDir ) )
+
+
+    def invalidate( self ):
+        """
+            Forces re-scanning the directory tree upon next query.
+        """
+        self._dirs = None
+
+
+    def _scan( self ):
+        logging.debug( 'scanning %s', self._topLevelDir )
+
+        dirs        = {}
+        byExtension = {}
+        byName      = {}
+        stack       = [ '' ]
+
+        while stack:
+            relDir  = stack.pop()
+            absDir  = os.path.join( self._topLevelDir, relDir )
+
+            try:
+                dirs[ relDir ] = os.stat( absDir ).st_mtime_ns
+                it             = os.scandir( absDir )
+            except OSError as details:
+                logging.debug( details )
+                continue
+
+            with it:
+                for entry in it:
+                    relPath = os.path.join( relDir, entry.name )
+
+                    try:
+                        isDir = entry.is_dir()
+                    except OSError:
+                        isDir = False
+
+                    if isDir:
+                        if entry.name not in ignoredDirs and not entry.is_symlink():
+                            stack.append( relPath )
+
+                        continue
+
+                    extension = os.path.splitext( entry.name )[1]
+                    byExtension.setdefault( extension, [] ).append( relPath )
+                    byName.setdefault( entry.name, [] ).append( relPath )
+
+        self._dirs        = dirs
+        self._byExtension = byExtension
+        self._byName      = byName
+        self._lastCheck   = time.monotonic()
+
+
+    def _update( self ):
+        if self._dirs is None:
+            self._scan()
+
+        elif time.monotonic() - self._lastCheck > checkInterval:
+            for relDir, mtime in self._dirs.items():
+                try:
+                    current = os.stat( os.path.join( self._topLevelDir, relDir ) ).st_mtime_ns
+                except OSError:
+                    current = None
+
+                if current != mtime:
+                    logging.debug( '%s: directory changed', relDir or '.' )
+                    self._scan()
+                    return
+
+            self._lastCheck = time.monotonic()
+
+
+def getFileInventory( topLevelDir ):
+    """
+        Returns the FileInventory singleton for the given directory.
+    """
+    FastScript.requireIsDir( topLevelDir )
+
+    topLevelDir = os.path.realpath( topLevelDir )
+
+    try:
+        return _inventories[ topLevelDir ]
+    except KeyError:
+        inventory = FileInventory( topLevelDir )
+        _inventories[ topLevelDir ] = inventory
+
+        return inventory
+
+
+# EOF
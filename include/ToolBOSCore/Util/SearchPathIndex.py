@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+#  Cached lookup of files within search paths like $PATH
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import logging
+import os
+import time
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# one index per environment variable, e.g. 'PATH' or 'LD_LIBRARY_PATH'
+_indexes       = {}
+
+# min. time (in seconds) between two checks of the directories' mtimes,
+# so that a series of lookups does not stat all directories again
+checkInterval  = 1.0
+
+
+#----------------------------------------------------------------------------
+# Public classes and functions
+#----------------------------------------------------------------------------
+
+
+class SearchPathIndex( object ):
+    """
+        Resolves filenames within the directories listed in a search-path
+        environment variable (such as $PATH), returning the first match
+        like the shell would do.
+
+        Each directory is listed only once, and the results are cached.
+        The index gets rebuilt when the value of the environment variable
+        changes, and a directory is listed again when its mtime changed.
+        Lookups depending on relative (= current working directory) search
+        path entries or on broken symlinks are not cached.
+    """
+
+    def __init__( self, envName ):
+        FastScript.requireIsTextNonEmpty( envName )
+
+        self._envName   = envName
+        self._value     = None
+        self._dirs      = []        # [ [ path, mtime, set of entries ] ]
+        self._resolved  = {}        # { name: path or None }
+        self._lastCheck = 0.0
+
+
+    def find( self, name ):
+        """
+            Returns the path of the first file (or directory) named 'name'
+            within the search path, or None if not found.
+        """
+        FastScript.requireIsTextNonEmpty( name )
+
+        self._update()
+
+        return self._find( name )
+
+
+    def findAll( self, names ):
+        """
+            Bulk version of find(): Returns a dict mapping each of the
+            given names to its path, or None if not found.
+        """
+        FastScript.requireIsIterable( names )
+
+        self._update()
+
+        return { name: self._find( name ) for name in names }
+
+
+    def invalidate( self ):
+        """
+            Forces listing all directories again upon next lookup.
+        """
+        self._value    = None
+        self._dirs     = []
+        self._resolved = {}
+
+
+    def _find( self, name ):
+        if os.sep in name:
+            # paths are not looked-up within the search path
+            return name if os.path.exists( name ) else None
+
+        try:
+            result = self._resolved[ name ]
+            FastScript.countCacheAccess( 'searchPathIndex', True )
+            return result
+        except KeyError:
+            FastScript.countCacheAccess( 'searchPathIndex', False )
+
+        result    = None
+        cacheable = True
+
+        for path, mtime, entries in self._dirs:
+            if entries is None:
+                # relative to current working directory, hence neither
+                # this nor any later result can be cached
+                cacheable = False
+
+                if os.path.exists( os.path.join( path, name ) ):
+                    result = os.path.join( path, name )
+                    break
+
+            elif name in entries:
+                if os.path.exists( os.path.join( path, name ) ):
+                    result = os.path.join( path, name )
+                    break
+
+                # broken symlink: not found (like os.path.exists()), but
+                # the target might appear without changing the mtime
+                cacheable = False
+
+        if cacheable:
+            self._resolved[ name ] = result
+
+        return result
+
+
+    def _update( self ):
+        value = FastScript.getEnv( self._envName ) or ''
+
+        if value != self._value:
+            logging.debug( 'indexing $%s', self._envName )
+
+            self._value     = value
+            self._dirs      = [ self._listDir( path ) for path in value.split( ':' ) ]
+            self._resolved  = {}
+            self._lastCheck = time.monotonic()
+
+        elif time.monotonic() - self._lastCheck > checkInterval:
+            for i, ( path, mtime, entries ) in enumerate( self._dirs ):
+                if entries is not None and _getMTime( path ) != mtime:
+                    logging.debug( '%s: directory changed', path )
+                    self._dirs[ i ] = self._listDir( path )
+                    self._resolved  = {}
+
+            self._lastCheck = time.monotonic()
+
+
+    @staticmethod
+    def _listDir( path ):
+        """
+            Returns a [ path, mtime, entries ] record for the directory.
+            Empty (= current working directory) entries get None as
+            entries to indicate that they need to be checked at lookup.
+        """
+        if not path or not os.path.isabs( path ):
+            return [ path, None, None ]
+
+        mtime = _getMTime( path )
+
+        try:
+            entries = frozenset( os.listdir( path ) )
+        except OSError:
+            entries = frozenset()                  # non-existing directory
+
+        return [ path, mtime, entries ]
+
+
+def getSearchPathIndex( envName ):
+    """
+        Returns the SearchPathIndex singleton for the given environment
+        variable, e.g. 'PATH'.
+    """
+    FastScript.requireIsTextNonEmpty( envName )
+
+    try:
+        return _indexes[ envName ]
+    except KeyError:
+        index = SearchPathIndex( envName )
+        _indexes[ envName ] = index
+
+        return index
+
+
+def _getMTime( path ):
+    try:
+        return os.stat( path ).st_mtime_ns
+    except OSError:
+        return None
+
+
+# EOF
@@ -37,8 +37,6 @@
 import logging
 import os
 
-from mako.lookup import TemplateLookup
-
 from ToolBOSCore.Util import FastScript
 
 
@@ -46,6 +44,14 @@ from ToolBOSCore.Util import FastScript
 templateDir = os.path.join( FastScript.getEnv( 'TOOLBOSCORE_ROOT' ),
                             'etc/mako-templates' )
 
+# location where Mako stores the compiled templates, so that they
+# can be re-used by subsequent processes
+moduleDir   = os.path.join( os.path.expanduser( '~' ), '.HRI', 'ToolBOS',
+                            'MakoCache' )
+
+# one TemplateLookup per template directory
+_lookups    = {}
+
 
 def run( srcFile, dstFile, values ):
     """
@@ -56,16 +62,99 @@ def run( srcFile, dstFile, values ):
     FastScript.requireIsText( dstFile )
     FastScript.requireIsDict( values )
 
-    logging.info( 'processing %s', dstFile )
+    _render( _getTemplate( srcFile ), srcFile, dstFile, values )
+
+
+def runBatch( srcFile, jobs ):
+    """
+        Applies several sets of values onto the same template file
+        'srcFile', which gets compiled only once.
+
+        'jobs' is a list of ( dstFile, values ) tuples.
+    """
+    FastScript.requireIsFile( srcFile )
+    FastScript.requireIsIterable( jobs )
+
+    template = _getTemplate( srcFile )
+
+    for dstFile, values in jobs:
+        FastScript.requireIsText( dstFile )
+        FastScript.requireIsDict( values )
+
+        _render( template, srcFile, dstFile, values )
+
+
+def _getLookup( dirName ):
+    """
+        Returns the (cached) TemplateLookup for the given template
+        directory.
+
+        Mako checks the template's mtime and re-compiles it if needed.
+    """
+    try:
+        return _lookups[ dirName ]
+    except KeyError:
+        pass
 
+    # Mako is only needed when actually processing templates
+    from mako.lookup import TemplateLookup
+
+    # Mako names the compiled modules after the template name only,
+    # hence mirror the template directory to avoid clashes
+    cacheDir = os.path.join( moduleDir, dirName.lstrip( os.sep ) )
+
+    try:
+        FastScript.mkdir( cacheDir )
+
+        if not os.access( cacheDir, os.W_OK ):
+            cacheDir = None
+    except OSError as details:
+        logging.debug( 'unable to use Mako cache dir: %s', details )
+        cacheDir = None
+
+    lookup = TemplateLookup( directories=[ dirName ], module_directory=cacheDir )
+    _lookups[ dirName ] = lookup
+
+    return lookup
+
+
+def _getTemplate( srcFile ):
     # First determine the directory of the template file, and tell Mako
     # to search there. In a second step tell Mako to search for a template
     # file in this search path.
     #
     # This is the only solution to get Mako's "include" working.
 
-    lookup   = TemplateLookup( directories=[ os.path.dirname( srcFile ) ] )
-    template = lookup.get_template( os.path.basename( srcFile ) )
+    lookup = _getLookup( os.path.dirname( os.path.abspath( srcFile ) ) )
+
+    if lookup.module_directory:
+        _removeOutdatedModule( lookup, srcFile )
+
+    return lookup.get_template( os.path.basename( srcFile ) )
+
+
+def _removeOutdatedModule( lookup, srcFile ):
+    """
+        Mako compares the modification times of template and compiled
+        module in seconds only, hence misses modifications within the
+        same second as the compilation. Such module gets removed so that
+        Mako re-compiles the template.
+    """
+    moduleFile = os.path.join( lookup.module_directory,
+                               os.path.basename( srcFile ) + '.py' )
+
+    try:
+        outdated = os.stat( srcFile ).st_mtime_ns > os.stat( moduleFile ).st_mtime_ns
+    except OSError:
+        return                                          # not compiled, yet
+
+    if outdated:
+        logging.debug( 'removing outdated %s', moduleFile )
+        FastScript.remove( moduleFile )
+
+
+def _render( template, srcFile, dstFile, values ):
+    logging.info( 'processing %s', dstFile )
 
     dstContent = template.render( **values )
     FastScript.requireIsText( dstContent )
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Settings.AppConfig import AppConfig
+from ToolBOSCore.Util               import FastScript
+
+
+class TestAppConfig( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir       = tempfile.TemporaryDirectory()
+        self.oldEnv       = dict( os.environ )
+        self.defaultDir   = os.path.join( self.tmpDir.name, 'default' )
+        self.machineDir   = os.path.join( self.tmpDir.name, 'machine' )
+        self.userDir      = os.path.join( self.tmpDir.name, 'user' )
+        self.userFile     = os.path.join( self.userDir, 'Foo.conf' )
+        self.snapshotFile = os.path.join( self.userDir, '.Foo.conf.snapshot' )
+
+        FastScript.mkdir( self.machineDir )
+        FastScript.mkdir( self.userDir )
+        FastScript.setFileContent( os.path.join( self.defaultDir, 'Foo.conf' ),
+                                   "spam = 'default'\neggs = 'default'\n" )
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def getConfig( self ):
+        return AppConfig( 'Foo', self.defaultDir, self.userDir, self.machineDir )
+
+
+    def modify( self, filePath, content ):
+        # ensure a different mtime even on filesystems with coarse timestamps
+        stat = os.stat( filePath )
+
+        FastScript.setFileContent( filePath, content )
+        os.utime( filePath, ns=( stat.st_atime_ns, stat.st_mtime_ns + 10**9 ) )
+
+
+    def test_snapshot( self ):
+        FastScript.setFileContent( self.userFile, "spam = 'user'\n" )
+
+        config = self.getConfig()
+        self.assertEqual( config.getConfigOption( 'spam' ), 'user' )
+        self.assertEqual( config.getConfigOption( 'eggs' ), 'default' )
+        self.assertTrue( os.path.exists( self.snapshotFile ) )
+
+        # settings get taken from the snapshot
+        FastScript.resetCounters()
+
+        config = self.getConfig()
+        self.assertEqual( config.getConfigOption( 'spam' ), 'user' )
+        self.assertEqual( config.getUserConfigOption( 'spam' ), 'user' )
+        self.assertEqual( config.getDefaultConfigOption( 'eggs' ), 'default' )
+        self.assertNotIn( 'filesExecuted', FastScript.getCounters() )
+
+        # modified configfile
+        self.modify( self.userFile, "spam = 'modified'\n" )
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'modified' )
+
+        # new configfile
+        FastScript.setFileContent( os.path.join( self.machineDir, 'Foo.conf' ),
+                                   "eggs = 'machine'\n" )
+        self.assertEqual( self.getConfig().getConfigOption( 'eggs' ), 'machine' )
+
+        # removed configfile
+        os.remove( self.userFile )
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'default' )
+
+
+    def test_envDependent( self ):
+        FastScript.setFileContent( self.userFile, "spam = os.getenv( 'SPAM', 'unset' )\n" )
+
+        os.environ[ 'SPAM' ] = 'foo'
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'foo' )
+        self.assertFalse( os.path.exists( self.snapshotFile ) )
+
+        os.environ[ 'SPAM' ] = 'bar'
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'bar' )
+
+        # snapshot of a previous, environment-independent configfile
+        self.modify( self.userFile, "spam = 'user'\n" )
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'user' )
+        self.assertTrue( os.path.exists( self.snapshotFile ) )
+
+        self.modify( self.userFile, "spam = os.getenv( 'SPAM', 'unset' )\n" )
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'bar' )
+
+        del os.environ[ 'SPAM' ]
+        self.assertEqual( self.getConfig().getConfigOption( 'spam' ), 'unset' )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+from ToolBOSCore.BuildSystem import BSTDaemon
+from ToolBOSCore.Util        import FastScript
+
+
+pkgInfoTemplate = '''# -*- coding: utf-8 -*-
+
+name             = '%(package)s'
+package          = '%(package)s'
+category         = 'Libraries'
+version          = '1.0'
+revision         = '1'
+patchlevel       = 1
+depends          = %(depends)r
+buildDepends     = []
+
+
+# EOF
+'''
+
+
+class TestBSTDaemon( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.oldEnv = dict( os.environ )
+        self.sitDir = os.path.join( self.tmpDir.name, 'SIT' )
+
+        os.environ[ 'HOME' ] = os.path.join( self.tmpDir.name, 'home' )
+        os.environ[ 'SIT' ]  = self.sitDir
+        os.environ.pop( 'BST_DAEMON', None )
+
+        self.writePackage( 'Bar', [] )
+        self.writePackage( 'Foo', [ 'sit://Libraries/Bar/1.0' ] )
+
+
+    def tearDown( self ):
+        BSTDaemon.stop()
+
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def writePackage( self, package, depends ):
+        installRoot = os.path.join( self.sitDir, 'Libraries', package, '1.0.1' )
+        versionLink = os.path.join( self.sitDir, 'Libraries', package, '1.0' )
+
+        FastScript.mkdir( installRoot )
+
+        if not os.path.islink( versionLink ):
+            os.symlink( '1.0.1', versionLink )
+
+        FastScript.setFileContent( os.path.join( installRoot, 'pkgInfo.py' ),
+                                   pkgInfoTemplate % { 'package': package,
+                                                       'depends': depends } )
+
+
+    def listDependencies( self, canonicalPath ):
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout( output ):
+            served, _ = BSTDaemon.tryExecute( 'listDependencies',
+                                              canonicalPath=canonicalPath,
+                                              asList=True )
+
+        self.assertTrue( served )
+
+        return output.getvalue().split()
+
+
+    def test_notRunning( self ):
+        self.assertIsNone( BSTDaemon.getStatus() )
+        self.assertEqual( BSTDaemon.tryExecute( 'ping' ), ( False, None ) )
+
+
+    def test_listDependencies( self ):
+        BSTDaemon.start( 60 )
+
+        self.assertIsNotNone( BSTDaemon.getStatus() )
+
+        self.assertEqual( self.listDependencies( 'Libraries/Foo/1.0' ),
+                          [ 'sit://Libraries/Bar/1.0' ] )
+
+        # newly installed package + changed pkgInfo.py must be noticed
+        self.writePackage( 'Baz', [] )
+        self.writePackage( 'Foo', [ 'sit://Libraries/Bar/1.0',
+                                    'sit://Libraries/Baz/1.0' ] )
+
+        self.assertEqual( self.listDependencies( 'Libraries/Foo/1.0' ),
+                          [ 'sit://Libraries/Bar/1.0', 'sit://Libraries/Baz/1.0' ] )
+
+        # can be bypassed
+        os.environ[ 'BST_DAEMON' ] = 'FALSE'
+        self.assertEqual( BSTDaemon.tryExecute( 'ping' ), ( False, None ) )
+
+        self.assertTrue( BSTDaemon.stop() )
+
+        for _ in range( 50 ):
+            if BSTDaemon.getStatus() is None:
+                break
+
+            time.sleep( 0.1 )
+
+        self.assertIsNone( BSTDaemon.getStatus() )
+
+
+    def test_singleInstance( self ):
+        BSTDaemon.start( 60 )
+        pid = BSTDaemon.getStatus()[ 'pid' ]
+
+        # neither a second daemon nor a stale socket check removes the
+        # socket of the running one
+        with self.assertRaises( OSError ):
+            BSTDaemon.serve( 1 )
+
+        BSTDaemon.start( 60 )
+        self.assertEqual( BSTDaemon.getStatus()[ 'pid' ], pid )
+        self.assertIn( socket.gethostname(), BSTDaemon.getSocketPath() )
+
+
+    def test_staleSocket( self ):
+        socketPath = BSTDaemon.getSocketPath()
+        FastScript.mkdir( os.path.dirname( socketPath ) )
+
+        # socket file left behind by a crashed daemon
+        sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        sock.bind( socketPath )
+        sock.close()
+
+        self.assertIsNone( BSTDaemon.getStatus() )
+
+        BSTDaemon.start( 60 )
+        self.assertIsNotNone( BSTDaemon.getStatus() )
+
+
+    def test_streaming( self ):
+        daemon   = BSTDaemon._Daemon()
+        messages = []
+        request  = { 'command'   : 'listDependencies',
+                     'kwargs'    : { 'canonicalPath': 'Libraries/Foo/1.0',
+                                     'asList': True },
+                     'cwd'       : os.getcwd(),
+                     'env'       : dict( os.environ ),
+                     'debugLevel': FastScript.getDebugLevel(),
+                     'root'      : BSTDaemon._getPackageRoot() }
+
+        response = daemon.handle( json.dumps( request ), messages.append )
+
+        # output is sent while being produced, not with the response
+        self.assertTrue( response[ 'served' ] )
+        self.assertNotIn( 'exception', response )
+        self.assertNotIn( 'stdout', response )
+
+        stdout = ''.join( message[ 'data' ] for message in messages
+                          if message[ 'stream' ] == 'stdout' )
+
+        self.assertEqual( stdout.split(), [ 'sit://Libraries/Bar/1.0' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  Micro-benchmarks for the FastScript require*() contracts
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+#----------------------------------------------------------------------------
+# Scenarios (executed in a subprocess each)
+#----------------------------------------------------------------------------
+
+
+_setup = '''
+import logging
+import types
+
+from ToolBOSCore.BuildSystem.InstallProcedure import InstallProcedure
+from ToolBOSCore.Packages                     import ProjectProperties
+from ToolBOSCore.Packages.PackageRecord       import PackageRecord
+from ToolBOSCore.Util                         import FastScript
+
+logging.getLogger().setLevel( logging.WARNING )
+
+n        = %(size)d
+index    = [ ( 'src/File%%d.c' %% i, 'dst/File%%d.c' %% i ) for i in range( n ) ]
+excluded = [ 'src/File1', 'src/Other', 'doc/', 'build/' ]
+paths    = [ 'Libraries/Package%%d/1.%%d' %% ( i, i %% 10 ) for i in range( n ) ]
+deps     = [ [ 'sit://' + p, [ 'sit://' + q for q in paths[ i : i + 5 ] ] ]
+             for i, p in enumerate( paths[ :n // 10 ] ) ]
+
+def install():
+    details = types.SimpleNamespace( installExclude=excluded )
+    obj     = types.SimpleNamespace( index=list( index ), details=details )
+
+    InstallProcedure._exclude( obj )
+
+def resolve():
+    FastScript.reduceList( deps )
+
+def canonical():
+    for path in paths:
+        ProjectProperties.requireIsCanonicalPath( path )
+
+def records():
+    for path in paths:
+        PackageRecord( path, '/tmp/' + path, versionTokens=( 1, 0 ),
+                       dependencies=( 'sit://Libraries/Foo/1.0', ) )
+'''
+
+
+scenarios = ( 'install', 'resolve', 'canonical', 'records' )
+
+
+def runScenarios( size, repeat, contracts ):
+    """
+        Runs all scenarios in a fresh Python interpreter with the contracts
+        turned on or off, and returns a dict { scenario: seconds } with
+        the best time of 'repeat' runs.
+    """
+    env = dict( os.environ )
+    env[ 'TOOLBOSCORE_CONTRACTS' ] = 'TRUE' if contracts else 'FALSE'
+
+    script = '''
+import json
+import timeit
+
+setup  = %r
+result = {}
+
+for name in %r:
+    timer = timeit.Timer( name + '()', setup=setup )
+    result[ name ] = min( timer.repeat( repeat=%d, number=1 ) )
+
+print( json.dumps( result ) )
+''' % ( _setup % { 'size': size }, scenarios, repeat )
+
+    output = subprocess.check_output( [ sys.executable, '-c', script ], env=env )
+
+    return json.loads( output )
+
+
+#----------------------------------------------------------------------------
+# Main program
+#----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser( description='FastScript contracts micro-benchmarks' )
+
+    parser.add_argument( '-n', '--size', type=int, default=20000,
+                         help='number of files / packages per scenario' )
+
+    parser.add_argument( '-r', '--repeat', type=int, default=5,
+                         help='number of runs per scenario (best is taken)' )
+
+    args     = parser.parse_args()
+    withC    = runScenarios( args.size, args.repeat, True )
+    withoutC = runScenarios( args.size, args.repeat, False )
+
+    print( '%-12s %12s %12s %8s' % ( 'scenario', 'contracts', 'no contracts', 'saved' ) )
+
+    for name in scenarios:
+        saved = 1.0 - withoutC[ name ] / withC[ name ] if withC[ name ] else 0.0
+
+        print( '%-12s %10.2fms %10.2fms %7.1f%%' % ( name,
+                                                    withC[ name ] * 1000,
+                                                    withoutC[ name ] * 1000,
+                                                    saved * 100 ) )
+
+
+if __name__ == '__main__':
+    main()
+
+
+# EOF
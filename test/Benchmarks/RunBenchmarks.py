@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  End-to-end performance benchmarks on a synthetic SIT
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import SyntheticSIT
+
+from ToolBOSCore.Util import FastScript
+
+
+#----------------------------------------------------------------------------
+# Benchmarks
+#----------------------------------------------------------------------------
+
+
+class Benchmarks( object ):
+    """
+        Each benchmark consists of an (untimed) setup and a timed run,
+        both executed 'repeat' times. In-process caches are dropped in
+        every setup so that each run starts cold.
+    """
+
+    def __init__( self, baseDir, sit ):
+        self.baseDir  = baseDir
+        self.sitRoot  = sit[ 'root' ]
+        self.sitProxy = sit[ 'proxy' ]
+        self.packages = sit[ 'packages' ]
+
+        # packages created last have the deepest dependency trees,
+        # packages created first have the most reverse dependencies
+        self.topPackage    = self.packages[ -1 ]
+        self.bottomPackage = self.packages[ 0 ]
+        self.srcPackage    = os.path.join( baseDir, 'src', 'BenchInstall', '1.0' )
+
+        _createSourcePackage( self.srcPackage, self.topPackage )
+
+
+    def getAll( self ):
+        """
+            Returns a list of ( name, setup, run ) tuples.
+        """
+        return [ ( 'SIT.getCanonicalPaths',      self._useRoot,  self.getCanonicalPaths ),
+                 ( 'MetaInfoCache.populate',     self._useRoot,  self.populateMetaInfoCache ),
+                 ( 'listDependencies',           self._useRoot,  self.listDependencies ),
+                 ( 'listDependencies (reverse)', self._useRoot,  self.listReverseDependencies ),
+                 ( 'getFlatDependencies',        self._useRoot,  self.getFlatDependencies ),
+                 ( 'updateProxyDir',             self._newProxy, self.updateProxyDir ),
+                 ( 'install (proxy)',            self._newProxy, self.installIntoProxy ),
+                 ( 'install (global)',           self._useRoot,  self.installGlobally ) ]
+
+
+    def getCanonicalPaths( self ):
+        from ToolBOSCore.Storage import SIT
+
+        SIT.getCanonicalPaths( self.sitRoot )
+
+
+    def populateMetaInfoCache( self ):
+        from ToolBOSCore.Packages.MetaInfoCache import MetaInfoCache
+
+        MetaInfoCache().populate()
+
+
+    def listDependencies( self ):
+        from ToolBOSCore.Packages.ListDependencies import listDependencies
+
+        with contextlib.redirect_stdout( io.StringIO() ):
+            listDependencies( self.topPackage, showDuplicates=True )
+
+
+    def listReverseDependencies( self ):
+        from ToolBOSCore.Packages.ListDependencies import listDependencies
+
+        with contextlib.redirect_stdout( io.StringIO() ):
+            listDependencies( self.bottomPackage, reverse=True )
+
+
+    def getFlatDependencies( self ):
+        from ToolBOSCore.Packages.ProjectProperties import getFlatDependencies
+
+        getFlatDependencies( self.packages[ -10: ], sitPath=self.sitRoot )
+
+
+    def updateProxyDir( self ):
+        from ToolBOSCore.Storage.ProxyDir import updateProxyDir
+
+        updateProxyDir( cleanHomeDirectory=False, fullResync=True )
+
+
+    def installIntoProxy( self ):
+        from ToolBOSCore.BuildSystem.InstallProcedure import ProxyInstallProcedure
+
+        self._install( ProxyInstallProcedure )
+
+
+    def installGlobally( self ):
+        from ToolBOSCore.BuildSystem.InstallProcedure import GlobalInstallProcedure
+
+        self._install( GlobalInstallProcedure )
+
+
+    def _install( self, procedure ):
+        # build out-of-tree to not require doxygen
+        binaryTree = os.path.join( self.srcPackage, 'build' )
+
+        with _chdir( self.srcPackage ):
+            procedure( self.srcPackage, binaryTree ).run()
+
+
+    def _useRoot( self ):
+        _resetCaches()
+        FastScript.setEnv( 'SIT', self.sitRoot )
+
+
+    def _newProxy( self ):
+        _resetCaches()
+        SyntheticSIT.createProxy( self.baseDir, self.packages )
+        FastScript.setEnv( 'SIT', self.sitProxy )
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def runBenchmarks( benchmarks, repeat, selected=None ):
+    """
+        Runs the given ( name, setup, run ) benchmarks and returns a dict
+        { name: { 'min': ..., 'mean': ..., 'max': ..., 'runs': [...] } }
+        with timings in seconds. Failing benchmarks get an 'error' entry.
+    """
+    results = {}
+
+    for name, setup, run in benchmarks:
+        if selected and not any( s.lower() in name.lower() for s in selected ):
+            continue
+
+        timings = []
+
+        try:
+            for _ in range( repeat ):
+                setup()
+
+                start = time.perf_counter()
+                run()
+                timings.append( time.perf_counter() - start )
+
+        except ( AssertionError, EnvironmentError, SystemExit ) as details:
+            results[ name ] = { 'error': str( details ) }
+            print( '%-28s failed: %s' % ( name, details ) )
+            continue
+
+        results[ name ] = { 'min':  min( timings ),
+                            'mean': statistics.mean( timings ),
+                            'max':  max( timings ),
+                            'runs': timings }
+
+        print( '%-28s %10.1fms  (mean %.1fms)' % ( name,
+                                                   results[ name ][ 'min' ] * 1000,
+                                                   results[ name ][ 'mean' ] * 1000 ) )
+        sys.stdout.flush()
+
+    return results
+
+
+def compareResults( results, baseline, tolerance ):
+    """
+        Prints the minimum timings of 'results' relative to the ones in
+        'baseline' and returns the names of all benchmarks which became
+        slower by more than 'tolerance' (e.g. 0.25 = 25%).
+    """
+    regressions = []
+
+    print( '\n%-28s %10s %10s %8s' % ( 'benchmark', 'baseline', 'current', 'change' ) )
+
+    for name, current in results.items():
+        previous = baseline.get( name )
+
+        if not previous or 'min' not in previous or 'min' not in current:
+            continue
+
+        change = current[ 'min' ] / previous[ 'min' ] - 1.0 if previous[ 'min' ] else 0.0
+        status = ''
+
+        if change > tolerance:
+            status = '  REGRESSION'
+            regressions.append( name )
+
+        print( '%-28s %8.1fms %8.1fms %+7.1f%%%s' % ( name,
+                                                    previous[ 'min' ] * 1000,
+                                                    current[ 'min' ] * 1000,
+                                                    change * 100, status ) )
+
+    return regressions
+
+
+#----------------------------------------------------------------------------
+# Private functions
+#----------------------------------------------------------------------------
+
+
+@contextlib.contextmanager
+def _chdir( path ):
+    oldDir = os.getcwd()
+    os.chdir( path )
+
+    try:
+        yield
+    finally:
+        os.chdir( oldDir )
+
+
+def _createSourcePackage( topLevelDir, dependency, numFiles=200 ):
+    os.makedirs( os.path.join( topLevelDir, 'include' ) )
+    os.makedirs( os.path.join( topLevelDir, 'build' ) )
+
+    for i in range( numFiles ):
+        with open( os.path.join( topLevelDir, 'include', 'File%04d.h' % i ), 'w' ) as fd:
+            fd.write( '/* %d */\n' % i )
+
+    with open( os.path.join( topLevelDir, 'pkgInfo.py' ), 'w' ) as fd:
+        fd.write( "name     = 'BenchInstall'\n"
+                  "version  = '1.0'\n"
+                  "category = 'Applications'\n"
+                  "depends  = [ 'sit://%s' ]\n" % dependency )
+
+
+def _resetCaches():
+    from ToolBOSCore.Packages            import ProjectProperties
+    from ToolBOSCore.Packages.BSTPackage import BSTInstalledPackage
+
+    BSTInstalledPackage._metaInfoCache = None
+    ProjectProperties._sitPkgCache     = None
+
+
+#----------------------------------------------------------------------------
+# Main program
+#----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser( description='run benchmarks on a synthetic SIT' )
+
+    parser.add_argument( '-c', '--categories', type=int, default=10,
+                         help='number of categories' )
+
+    parser.add_argument( '-p', '--packages', type=int, default=500,
+                         help='number of packages' )
+
+    parser.add_argument( '-v', '--versions', type=int, default=3,
+                         help='number of versions per package' )
+
+    parser.add_argument( '-d', '--dependencies', type=int, default=5,
+                         help='max. number of dependencies per package' )
+
+    parser.add_argument( '-r', '--repeat', type=int, default=3,
+                         help='number of runs per benchmark' )
+
+    parser.add_argument( '-o', '--output', help='write results to JSON file' )
+
+    parser.add_argument( '-b', '--baseline', help='compare against JSON file' )
+
+    parser.add_argument( '-t', '--tolerance', type=float, default=0.25,
+                         help='max. slowdown vs. baseline (default: 0.25 = 25%%)' )
+
+    parser.add_argument( '-k', '--keep', action='store_true',
+                         help='do not delete the synthetic SIT' )
+
+    parser.add_argument( 'benchmarks', nargs='*',
+                         help='run only benchmarks containing these words' )
+
+    args    = parser.parse_args()
+    baseDir = tempfile.mkdtemp( prefix='SyntheticSIT-' )
+
+    if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+        FastScript.setDebugLevel( 1 )
+
+    FastScript.setEnv( 'MAKEFILE_FASTINSTALL', 'TRUE' )
+
+    try:
+        print( 'creating synthetic SIT in %s' % baseDir )
+
+        sit = SyntheticSIT.createSIT( baseDir, args.categories, args.packages,
+                                      args.versions, args.dependencies )
+
+        results = runBenchmarks( Benchmarks( baseDir, sit ).getAll(),
+                                 args.repeat, args.benchmarks )
+    finally:
+        if args.keep:
+            print( 'keeping %s' % baseDir )
+        else:
+            shutil.rmtree( baseDir, ignore_errors=True )
+
+    data = { 'environment': { 'python':     platform.python_version(),
+                              'machine':    platform.machine(),
+                              'categories': args.categories,
+                              'packages':   args.packages,
+                              'versions':   args.versions,
+                              'repeat':     args.repeat },
+             'results':     results }
+
+    if args.output:
+        with open( args.output, 'w' ) as fd:
+            json.dump( data, fd, indent=4, sort_keys=True )
+
+    if args.baseline:
+        with open( args.baseline ) as fd:
+            baseline = json.load( fd )
+
+        if compareResults( results, baseline[ 'results' ], args.tolerance ):
+            raise SystemExit( 1 )
+
+
+if __name__ == '__main__':
+    main()
+
+
+# EOF
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  Generates a synthetic Software Installation Tree for benchmarking
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import argparse
+import json
+import os
+import random
+import shutil
+
+
+#----------------------------------------------------------------------------
+# Constants, settings,...
+#----------------------------------------------------------------------------
+
+
+# system packages randomly added to the dependencies
+debPackages = ( 'deb://libxml2-dev', 'deb://zlib1g-dev', 'deb://libboost-dev' )
+
+
+#----------------------------------------------------------------------------
+# Public functions
+#----------------------------------------------------------------------------
+
+
+def createSIT( baseDir, numCategories=5, numPackages=100, numVersions=3,
+               maxDependencies=5, deprecatedRatio=0.05, proxyRatio=0.8,
+               seed=0 ):
+    """
+        Creates a synthetic SIT below 'baseDir', consisting of:
+
+          <baseDir>/root     root SIT with 'numPackages' packages spread
+                             over 'numCategories' categories, each of them
+                             with 'numVersions' major.minor versions,
+                             installed as patchlevel directory with
+                             2-digit symlink, e.g. "1.2 -> 1.2.7"
+
+          <baseDir>/proxy    proxy SIT ('parentTree' pointing to the root
+                             SIT) with links to 'proxyRatio' of the
+                             packages, and some broken links to versions
+                             not present in the root SIT
+
+        Each version has a pkgInfo.py with up to 'maxDependencies' SIT
+        dependencies. A package only depends on packages generated before,
+        so that the dependency graph is a DAG. Roughly 'deprecatedRatio'
+        of the packages / versions get flagged as deprecated.
+
+        The same 'seed' always gives the same SIT.
+
+        Returns a dict with the paths of the root and proxy SIT, and the
+        canonical paths of all packages in order of creation.
+    """
+    rand    = random.Random( seed )
+    sitRoot = os.path.join( baseDir, 'root' )
+    created = []
+
+    for i in range( numPackages ):
+        category    = 'Category%02d' % ( i % numCategories )
+        packageName = 'Package%05d' % i
+        packageDir  = os.path.join( sitRoot, category, packageName )
+
+        os.makedirs( packageDir )
+
+        if rand.random() < deprecatedRatio:
+            _writeFile( os.path.join( packageDir, 'deprecated.txt' ), '' )
+
+        for minor in range( numVersions ):
+            version       = '1.%d' % minor
+            patchlevel    = '%s.%d' % ( version, rand.randint( 1, 999 ) )
+            canonicalPath = '%s/%s/%s' % ( category, packageName, version )
+            installRoot   = os.path.join( packageDir, patchlevel )
+
+            os.makedirs( os.path.join( installRoot, 'include' ) )
+            os.symlink( patchlevel, os.path.join( packageDir, version ) )
+
+            depends = _getRandomDependencies( rand, created, maxDependencies )
+
+            _writeFile( os.path.join( installRoot, 'pkgInfo.py' ),
+                        _getPkgInfoContent( category, packageName, version,
+                                            patchlevel, depends ) )
+
+            _writeFile( os.path.join( installRoot, 'include', packageName + '.h' ),
+                        '/* %s */\n' % canonicalPath )
+
+            if rand.random() < deprecatedRatio:
+                _writeFile( os.path.join( installRoot, 'deprecated.txt' ),
+                            'superseded by a newer version\n' )
+
+        created.extend( '%s/%s/1.%d' % ( category, packageName, minor )
+                        for minor in range( numVersions ) )
+
+    sitProxy = createProxy( baseDir, created, proxyRatio, seed )
+
+    return { 'root': sitRoot, 'proxy': sitProxy, 'packages': created }
+
+
+def createProxy( baseDir, canonicalPaths, proxyRatio=0.8, seed=0 ):
+    """
+        (Re-)creates the proxy SIT <baseDir>/proxy for the root SIT
+        <baseDir>/root, see createSIT().
+    """
+    rand     = random.Random( seed )
+    sitRoot  = os.path.join( baseDir, 'root' )
+    sitProxy = os.path.join( baseDir, 'proxy' )
+
+    if os.path.exists( sitProxy ):
+        shutil.rmtree( sitProxy )
+
+    os.makedirs( sitProxy )
+    os.symlink( sitRoot, os.path.join( sitProxy, 'parentTree' ) )
+
+    for canonicalPath in canonicalPaths:
+        if rand.random() >= proxyRatio:
+            continue                     # "new" package, not yet linked
+
+        rootDir     = os.path.join( sitRoot, canonicalPath )
+        proxyDir    = os.path.join( sitProxy, canonicalPath )
+        patchlevel  = os.readlink( rootDir )
+        rootPkgDir  = os.path.dirname( rootDir )
+        proxyPkgDir = os.path.dirname( proxyDir )
+
+        os.makedirs( proxyPkgDir, exist_ok=True )
+        os.symlink( rootDir, proxyDir )
+        os.symlink( os.path.join( rootPkgDir, patchlevel ),
+                    os.path.join( proxyPkgDir, patchlevel ) )
+
+        if rand.random() < 0.02:
+            # link to a patchlevel which has meanwhile been removed
+            os.symlink( os.path.join( rootPkgDir, patchlevel + '0' ),
+                        os.path.join( proxyPkgDir, patchlevel + '0' ) )
+
+    return sitProxy
+
+
+#----------------------------------------------------------------------------
+# Private functions
+#----------------------------------------------------------------------------
+
+
+def _getRandomDependencies( rand, created, maxDependencies ):
+    if not created:
+        return []
+
+    num     = rand.randint( 0, min( maxDependencies, len( created ) ) )
+    depends = [ 'sit://' + path for path in rand.sample( created, num ) ]
+
+    if rand.random() < 0.2:
+        depends.append( rand.choice( debPackages ) )
+
+    return depends
+
+
+def _getPkgInfoContent( category, packageName, version, patchlevel, depends ):
+    lines = [ '# -*- coding: utf-8 -*-',
+              '',
+              'name             = %r' % packageName,
+              'package          = %r' % packageName,
+              'category         = %r' % category,
+              'version          = %r' % version,
+              'revision         = %r' % patchlevel.split( '.' )[-1],
+              'patchlevel       = %d' % int( patchlevel.split( '.' )[-1] ),
+              'depends          = %s' % json.dumps( depends ),
+              'buildDepends     = []',
+              '',
+              '',
+              '# EOF' ]
+
+    return '\n'.join( lines ) + '\n'
+
+
+def _writeFile( path, content ):
+    with open( path, 'w' ) as fd:
+        fd.write( content )
+
+
+#----------------------------------------------------------------------------
+# Main program
+#----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser( description='create synthetic SIT for benchmarking' )
+
+    parser.add_argument( 'baseDir', help='directory to create (must not exist)' )
+
+    parser.add_argument( '-c', '--categories', type=int, default=5,
+                         help='number of categories' )
+
+    parser.add_argument( '-p', '--packages', type=int, default=100,
+                         help='number of packages' )
+
+    parser.add_argument( '-v', '--versions', type=int, default=3,
+                         help='number of versions per package' )
+
+    parser.add_argument( '-d', '--dependencies', type=int, default=5,
+                         help='max. number of dependencies per package' )
+
+    parser.add_argument( '-s', '--seed', type=int, default=0,
+                         help='random seed' )
+
+    args = parser.parse_args()
+
+    if os.path.exists( args.baseDir ):
+        raise SystemExit( '%s: already exists' % args.baseDir )
+
+    result = createSIT( args.baseDir, args.categories, args.packages,
+                        args.versions, args.dependencies, seed=args.seed )
+
+    print( 'root SIT:  %s' % result[ 'root' ] )
+    print( 'proxy SIT: %s' % result[ 'proxy' ] )
+
+
+if __name__ == '__main__':
+    main()
+
+
+# EOF
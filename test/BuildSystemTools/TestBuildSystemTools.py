@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import glob
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.BuildSystem import BuildSystemTools
+from ToolBOSCore.Util        import FastScript
+
+
+# sample tree, to be removed at distclean or not
+removedFiles = [ '.tmp-install-1234/foo',
+                 '.mainui.md5',
+                 'bin/focal64/foo',
+                 'build/CMakeCache.txt',
+                 'doc/autoDoxyfile',
+                 'doc/doxygen.fingerprint',
+                 'doc/doxygen.tag',
+                 'doc/html/index.html',
+                 'examples/BashSrc',
+                 'install/BashSrc',
+                 'install/BashSrc.flat',
+                 'install/Foo.tar.bz2',
+                 'install/packageVar.cmake',
+                 'install/pkgInfo.py',
+                 'lib/focal64/libFoo.so',
+                 'lib/jammy64/libFoo.so',
+                 'precompiled/package/foo.tar.gz',
+                 'qt/main.h',
+                 'sources/foo.c',
+                 'src/.mainui.md5',
+                 'src/Foo.c~',
+                 'src/Foo.pyc',
+                 'src/Foo_pylint.log',
+                 'src/bin/focal64/foo',
+                 'src/deep/qt/moc_main.cpp',
+                 'src/focal64/Foo.o',
+                 'src/moc_main.cpp',
+                 'src/qrc_main.cpp',
+                 'src/qt/main.cpp',
+                 'src/qt/main.h',
+                 'src/ui_main.h',
+                 'test/focal64/TestFoo' ]
+
+keptFiles    = [ '.bak',
+                 '.hidden~',
+                 'CMakeLists.txt',
+                 'doc/Foo.dox',
+                 'doc/userDoxyfile',
+                 'install/Foo.tar.gz',
+                 'install/LinkAllLibraries',
+                 'lib/windows/libFoo.dll',
+                 'precompiled/other/foo.tar.gz',
+                 'src/.Foo.c~',
+                 'src/Foo.c',
+                 'src/deep/main.h',
+                 'src/qt/sub/main.h',
+                 'test/BashSrc.bak.txt' ]
+
+
+class TestBuildSystemTools( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir      = tempfile.TemporaryDirectory()
+        self.topLevelDir = os.path.join( self.tmpDir.name, 'Foo', '1.0' )
+        self.outsideDir  = os.path.join( self.tmpDir.name, 'outside' )
+
+        for relPath in removedFiles + keptFiles:
+            FastScript.setFileContent( os.path.join( self.topLevelDir, relPath ), '' )
+
+        FastScript.setFileContent( os.path.join( self.outsideDir, 'Foo.pyc' ), '' )
+        FastScript.setFileContent( os.path.join( self.outsideDir, 'focal64', 'foo' ), '' )
+
+        # symlinks: removed themselves if matching, but never followed
+        for linkName, target in ( ( 'obj/focal64',  self.outsideDir ),
+                                  ( 'outside',      self.outsideDir ),
+                                  ( 'src/old.bak',  'missing' ),
+                                  ( 'src/link.c',   'Foo.c' ) ):
+            linkPath = os.path.join( self.topLevelDir, linkName )
+
+            FastScript.mkdir( os.path.dirname( linkPath ) )
+            os.symlink( target, linkPath )
+
+
+    def tearDown( self ):
+        self.tmpDir.cleanup()
+
+
+    def getPlan( self, patternList ):
+        matcher = BuildSystemTools._compileDistcleanPatterns( patternList )
+        plan    = BuildSystemTools._getDistcleanPlan( self.topLevelDir, matcher )
+
+        return [ os.path.relpath( path, self.topLevelDir ) for path in plan ]
+
+
+    def getGlobPlan( self, patternList ):
+        # reference: previous implementation, applying glob.glob() with
+        # each pattern in each (non-symlinked) subdirectory
+        result = set()
+
+        for dirPath, dirNames, fileNames in os.walk( self.topLevelDir ):
+            for pattern in patternList:
+                result.update( glob.glob( os.path.join( dirPath, pattern ) ) )
+
+        result = [ os.path.relpath( path, self.topLevelDir ) for path in result ]
+
+        # content of directories to be removed is not listed separately
+        return sorted( path for path in result
+                       if not any( path.startswith( parent + '/' ) for parent in result ) )
+
+
+    def test_distcleanPlan( self ):
+        patternList = BuildSystemTools.getDefaultDistcleanPatterns()
+        plan        = self.getPlan( patternList )
+
+        self.assertEqual( plan, self.getGlobPlan( patternList ) )
+
+        for relPath in removedFiles + [ 'obj/focal64', 'src/old.bak' ]:
+            self.assertTrue( any( relPath == path or relPath.startswith( path + '/' )
+                                  for path in plan ), relPath )
+
+        for relPath in keptFiles + [ 'outside', 'src/link.c' ]:
+            self.assertFalse( any( relPath == path or relPath.startswith( path + '/' )
+                                   for path in plan ), relPath )
+
+        # nothing outside the top-level directory
+        for path in plan:
+            self.assertFalse( path.startswith( ( '..', 'outside/' ) ), path )
+
+
+    def test_customPatterns( self ):
+        patternList = [ '*.c', 'src/[!F]*', 'sub', 'doc/?oo.dox', '.*', 'qt/[ab]*' ]
+
+        self.assertEqual( self.getPlan( patternList ), self.getGlobPlan( patternList ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
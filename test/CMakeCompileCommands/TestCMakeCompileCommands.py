@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Storage.CMakeCompileCommands import CMakeCompileCommands
+from ToolBOSCore.Util                         import FastScript
+
+
+class TestCMakeCompileCommands( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir   = tempfile.TemporaryDirectory()
+        self.oldCwd   = os.getcwd()
+        self.topDir   = os.path.join( self.tmpDir.name, 'Foo', '1.0' )
+        self.buildDir = os.path.join( self.topDir, 'build', 'focal64' )
+        self.jsonFile = os.path.join( self.buildDir, 'compile_commands.json' )
+        self.fooFile  = os.path.join( self.topDir, 'src', 'Foo.c' )
+        self.barFile  = os.path.join( self.topDir, 'src', 'Bar.c' )
+        self.bazFile  = os.path.join( self.topDir, 'src', 'Baz.c' )
+
+        for filePath in ( self.fooFile, self.barFile, self.bazFile ):
+            FastScript.setFileContent( filePath, 'int foo;\n' )
+
+        # 'command' form with absolute path, 'arguments' form with path
+        # relative to the build directory, the first entry of a file wins
+        self.writeJSON( [ { 'directory': self.buildDir,
+                            'command':   'cc -DFOO=1 "-DNAME=\\"Foo Bar\\"" -I/inc/a '
+                                         "-I'/inc/with space' -c -o Foo.o %s" % self.fooFile,
+                            'file':      self.fooFile },
+                          { 'directory': self.buildDir,
+                            'arguments': [ 'cc', '-DBAR', '-I/inc/b', '-c', '-o', 'Bar.o',
+                                           '../../src/Bar.c' ],
+                            'file':      '../../src/Bar.c' },
+                          { 'directory': self.buildDir,
+                            'command':   'cc -DOTHER -c %s' % self.fooFile,
+                            'file':      self.fooFile } ] )
+
+
+    def tearDown( self ):
+        os.chdir( self.oldCwd )
+
+        self.tmpDir.cleanup()
+
+
+    def writeJSON( self, data ):
+        FastScript.setFileContent( self.jsonFile, json.dumps( data ) )
+
+
+    def test_commandForms( self ):
+        c = CMakeCompileCommands( self.jsonFile )
+
+        self.assertEqual( c.getCompilerCommand( self.fooFile ),
+                          'cc -DFOO=1 "-DNAME=\\"Foo Bar\\"" -I/inc/a '
+                          "-I'/inc/with space' -c -o Foo.o %s" % self.fooFile )
+        self.assertEqual( c.getDefinesAsString( self.fooFile ), '-DFOO=1 -DNAME="Foo Bar" ' )
+        self.assertEqual( c.getIncludePathsAsString( self.fooFile ),
+                          '-I/inc/a -I/inc/with space ' )
+
+        self.assertEqual( c.getCompilerCommand( self.barFile ),
+                          'cc -DBAR -I/inc/b -c -o Bar.o ../../src/Bar.c' )
+        self.assertEqual( c.getDefinesAsString( self.barFile ), '-DBAR ' )
+        self.assertEqual( c.getIncludePathsAsString( self.barFile ), '-I/inc/b ' )
+
+
+    def test_index( self ):
+        c = CMakeCompileCommands( self.jsonFile )
+
+        self.assertEqual( c.getFiles(), [ self.fooFile, self.barFile, self.fooFile ] )
+
+        # relative to the current working directory
+        os.chdir( self.topDir )
+        self.assertEqual( c.getDefinesAsString( 'src/Bar.c' ), '-DBAR ' )
+        self.assertEqual( c.getDefinesAsString( './src/../src/Foo.c' ),
+                          '-DFOO=1 -DNAME="Foo Bar" ' )
+
+        # no information
+        self.assertRaises( ValueError, c.getDefinesAsString, self.bazFile )
+        self.assertRaises( ValueError, c.getCompilerCommand, self.bazFile )
+
+        self.assertEqual( c.getDefinesForFiles( [ self.fooFile, self.barFile, self.bazFile ] ),
+                          { self.fooFile: '-DFOO=1 -DNAME="Foo Bar" ',
+                            self.barFile: '-DBAR ',
+                            self.bazFile: None } )
+        self.assertEqual( c.getIncludePathsForFiles( [ self.barFile, self.bazFile ] ),
+                          { self.barFile: '-I/inc/b ', self.bazFile: None } )
+
+
+    def test_reload( self ):
+        c = CMakeCompileCommands( self.jsonFile )
+
+        self.assertEqual( c.getDefinesAsString( self.barFile ), '-DBAR ' )
+        self.assertRaises( ValueError, c.getDefinesAsString, self.bazFile )
+
+        # re-running CMake
+        stat = os.stat( self.jsonFile )
+
+        self.writeJSON( [ { 'directory': self.buildDir,
+                            'arguments': [ 'cc', '-DBAR=2', '-c', self.barFile ],
+                            'file':      self.barFile },
+                          { 'directory': self.buildDir,
+                            'arguments': [ 'cc', '-DBAZ', '-c', self.bazFile ],
+                            'file':      self.bazFile } ] )
+
+        os.utime( self.jsonFile, ns=( stat.st_atime_ns, stat.st_mtime_ns + 10**9 ) )
+
+        self.assertEqual( c.getFiles(), [ self.barFile, self.bazFile ] )
+        self.assertEqual( c.getDefinesAsString( self.barFile ), '-DBAR=2 ' )
+        self.assertEqual( c.getDefinesAsString( self.bazFile ), '-DBAZ ' )
+        self.assertRaises( ValueError, c.getDefinesAsString, self.fooFile )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Settings.ConfigOptions import ConfigOptions
+from ToolBOSCore.Util                   import FastScript
+
+
+class TestConfigOptions( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir      = tempfile.TemporaryDirectory()
+        self.oldEnv      = dict( os.environ )
+        self.oldCwd      = os.getcwd()
+        self.appRoot     = os.path.join( self.tmpDir.name, 'Foo' )
+        self.addDir      = os.path.join( self.tmpDir.name, 'add' )
+        self.cwdDir      = os.path.join( self.tmpDir.name, 'cwd' )
+        self.defaultFile = os.path.join( self.appRoot, 'etc', 'Foo.conf' )
+        self.addFile     = os.path.join( self.addDir, 'Foo.conf' )
+        self.cwdFile     = os.path.join( self.cwdDir, 'Foo.conf' )
+        self.userFile    = os.path.join( self.tmpDir.name, 'home', '.HRI', 'Foo', 'Foo.conf' )
+
+        os.environ[ 'HOME' ] = os.path.join( self.tmpDir.name, 'home' )
+
+        FastScript.setFileContent( self.defaultFile,
+                                   "spam  = 'default'\neggs  = 'default'\n"
+                                   "ham   = 'default'\nbacon = 'default'\n" )
+        FastScript.mkdir( self.cwdDir )
+        os.chdir( self.cwdDir )
+
+
+    def tearDown( self ):
+        os.chdir( self.oldCwd )
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def modify( self, filePath, content ):
+        # ensure a different mtime even on filesystems with coarse timestamps
+        stat = os.stat( filePath )
+
+        FastScript.setFileContent( filePath, content )
+        os.utime( filePath, ns=( stat.st_atime_ns, stat.st_mtime_ns + 10**9 ) )
+
+
+    def getFilesExecuted( self ):
+        return FastScript.getCounters().get( 'filesExecuted', 0 )
+
+
+    def test_precedence( self ):
+        FastScript.setFileContent( self.userFile, "eggs = 'user'\nham = 'user'\n" )
+        FastScript.setFileContent( self.addFile,  "ham = 'add'\nbacon = 'add'\n" )
+        FastScript.setFileContent( self.cwdFile,  "bacon = 'cwd'\n" )
+
+        config = ConfigOptions( 'Foo', self.appRoot )
+        config.addPath( self.addDir )
+
+        expected = { 'spam':  ( 'default', self.defaultFile ),
+                     'eggs':  ( 'user',    self.userFile ),
+                     'ham':   ( 'add',     self.addFile ),
+                     'bacon': ( 'cwd',     self.cwdFile ) }
+
+        for name, ( value, source ) in expected.items():
+            self.assertEqual( config.getConfigOption( name ), value )
+            self.assertEqual( config.getConfigOptionSource( name ), source )
+
+        self.assertEqual( config.getConfigOptions(),
+                          { name: value for name, ( value, source ) in expected.items() } )
+        self.assertEqual( config.getUserConfigOptions(), { 'eggs': 'user', 'ham': 'user' } )
+
+        self.assertRaises( KeyError, config.getConfigOption, 'unknown' )
+        self.assertRaises( KeyError, config.getConfigOptionSource, 'unknown' )
+
+
+    def test_cache( self ):
+        config = ConfigOptions( 'Foo', self.appRoot )
+
+        self.assertEqual( config.getConfigOption( 'spam' ), 'default' )
+
+        # configfiles are evaluated only once
+        executed = self.getFilesExecuted()
+
+        for name in ( 'spam', 'eggs', 'ham', 'bacon' ):
+            self.assertEqual( config.getConfigOption( name ), 'default' )
+
+        self.assertEqual( self.getFilesExecuted(), executed )
+
+        # ...unless modified
+        self.modify( self.defaultFile, "spam = 'modified'\n" )
+        self.assertEqual( config.getConfigOption( 'spam' ), 'modified' )
+        self.assertRaises( KeyError, config.getConfigOption, 'eggs' )
+        self.assertEqual( self.getFilesExecuted(), executed + 1 )
+
+        # setting user options updates the cache without re-evaluation
+        config.setUserConfigOption( 'spam', 'user' )
+        config.setUserConfigOption( 'eggs', 'user' )
+
+        executed = self.getFilesExecuted()
+
+        self.assertEqual( config.getConfigOption( 'spam' ), 'user' )
+        self.assertEqual( config.getConfigOption( 'eggs' ), 'user' )
+        self.assertEqual( config.getConfigOptionSource( 'spam' ), self.userFile )
+        self.assertEqual( self.getFilesExecuted(), executed )
+
+        # ...and is consistent with a fresh instance reading the file
+        self.assertEqual( ConfigOptions( 'Foo', self.appRoot ).getConfigOptions(),
+                          config.getConfigOptions() )
+
+        # deleting user options
+        config.delUserConfigOption( 'spam' )
+        self.assertEqual( config.getConfigOption( 'spam' ), 'modified' )
+        self.assertEqual( config.getConfigOptionSource( 'spam' ), self.defaultFile )
+        self.assertEqual( config.getUserConfigOptions(), { 'eggs': 'user' } )
+
+        config.delUserConfigOption( 'eggs' )
+        self.assertFalse( os.path.exists( self.userFile ) )
+        self.assertRaises( KeyError, config.getConfigOption, 'eggs' )
+        self.assertEqual( config.getUserConfigOptions(), {} )
+
+        # configfile created by someone else
+        FastScript.setFileContent( self.userFile, "eggs = 'other'\n" )
+        self.assertEqual( config.getConfigOption( 'eggs' ), 'other' )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
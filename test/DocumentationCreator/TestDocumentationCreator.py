@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.BuildSystem                      import DocumentationCreator
+from ToolBOSCore.BuildSystem.DocumentationCreator import DoxygenBackend
+from ToolBOSCore.Packages.PackageDetector         import PackageDetector
+from ToolBOSCore.Util                             import FastScript
+
+
+pkgInfoContent = '''# -*- coding: utf-8 -*-
+
+name             = 'Foo'
+package          = 'Foo'
+category         = 'Libraries'
+version          = '1.0'
+depends          = [ 'sit://Libraries/Bar/1.0' ]
+buildDepends     = []
+
+
+# EOF
+'''
+
+
+class TestDocumentationCreator( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir      = tempfile.TemporaryDirectory()
+        self.oldEnv      = dict( os.environ )
+        self.sitDir      = os.path.join( self.tmpDir.name, 'SIT' )
+        self.projectRoot = os.path.join( self.tmpDir.name, 'Foo', '1.0' )
+        self.sourceFile  = os.path.join( self.projectRoot, 'src', 'Foo.c' )
+        self.tagFile     = os.path.join( self.sitDir, 'Libraries', 'Bar', '1.0',
+                                         'doc', 'doxygen.tag' )
+
+        os.environ[ 'SIT' ] = self.sitDir
+
+        # documented dependency to cross-link with
+        FastScript.mkdir( os.path.join( os.path.dirname( self.tagFile ), 'html' ) )
+        FastScript.setFileContent( self.tagFile, '<tagfile/>\n' )
+
+        FastScript.mkdir( os.path.dirname( self.sourceFile ) )
+        FastScript.setFileContent( self.sourceFile, 'int foo;\n' )
+        FastScript.setFileContent( os.path.join( self.projectRoot, 'pkgInfo.py' ),
+                                   pkgInfoContent )
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def getFingerprint( self, numThreads=None ):
+        details = PackageDetector( self.projectRoot )
+        details.retrieveMakefileInfo()
+
+        backend = DoxygenBackend( details, self.sitDir, numThreads=numThreads )
+        backend.setup()
+
+        self.assertEqual( backend.depTagFiles, [ self.tagFile ] )
+
+        return backend.getFingerprint()
+
+
+    def modify( self, filePath, content ):
+        # ensure a different mtime even on filesystems with coarse timestamps
+        stat = os.stat( filePath )
+
+        FastScript.setFileContent( filePath, content )
+        os.utime( filePath, ns=( stat.st_atime_ns, stat.st_mtime_ns + 10**9 ) )
+
+
+    def test_stable( self ):
+        fingerprint = self.getFingerprint()
+
+        self.assertEqual( self.getFingerprint(), fingerprint )
+
+        # doxygen output is not an input
+        FastScript.mkdir( os.path.join( self.projectRoot, 'doc', 'html' ) )
+        FastScript.setFileContent( os.path.join( self.projectRoot, 'doc',
+                                                 'doxygen.tag' ), '<tagfile/>\n' )
+
+        self.assertEqual( self.getFingerprint(), fingerprint )
+
+
+    def test_ignoresThreadSettings( self ):
+        self.assertEqual( self.getFingerprint( 1 ), self.getFingerprint( 8 ) )
+
+
+    def test_buildOutputIgnored( self ):
+        fingerprint = self.getFingerprint()
+
+        for filePath in ( 'lib/focal64/libFoo.so', 'bin/focal64/foo' ):
+            filePath = os.path.join( self.projectRoot, filePath )
+
+            FastScript.mkdir( os.path.dirname( filePath ) )
+            FastScript.setFileContent( filePath, 'binary\n' )
+
+        self.assertEqual( self.getFingerprint(), fingerprint )
+
+
+    def test_generateAll( self ):
+        os.environ[ 'MAKEFILE_DOC' ] = 'FALSE'
+
+        barRoot = os.path.join( self.tmpDir.name, 'Bar', '1.0' )
+        FastScript.mkdir( barRoot )
+        FastScript.setFileContent( os.path.join( barRoot, 'pkgInfo.py' ),
+                                   pkgInfoContent.replace( 'Foo', 'Bar' ) )
+
+        missingRoot  = os.path.join( self.tmpDir.name, 'Missing', '1.0' )
+        projectRoots = [ self.projectRoot, barRoot, missingRoot ]
+        expected     = { self.projectRoot: True, barRoot: True, missingRoot: False }
+
+        self.assertEqual( DocumentationCreator.generateAll( [] ), {} )
+
+        for maxWorkers in ( 1, 2, None ):
+            self.assertEqual( DocumentationCreator.generateAll( projectRoots, self.sitDir,
+                                                                maxWorkers ), expected )
+
+
+    def test_sourceChanged( self ):
+        fingerprint = self.getFingerprint()
+
+        self.modify( self.sourceFile, 'int foo, bar;\n' )
+
+        self.assertNotEqual( self.getFingerprint(), fingerprint )
+
+
+    def test_doxyfileChanged( self ):
+        fingerprint  = self.getFingerprint()
+        userDoxyfile = os.path.join( self.projectRoot, 'doc', 'userDoxyfile' )
+
+        self.modify( userDoxyfile, 'EXTRACT_ALL = YES\n' )
+
+        self.assertNotEqual( self.getFingerprint(), fingerprint )
+
+
+    def test_tagFileChanged( self ):
+        fingerprint = self.getFingerprint()
+
+        self.modify( self.tagFile, '<tagfile><compound/></tagfile>\n' )
+
+        self.assertNotEqual( self.getFingerprint(), fingerprint )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
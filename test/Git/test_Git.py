@@ -35,6 +35,7 @@
 #
 
 
+import io
 import pytest
 import sys
 
@@ -53,6 +54,31 @@ def test_git2https():
     assert Git.git2https( testIn3 ) == expected
 
 
+def test_addAndBatchCheck( tmp_path, monkeypatch ):
+    monkeypatch.chdir( tmp_path )
+    monkeypatch.setattr( Git, '_argMax', 200 )   # enforce several batches
+
+    fileList = [ 'file %d.txt' % i for i in range( 50 ) ]
+
+    for fileName in fileList:
+        with open( fileName, 'w' ) as f:
+            f.write( fileName )
+
+    output = io.StringIO()
+    Git.FastScript.execProgram( 'git init -q', stdout=output, stderr=output )
+
+    Git.LocalGitRepository().add( fileList, output )
+
+    with Git.BatchCheck( str( tmp_path ) ) as objects:
+        result = objects.lookupAll( [ ':' + name for name in fileList ] )
+
+        assert objects.lookup( ':no such file' ) is None
+
+    for fileName in fileList:
+        assert result[ ':' + fileName ][1] == 'blob'
+        assert result[ ':' + fileName ][2] == len( fileName )
+
+
 if __name__ == "__main__":
     sys.exit( pytest.main( [ '-vv' ] ) )
 
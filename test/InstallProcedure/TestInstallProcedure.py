@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tarfile
+import tempfile
+import unittest
+
+from ToolBOSCore.BuildSystem.InstallProcedure import TarExportProcedure
+from ToolBOSCore.Util                         import FastScript
+
+
+pkgInfoContent = '''# -*- coding: utf-8 -*-
+
+name             = 'Foo'
+package          = 'Foo'
+category         = 'Libraries'
+version          = '1.0'
+depends          = []
+buildDepends     = []
+
+
+# EOF
+'''
+
+
+class TestTarExport( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir      = tempfile.TemporaryDirectory()
+        self.oldEnv      = dict( os.environ )
+        self.projectRoot = os.path.join( self.tmpDir.name, 'Foo', '1.0' )
+        self.cacheDir    = os.path.join( self.tmpDir.name, 'cache' )
+
+        os.environ[ 'SIT' ]               = os.path.join( self.tmpDir.name, 'SIT' )
+        os.environ[ 'BST_TARBALL_CACHE' ] = self.cacheDir
+        os.environ.pop( 'SOURCE_DATE_EPOCH', None )
+
+        FastScript.mkdir( self.projectRoot )
+        FastScript.setFileContent( os.path.join( self.projectRoot, 'pkgInfo.py' ),
+                                   pkgInfoContent )
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def export( self, files, fileName ):
+        """
+            Stages the given { relPath: content } below Libraries/Foo/1.0
+            and writes the tarball. The 'include' directory is scheduled
+            as a whole, like done by copyMatching().
+
+            Returns True if the tarball was taken from the cache.
+        """
+        procedure = TarExportProcedure( self.projectRoot )
+        procedure.onStartup()
+        self.addCleanup( FastScript.remove, procedure._tmpDir )
+
+        installRoot = os.path.join( 'Libraries', 'Foo', '1.0' )
+
+        for relPath, content in files.items():
+            filePath = os.path.join( procedure._tmpDir, installRoot, relPath )
+            FastScript.mkdir( os.path.dirname( filePath ) )
+            FastScript.setFileContent( filePath, content )
+
+        procedure.index = [ ( None, os.path.join( installRoot, 'pkgInfo.py' ) ),
+                            ( None, os.path.join( installRoot, 'include' ) ) ]
+
+        procedure._fileName = os.path.join( self.tmpDir.name, fileName )
+
+        with self.assertLogs( level='INFO' ) as logs:
+            procedure.postInstall()
+
+        return any( '(cached)' in line for line in logs.output )
+
+
+    def getMembers( self, fileName ):
+        with tarfile.open( os.path.join( self.tmpDir.name, fileName ) ) as t:
+            return { info.name: ( t.extractfile( info ).read().decode()
+                                  if info.isfile() else None, info.mtime )
+                     for info in t.getmembers() }
+
+
+    def getContent( self, fileName ):
+        return FastScript.getFileContent( os.path.join( self.tmpDir.name, fileName ),
+                                          asBinary=True )
+
+
+    def test_directoryEntries( self ):
+        self.export( { 'pkgInfo.py': 'spam',
+                       'include/Foo.h': 'foo',
+                       'include/Foo/Bar.h': 'bar' }, 'Foo.tar.bz2' )
+
+        members = self.getMembers( 'Foo.tar.bz2' )
+
+        self.assertEqual( sorted( members ),
+                          [ 'Libraries/Foo/1.0/include',
+                            'Libraries/Foo/1.0/include/Foo',
+                            'Libraries/Foo/1.0/include/Foo.h',
+                            'Libraries/Foo/1.0/include/Foo/Bar.h',
+                            'Libraries/Foo/1.0/pkgInfo.py' ] )
+
+        self.assertEqual( members[ 'Libraries/Foo/1.0/include/Foo/Bar.h' ], ( 'bar', 0 ) )
+
+
+    def test_cache( self ):
+        files = { 'pkgInfo.py': 'spam',
+                  'include/Foo.h': 'foo',
+                  'include/Foo/Bar.h': 'bar' }
+
+        self.assertFalse( self.export( files, 'first.tar.bz2' ) )
+        self.assertTrue( self.export( files, 'second.tar.bz2' ) )
+        self.assertEqual( self.getContent( 'first.tar.bz2' ),
+                          self.getContent( 'second.tar.bz2' ) )
+
+        # changed content within a staged directory
+        files[ 'include/Foo/Bar.h' ] = 'baz'
+
+        self.assertFalse( self.export( files, 'third.tar.bz2' ) )
+        self.assertEqual( self.getMembers( 'third.tar.bz2' )[ 'Libraries/Foo/1.0/include/Foo/Bar.h' ],
+                          ( 'baz', 0 ) )
+
+        # changed timestamp
+        os.environ[ 'SOURCE_DATE_EPOCH' ] = '1234567890'
+
+        self.assertFalse( self.export( files, 'fourth.tar.bz2' ) )
+        self.assertEqual( { mtime for _, mtime in self.getMembers( 'fourth.tar.bz2' ).values() },
+                          { 1234567890 } )
+
+        self.assertEqual( len( os.listdir( self.cacheDir ) ), 3 )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import io
+import json
+import unittest
+
+from ToolBOSCore.Packages.AbstractPackage import AbstractPackage
+from ToolBOSCore.Packages                 import ListDependencies
+from ToolBOSCore.Util                     import FastScript
+
+
+class FakePackage( AbstractPackage ):
+    """
+        Stands in for a BSTPackage with an already retrieved [reverse]
+        dependency tree.
+    """
+    def __init__( self, url ):
+        super( FakePackage, self ).__init__( url )
+
+        self.depTree    = []
+        self.revDepTree = []
+
+
+def createPackages( graph ):
+    """
+        Returns { name: FakePackage } for a graph given as
+        { name: [ names of dependencies ] }, with the reverse
+        dependencies set accordingly. Repeated occurrences share one
+        package object, like BSTPackage.retrieveDependencies() does.
+    """
+    packages = { name: FakePackage( getURL( name ) ) for name in graph }
+
+    for name, deps in graph.items():
+        for dep in deps:
+            packages[ name ].depTree.append( packages[ dep ] )
+            packages[ dep ].revDepTree.append( packages[ name ] )
+
+    return packages
+
+
+def getURL( name ):
+    return 'sit://Libraries/%s/1.0' % name
+
+
+def getOldTree( package, showDuplicates ):
+    """
+        Tree view as rendered before the streaming implementation.
+    """
+    def convert( package, duplicateData ):
+        treeData = []
+
+        for depPackage in package.depTree:
+            if showDuplicates or depPackage.url not in duplicateData:
+                treeData.append( depPackage.url )
+                duplicateData.add( depPackage.url )
+
+                tmp = convert( depPackage, duplicateData )
+
+                if tmp:
+                    treeData.append( tmp )
+
+        return treeData
+
+    return FastScript.getTreeView( convert( package, set() ) ).strip()
+
+
+class TestListDependencies( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.memoLimit = ListDependencies._memoLimit
+
+        # Foo uses Bar and Baz which both depend on Core (diamond)
+        self.packages = createPackages( { 'Foo':  [ 'Bar', 'Baz', 'Qux' ],
+                                          'Bar':  [ 'Core', 'Util' ],
+                                          'Baz':  [ 'Core' ],
+                                          'Qux':  [],
+                                          'Core': [ 'Util' ],
+                                          'Util': [] } )
+
+
+    def tearDown( self ):
+        ListDependencies._memoLimit = self.memoLimit
+
+
+    def getTree( self, package, reverse=False, recursive=True,
+                 showDuplicates=False, maxDepth=None ):
+        output = io.StringIO()
+
+        ListDependencies._showAsTree( package, reverse, recursive,
+                                      showDuplicates, maxDepth, output )
+
+        return output.getvalue().strip()
+
+
+    def test_uniqueTree( self ):
+        package = self.packages[ 'Foo' ]
+        tree    = self.getTree( package )
+
+        self.assertEqual( tree, getOldTree( package, False ) )
+        self.assertEqual( tree.splitlines(),
+                          [ '|---sit://Libraries/Bar/1.0',
+                            '|   `---sit://Libraries/Core/1.0',
+                            '|       `---sit://Libraries/Util/1.0',
+                            '|---sit://Libraries/Baz/1.0',
+                            '`---sit://Libraries/Qux/1.0' ] )
+
+
+    def test_reverseTree( self ):
+        tree = self.getTree( self.packages[ 'Util' ], reverse=True )
+
+        self.assertEqual( tree.splitlines(),
+                          [ '|---sit://Libraries/Bar/1.0',
+                            '|   `---sit://Libraries/Foo/1.0',
+                            '`---sit://Libraries/Core/1.0',
+                            '    `---sit://Libraries/Baz/1.0' ] )
+
+
+    def test_fullTree( self ):
+        # chain of diamonds: the full tree doubles with each level
+        graph = {}
+
+        for level in range( 8 ):
+            graph[ 'Top%d' % level   ] = [ 'Left%d' % level, 'Right%d' % level ]
+            graph[ 'Left%d' % level  ] = [ 'Top%d' % ( level + 1 ) ]
+            graph[ 'Right%d' % level ] = [ 'Top%d' % ( level + 1 ) ]
+
+        graph[ 'Top8' ] = []
+
+        package  = createPackages( graph )[ 'Top0' ]
+        expected = getOldTree( package, True )
+
+        self.assertEqual( len( expected.splitlines() ), 2 ** 10 - 4 )
+
+        # rendered once and re-used
+        self.assertEqual( self.getTree( package, showDuplicates=True ), expected )
+
+        # streamed without re-use
+        ListDependencies._memoLimit = 0
+        self.assertEqual( self.getTree( package, showDuplicates=True ), expected )
+
+        # each subtree rendered only once
+        urlGraph = ListDependencies._getGraph( package, False )
+        counts   = {}
+        memo     = {}
+
+        ListDependencies._memoLimit = self.memoLimit
+        lines = list( ListDependencies._iterFullTree( urlGraph, package.url, '',
+                                                      None, counts, memo ) )
+
+        self.assertEqual( '\n'.join( lines ), expected )
+        self.assertEqual( sorted( url for url, _ in memo ),
+                          sorted( url for url in urlGraph if url != package.url ) )
+
+
+    def test_cycle( self ):
+        packages = createPackages( { 'Foo': [ 'Bar' ],
+                                     'Bar': [ 'Baz', 'Qux' ],
+                                     'Baz': [ 'Foo' ],
+                                     'Qux': [] } )
+        expected = [ '`---sit://Libraries/Bar/1.0',
+                     '    |---sit://Libraries/Baz/1.0',
+                     '    `---sit://Libraries/Qux/1.0' ]
+
+        for showDuplicates in ( False, True ):
+            with self.assertLogs( level='WARNING' ) as logs:
+                tree = self.getTree( packages[ 'Foo' ],
+                                     showDuplicates=showDuplicates )
+
+            self.assertEqual( tree.splitlines(), expected )
+            self.assertIn( 'cyclic dependency', logs.output[0] )
+
+
+    def test_depth( self ):
+        package = self.packages[ 'Foo' ]
+
+        direct = [ '|---sit://Libraries/Bar/1.0',
+                   '|---sit://Libraries/Baz/1.0',
+                   '`---sit://Libraries/Qux/1.0' ]
+
+        self.assertEqual( self.getTree( package, maxDepth=1 ).splitlines(), direct )
+        self.assertEqual( self.getTree( package, recursive=False ).splitlines(), direct )
+
+        self.assertEqual( self.getTree( package, maxDepth=2 ).splitlines(),
+                          [ '|---sit://Libraries/Bar/1.0',
+                            '|   |---sit://Libraries/Core/1.0',
+                            '|   `---sit://Libraries/Util/1.0',
+                            '|---sit://Libraries/Baz/1.0',
+                            '`---sit://Libraries/Qux/1.0' ] )
+
+        self.assertEqual( self.getTree( package, showDuplicates=True,
+                                        maxDepth=2 ).splitlines(),
+                          [ '|---sit://Libraries/Bar/1.0',
+                            '|   |---sit://Libraries/Core/1.0',
+                            '|   `---sit://Libraries/Util/1.0',
+                            '|---sit://Libraries/Baz/1.0',
+                            '|   `---sit://Libraries/Core/1.0',
+                            '`---sit://Libraries/Qux/1.0' ] )
+
+        self.assertEqual( self.getTree( package, maxDepth=10 ),
+                          self.getTree( package ) )
+
+
+    def test_json( self ):
+        output = io.StringIO()
+        ListDependencies._showAsJSON( self.packages[ 'Foo' ], False, output=output )
+        data   = json.loads( output.getvalue() )
+
+        self.assertEqual( data[ 'package' ], getURL( 'Foo' ) )
+        self.assertFalse( data[ 'reverse' ] )
+        self.assertEqual( data[ 'graph' ],
+                          { getURL( 'Foo' ):  [ getURL( 'Bar' ), getURL( 'Baz' ),
+                                                getURL( 'Qux' ) ],
+                            getURL( 'Bar' ):  [ getURL( 'Core' ), getURL( 'Util' ) ],
+                            getURL( 'Baz' ):  [ getURL( 'Core' ) ],
+                            getURL( 'Qux' ):  [],
+                            getURL( 'Core' ): [ getURL( 'Util' ) ],
+                            getURL( 'Util' ): [] } )
+
+        # packages beyond max. depth are listed but not expanded
+        output = io.StringIO()
+        ListDependencies._showAsJSON( self.packages[ 'Foo' ], False, 1, output )
+        data   = json.loads( output.getvalue() )
+
+        self.assertEqual( data[ 'graph' ][ getURL( 'Bar' ) ], [] )
+        self.assertNotIn( getURL( 'Core' ), data[ 'graph' ] )
+
+
+    def test_dot( self ):
+        output = io.StringIO()
+        ListDependencies._showAsDOT( self.packages[ 'Core' ], True, output=output )
+        lines  = output.getvalue().splitlines()
+
+        # edges point from the depending package to its dependency
+        self.assertEqual( lines,
+                          [ 'digraph dependencies {',
+                            '    "sit://Libraries/Core/1.0" [shape=box];',
+                            '    "sit://Libraries/Bar/1.0" -> "sit://Libraries/Core/1.0";',
+                            '    "sit://Libraries/Baz/1.0" -> "sit://Libraries/Core/1.0";',
+                            '    "sit://Libraries/Foo/1.0" -> "sit://Libraries/Bar/1.0";',
+                            '    "sit://Libraries/Foo/1.0" -> "sit://Libraries/Baz/1.0";',
+                            '}' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+from ToolBOSCore.Packages.PackageDetector import PackageDetector
+from ToolBOSCore.Storage.BashSrc          import BashSrcWriter, FlatBashSrcWriter
+from ToolBOSCore.Util                     import FastScript
+
+
+pkgInfoTemplate = '''# -*- coding: utf-8 -*-
+
+name             = '%(package)s'
+package          = '%(package)s'
+category         = 'Libraries'
+version          = '1.0'
+patchlevel       = %(patchlevel)d
+depends          = %(depends)r
+buildDepends     = []
+envVars          = [ ( '%(package)s_ROOT', '${SIT}/Libraries/%(package)s/1.0' ) ]
+
+
+# EOF
+'''
+
+
+class TestBashSrcFlat( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.oldEnv = dict( os.environ )
+        self.sitDir = os.path.join( self.tmpDir.name, 'SIT' )
+
+        os.environ[ 'SIT' ] = self.sitDir
+
+        self.install( 'Core', 1, [] )
+        self.install( 'Bar',  1, [ 'sit://Libraries/Core/1.0' ] )
+        self.install( 'Foo',  1, [ 'sit://Libraries/Bar/1.0',
+                                   'sit://Libraries/Core/1.0' ] )
+
+        self.flatFile = os.path.join( self.sitDir, 'Libraries', 'Foo', '1.0',
+                                      'BashSrc.flat' )
+
+        FlatBashSrcWriter( self.getDetector( 'Foo' ), self.sitDir ).write( self.flatFile )
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def install( self, package, patchlevel, depends ):
+        """
+            Installs the package as patchlevel 1.0.<patchlevel> with
+            generated BashSrc, and points the 1.0 symlink to it.
+        """
+        packageDir  = os.path.join( self.sitDir, 'Libraries', package )
+        installRoot = os.path.join( packageDir, '1.0.%d' % patchlevel )
+        versionLink = os.path.join( packageDir, '1.0' )
+
+        FastScript.mkdir( installRoot )
+        FastScript.setFileContent( os.path.join( installRoot, 'pkgInfo.py' ),
+                                   pkgInfoTemplate % { 'package'   : package,
+                                                       'patchlevel': patchlevel,
+                                                       'depends'   : depends } )
+
+        if os.path.islink( versionLink ):
+            os.remove( versionLink )
+
+        os.symlink( '1.0.%d' % patchlevel, versionLink )
+
+        BashSrcWriter( self.getDetector( package ) ).write( os.path.join( installRoot,
+                                                                          'BashSrc' ) )
+
+        return installRoot
+
+
+    def getDetector( self, package ):
+        details = PackageDetector( os.path.join( self.sitDir, 'Libraries', package, '1.0' ) )
+        details.retrieveMakefileInfo()
+
+        return details
+
+
+    def source( self, sourced='' ):
+        """
+            Sources the BashSrc of Foo, returns a tuple ( flat, sourced )
+            whether the flat file was used and the resulting value of
+            $TOOLBOSCORE_SOURCED.
+        """
+        env = dict( os.environ )
+        env[ 'VERBOSE' ]             = '1'
+        env[ 'TOOLBOSCORE_SOURCED' ] = sourced
+
+        script = 'source "${SIT}/Libraries/Foo/1.0/BashSrc" && echo "${TOOLBOSCORE_SOURCED}"'
+        output = subprocess.check_output( [ 'bash', '-c', script ], env=env,
+                                          universal_newlines=True ).splitlines()
+
+        return not any( 'Sourcing' in line for line in output ), output[-1].split()
+
+
+    def test_referenceData( self ):
+        content  = FastScript.getFileContent( self.flatFile )
+        expected = FastScript.getFileContent( 'Foo-BashSrc.flat' )
+
+        self.assertEqual( content.replace( os.path.realpath( self.sitDir ), '@SIT@' ),
+                          expected )
+
+
+    def test_fresh( self ):
+        self.assertEqual( self.source(),
+                          ( True, [ 'Libraries/Core/1.0', 'Libraries/Bar/1.0',
+                                    'Libraries/Foo/1.0' ] ) )
+
+
+    def test_reinstalledPatchlevel( self ):
+        installRoot = self.install( 'Core', 2, [] )
+
+        # installed files keep their original (older) mtime
+        bashSrc = os.path.join( installRoot, 'BashSrc' )
+        os.utime( bashSrc, ( 0, 0 ) )
+
+        flat, sourced = self.source()
+
+        self.assertFalse( flat )
+        self.assertEqual( sorted( sourced ), [ 'Libraries/Bar/1.0', 'Libraries/Core/1.0',
+                                               'Libraries/Foo/1.0' ] )
+
+
+    def test_exactMatch( self ):
+        # a package whose path merely contains "Libraries/Core/1.0"
+        flat, sourced = self.source( 'Libraries/Core/1.01' )
+
+        self.assertTrue( flat )
+        self.assertIn( 'Libraries/Core/1.0', sourced )
+
+        # already sourced package is skipped
+        flat, sourced = self.source( 'Libraries/Core/1.0' )
+
+        self.assertTrue( flat )
+        self.assertEqual( sourced.count( 'Libraries/Core/1.0' ), 1 )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from ToolBOSCore.Packages.PackageDetector import PackageDetector
+from ToolBOSCore.Platforms                import Platforms
+from ToolBOSCore.Util                     import FastScript
+
+
+pkgInfoContent = '''# -*- coding: utf-8 -*-
+
+depends = [ 'sit://Libraries/Bar/1.0' ]
+
+
+# EOF
+'''
+
+cmakeListsContent = '''cmake_minimum_required( VERSION 3.16 )
+
+set( BST_INSTALL_CATEGORY %s)
+
+bst_find_package( Libraries/Bar/1.0 )
+'''
+
+
+class TestPackageDetector( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.oldEnv = dict( os.environ )
+        self.sitDir = os.path.join( self.tmpDir.name, 'SIT' )
+
+        os.environ[ 'SIT' ] = self.sitDir
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def createPackage( self, topLevelDir, category=None ):
+        FastScript.setFileContent( os.path.join( topLevelDir, 'pkgInfo.py' ),
+                                   pkgInfoContent )
+
+        if category is not None:
+            FastScript.setFileContent( os.path.join( topLevelDir, 'CMakeLists.txt' ),
+                                       cmakeListsContent % category )
+
+        return topLevelDir
+
+
+    def test_lazyAttributes( self ):
+        topLevelDir = self.createPackage( os.path.join( self.sitDir, 'Libraries', 'Foo', '1.0' ),
+                                          'Libraries' )
+
+        with unittest.mock.patch.object( Platforms, 'getHostPlatform',
+                                         return_value='focal64' ) as getHostPlatform, \
+             unittest.mock.patch.object( FastScript, 'getCurrentUserFullName',
+                                         return_value='Foo Bar' ) as getFullName, \
+             unittest.mock.patch.object( FastScript, 'getFileContent',
+                                         wraps=FastScript.getFileContent ) as getFileContent:
+
+            detector = PackageDetector( topLevelDir )
+
+            # nothing looked up upfront
+            getHostPlatform.assert_not_called()
+            getFullName.assert_not_called()
+            getFileContent.assert_not_called()
+
+            self.assertEqual( detector.srcDir, os.path.join( topLevelDir, 'src' ) )
+            getHostPlatform.assert_not_called()
+
+            # computed once upon first access
+            for i in range( 2 ):
+                self.assertEqual( detector.libDirArch,
+                                  os.path.join( topLevelDir, 'lib', 'focal64' ) )
+                self.assertEqual( detector.binDirArch,
+                                  os.path.join( topLevelDir, 'bin', 'focal64' ) )
+                self.assertEqual( detector.userName, 'Foo Bar' )
+                self.assertEqual( detector.canonicalPath, 'Libraries/Foo/1.0' )
+
+            self.assertEqual( getHostPlatform.call_count, 1 )
+            self.assertEqual( getFullName.call_count, 1 )
+            self.assertEqual( getFileContent.call_count, 1 )
+
+        # can be overridden, e.g. by pkgInfo.py
+        detector.packageCategory = 'Applications'
+        detector.hostPlatform    = 'jammy64'
+
+        self.assertEqual( detector.detectCategory(), 'Applications' )
+        self.assertEqual( detector.canonicalPath, 'Libraries/Foo/1.0' )
+        self.assertEqual( detector.testDirArch, os.path.join( topLevelDir, 'test', 'jammy64' ) )
+
+
+    def test_lightweight( self ):
+        topLevelDir = self.createPackage( os.path.join( self.sitDir, 'Libraries', 'Foo', '1.0' ),
+                                          'Libraries' )
+
+        with unittest.mock.patch.object( FastScript, 'getCurrentUserFullName' ) as getFullName, \
+             unittest.mock.patch.object( FastScript, 'getFileContent' ) as getFileContent:
+
+            detector = PackageDetector( topLevelDir, lightweight=True )
+            detector.retrieveMakefileInfo()
+            detector.retrieveVCSInfo()
+
+            self.assertEqual( detector.canonicalPath, 'Libraries/Foo/1.0' )
+            self.assertEqual( detector.dependencies, [ 'sit://Libraries/Bar/1.0' ] )
+            self.assertEqual( detector.userName, detector.userAccount )
+            self.assertIsNone( detector.cmakelistsContent )
+            self.assertIsNone( detector.gitFound )
+            self.assertIsNone( detector.vcsURL )
+            self.assertTrue( detector.hasCMakeLists )
+
+            getFullName.assert_not_called()
+            getFileContent.assert_not_called()
+
+
+    def test_detectCategory( self ):
+        # package installed in SIT, category from CMakeLists.txt resp. path
+        for category in ( 'Libraries', 'Libraries/Spam' ):
+            topLevelDir = self.createPackage( os.path.join( self.sitDir, category, 'Foo', '1.0' ),
+                                              category )
+
+            for lightweight in ( False, True ):
+                detector = PackageDetector( topLevelDir, lightweight=lightweight )
+                self.assertEqual( detector.detectCategory(), category )
+
+            detector = PackageDetector( topLevelDir )
+            detector.retrieveMakefileInfo()
+            self.assertEqual( detector.canonicalPath,
+                              os.path.join( category, 'Foo', '1.0' ) )
+
+        # source tree: from CMakeLists.txt, None if not set there
+        topLevelDir = os.path.join( self.tmpDir.name, 'src', 'Foo', '1.0' )
+
+        self.createPackage( topLevelDir, 'Applications' )
+        self.assertEqual( PackageDetector( topLevelDir ).detectCategory(), 'Applications' )
+
+        FastScript.setFileContent( os.path.join( topLevelDir, 'CMakeLists.txt' ), 'project( Foo )\n' )
+        self.assertIsNone( PackageDetector( topLevelDir ).detectCategory() )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from ToolBOSCore.Packages.BSTPackage    import BSTInstalledPackage
+from ToolBOSCore.Packages.MetaInfoCache import MetaInfoCache
+from ToolBOSCore.Packages.PackageRecord import PackageRecord
+from ToolBOSCore.Util                   import FastScript
+
+
+pkgInfoContent = '''# -*- coding: utf-8 -*-
+
+depends = [ 'sit://Libraries/Bar/1.0' ]
+
+
+# EOF
+'''
+
+
+class TestPackageRecord( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir       = tempfile.TemporaryDirectory()
+        self.oldEnv       = dict( os.environ )
+        self.oldCache     = BSTInstalledPackage._metaInfoCache
+        self.sitDir       = os.path.join( self.tmpDir.name, 'SIT' )
+
+        os.environ[ 'SIT' ] = self.sitDir
+
+        for package in ( 'Foo', 'Bar' ):
+            FastScript.setFileContent( os.path.join( self.sitDir, 'Libraries', package,
+                                                     '1.0', 'pkgInfo.py' ),
+                                       pkgInfoContent if package == 'Foo' else '' )
+
+
+    def tearDown( self ):
+        BSTInstalledPackage._metaInfoCache = self.oldCache
+
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def createRecord( self ):
+        return PackageRecord( 'Libraries/Foo/1.0',
+                              os.path.join( self.sitDir, 'Libraries/Foo/1.0' ),
+                              ( '1', '0' ),
+                              [ 'sit://Libraries/Bar/1.0' ],
+                              { 'focal64': [ 'deb://libfoo' ], 'jammy64': [ 'deb://libbar' ] },
+                              [ 'sit://DevelopmentTools/ToolBOSPluginWindows/8.4' ],
+                              {},
+                              [ 'sit://Libraries/Baz/1.0' ] )
+
+
+    def createCache( self ):
+        cache = MetaInfoCache()
+        cache.setCache( { 'sit://Libraries/Foo/1.0': self.createRecord() } )
+
+        return cache
+
+
+    def test_readOnly( self ):
+        record = self.createRecord()
+
+        with self.assertRaises( AttributeError ):
+            record.canonicalPath = 'Libraries/Bar/1.0'
+
+        with self.assertRaises( AttributeError ):
+            del record.dependencies
+
+        with self.assertRaises( AttributeError ):
+            record.detector = None
+
+        # lists are stored as tuples, hence can't be modified in-place
+        self.assertEqual( record.dependencies, ( 'sit://Libraries/Bar/1.0', ) )
+        self.assertEqual( record.dependsArch, ( ( 'focal64', ( 'deb://libfoo', ) ),
+                                                ( 'jammy64', ( 'deb://libbar', ) ) ) )
+        self.assertEqual( record.getDependencies( 'jammy64' ),
+                          ( 'sit://Libraries/Bar/1.0', 'deb://libbar' ) )
+        self.assertEqual( record.getDependencies(), ( 'sit://Libraries/Bar/1.0', ) )
+        self.assertEqual( record.getBuildDependencies( 'focal64' ),
+                          ( 'sit://DevelopmentTools/ToolBOSPluginWindows/8.4', ) )
+
+        # value semantics, dependency URLs are stored only once
+        other = self.createRecord()
+
+        self.assertEqual( record, other )
+        self.assertEqual( hash( record ), hash( other ) )
+        self.assertIs( record.dependencies[0], other.dependencies[0] )
+
+
+    def test_pickle( self ):
+        record = self.createRecord()
+
+        for protocol in range( pickle.HIGHEST_PROTOCOL + 1 ):
+            restored = pickle.loads( pickle.dumps( record, protocol ) )
+
+            self.assertEqual( restored, record )
+            self.assertEqual( restored.getDependencies( 'focal64' ),
+                              record.getDependencies( 'focal64' ) )
+            self.assertRaises( AttributeError, setattr, restored, 'canonicalPath', None )
+
+
+    def test_fromDetector( self ):
+        record   = self.createCache().getRecord( 'sit://Libraries/Foo/1.0' )
+        detector = record.getDetector()
+
+        self.assertEqual( detector.canonicalPath, 'Libraries/Foo/1.0' )
+        self.assertEqual( PackageRecord.fromDetector( detector ).dependencies,
+                          record.dependencies )
+
+
+    def test_getDetector( self ):
+        cache    = self.createCache()
+        detector = cache.getDetector( 'sit://Libraries/Foo/1.0' )
+
+        self.assertEqual( detector.dependencies, [ 'sit://Libraries/Bar/1.0' ] )
+        self.assertIs( cache.getDetector( 'sit://Libraries/Foo/1.0' ), detector )
+
+        # shared among installed packages using the records of the cache
+        BSTInstalledPackage._metaInfoCache = cache
+
+        packages = []
+
+        for i in range( 2 ):
+            package        = BSTInstalledPackage( 'sit://Libraries/Foo/1.0' )
+            package.record = cache.getRecord( 'sit://Libraries/Foo/1.0' )
+            packages.append( package )
+
+        self.assertIs( packages[0].detector, detector )
+        self.assertIs( packages[1].detector, detector )
+
+        # ...but not for other records
+        package        = BSTInstalledPackage( 'sit://Libraries/Foo/1.0' )
+        package.record = self.createRecord()
+
+        self.assertIsNot( package.detector, detector )
+
+        # new cache content
+        cache.setCache( { 'sit://Libraries/Foo/1.0': self.createRecord() } )
+
+        self.assertIsNot( cache.getDetector( 'sit://Libraries/Foo/1.0' ), detector )
+        self.assertRaises( KeyError, cache.getDetector, 'sit://Libraries/Bar/1.0' )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
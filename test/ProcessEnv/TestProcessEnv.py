@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Settings import ProcessEnv
+from ToolBOSCore.Util     import FastScript
+
+
+# { package: ( depends, envVars ) }
+packages = { 'Libraries/Foo/1.0': ( [ 'sit://Libraries/Bar/1.0', 'sit://Libraries/Baz/1.0',
+                                      'deb://foo' ],
+                                    [ ( 'FOO_ROOT', '${INSTALL_ROOT}' ),
+                                      ( 'FOO_PATH', '${FOO_ROOT}/bin:$SPAM' ) ] ),
+             'Libraries/Bar/1.0': ( [ 'sit://Libraries/Qux/1.0' ],
+                                    [ ( 'BAR_ROOT', '${INSTALL_ROOT}' ) ] ),
+             'Libraries/Baz/1.0': ( [ 'sit://Libraries/Qux/1.0', 'sit://Libraries/Bar/1.0' ],
+                                    [ ( 'BAZ_ROOT', '${INSTALL_ROOT}' ) ] ),
+             'Libraries/Qux/1.0': ( [],
+                                    [ ( 'QUX_ROOT', '${INSTALL_ROOT}' ) ] ) }
+
+
+class TestProcessEnv( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir   = tempfile.TemporaryDirectory()
+        self.oldEnv   = dict( os.environ )
+        self.sitDir   = os.path.join( self.tmpDir.name, 'SIT' )
+        self.cacheDir = os.path.join( self.tmpDir.name, 'home', '.HRI', 'ToolBOS', 'EnvCache' )
+
+        os.environ[ 'HOME' ] = os.path.join( self.tmpDir.name, 'home' )
+        os.environ[ 'SIT' ]  = self.sitDir
+
+        for package, ( depends, envVars ) in packages.items():
+            self.writePkgInfo( package, depends, envVars )
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def writePkgInfo( self, package, depends, envVars ):
+        content = 'depends = %r\n' % depends + \
+                  'envVars = %r\n' % envVars
+
+        FastScript.setFileContent( os.path.join( self.sitDir, package, 'pkgInfo.py' ),
+                                   content )
+
+
+    def installRoot( self, package ):
+        return os.path.join( self.sitDir, package )
+
+
+    def getCacheFiles( self ):
+        return sorted( os.listdir( self.cacheDir ) )
+
+
+    def test_getEnvClosure( self ):
+        closure = ProcessEnv.getEnvClosure( 'Libraries/Foo/1.0' )
+
+        # the package first, then its dependencies depth-first, each once
+        self.assertEqual( [ package for package, envVars in closure ],
+                          [ 'Libraries/Foo/1.0', 'Libraries/Bar/1.0',
+                            'Libraries/Qux/1.0', 'Libraries/Baz/1.0' ] )
+
+        self.assertEqual( closure[0][1],
+                          [ ( 'FOO_ROOT', self.installRoot( 'Libraries/Foo/1.0' ) ),
+                            ( 'FOO_PATH', '${FOO_ROOT}/bin:$SPAM' ) ] )
+
+        # cached
+        FastScript.resetCounters()
+
+        self.assertEqual( ProcessEnv.getEnvClosure( 'Libraries/Foo/1.0' ), closure )
+        self.assertNotIn( 'filesExecuted', FastScript.getCounters() )
+        self.assertEqual( len( self.getCacheFiles() ), 1 )
+
+        # modified pkgInfo.py of a dependency
+        self.writePkgInfo( 'Libraries/Qux/1.0', [], [ ( 'QUX', 'modified' ) ] )
+
+        closure = ProcessEnv.getEnvClosure( 'Libraries/Foo/1.0' )
+        self.assertEqual( closure[2], ( 'Libraries/Qux/1.0', [ ( 'QUX', 'modified' ) ] ) )
+        self.assertEqual( FastScript.getCounters()[ 'filesExecuted' ], 4 )
+
+
+    def test_evictEnvCache( self ):
+        for package in sorted( packages ):
+            ProcessEnv.getEnvClosure( package )
+
+        cacheFiles = self.getCacheFiles()
+        self.assertEqual( len( cacheFiles ), len( packages ) )
+
+        for cacheFile in cacheFiles:
+            os.utime( os.path.join( self.cacheDir, cacheFile ), ( 1000, 1000 ) )
+
+        # a cache hit counts as recent use
+        ProcessEnv.getEnvClosure( 'Libraries/Bar/1.0' )
+
+        usedFile = ProcessEnv._getEnvCacheFile( 'Libraries/Bar/1.0', self.sitDir )
+        removed  = ProcessEnv.evictEnvCache( self.cacheDir, 1 )
+
+        self.assertEqual( sorted( removed ),
+                          sorted( os.path.join( self.cacheDir, cacheFile )
+                                  for cacheFile in cacheFiles
+                                  if cacheFile != os.path.basename( usedFile ) ) )
+        self.assertEqual( self.getCacheFiles(), [ os.path.basename( usedFile ) ] )
+
+        # least-recently used first, incl. temp. files of aborted processes
+        FastScript.setFileContent( usedFile + '.1234', '' )
+        os.utime( usedFile + '.1234', ( 1000, 1000 ) )
+
+        self.assertEqual( ProcessEnv.evictEnvCache( self.cacheDir, 1 ),
+                          [ usedFile + '.1234' ] )
+        self.assertEqual( ProcessEnv.evictEnvCache( self.cacheDir, 0 ), [ usedFile ] )
+
+
+    def test_expandVars( self ):
+        env = { 'FOO': 'foo', 'FOO_BAR': 'foobar' }
+
+        self.assertEqual( ProcessEnv._expandVars( '$FOO:${FOO}/bin', env ), 'foo:foo/bin' )
+        self.assertEqual( ProcessEnv._expandVars( '$FOO_BAR', env ), 'foobar' )
+        self.assertEqual( ProcessEnv._expandVars( '${FOO}_BAR', env ), 'foo_BAR' )
+        self.assertEqual( ProcessEnv._expandVars( '$UNKNOWN:${UNKNOWN}', env ),
+                          '$UNKNOWN:${UNKNOWN}' )
+
+
+    def test_source( self ):
+        # packages with a name containing the canonical path of another one
+        # must not be mistaken as already sourced
+        os.environ[ 'TOOLBOSCORE_SOURCED' ] = 'Libraries/Foo/1.0.1 Libraries/Bar/1.0 ' \
+                                              'Libraries/Qux/1.0-beta'
+        os.environ[ 'SPAM' ]                = 'spam'
+
+        for name in ( 'FOO_ROOT', 'FOO_PATH', 'BAR_ROOT', 'BAZ_ROOT', 'QUX_ROOT' ):
+            os.environ.pop( name, None )
+
+        self.assertTrue( ProcessEnv.source( 'Libraries/Foo/1.0' ) )
+
+        fooRoot = self.installRoot( 'Libraries/Foo/1.0' )
+
+        self.assertEqual( os.environ[ 'FOO_ROOT' ], fooRoot )
+        self.assertEqual( os.environ[ 'FOO_PATH' ], fooRoot + '/bin:spam' )
+        self.assertEqual( os.environ[ 'QUX_ROOT' ], self.installRoot( 'Libraries/Qux/1.0' ) )
+        self.assertEqual( os.environ[ 'BAZ_ROOT' ], self.installRoot( 'Libraries/Baz/1.0' ) )
+        self.assertNotIn( 'BAR_ROOT', os.environ )
+
+        self.assertEqual( os.environ[ 'TOOLBOSCORE_SOURCED' ].split(),
+                          [ 'Libraries/Baz/1.0', 'Libraries/Qux/1.0', 'Libraries/Foo/1.0',
+                            'Libraries/Foo/1.0.1', 'Libraries/Bar/1.0',
+                            'Libraries/Qux/1.0-beta' ] )
+
+        # exactly this package already sourced
+        os.environ[ 'FOO_ROOT' ] = 'unchanged'
+
+        self.assertTrue( ProcessEnv.source( 'Libraries/Foo/1.0' ) )
+        self.assertEqual( os.environ[ 'FOO_ROOT' ], 'unchanged' )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+from ToolBOSCore.Storage import ProxyDir, SIT, SITJournal
+from ToolBOSCore.Util    import FastScript
+
+
+class TestProxyDir( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir   = tempfile.TemporaryDirectory()
+        self.oldEnv   = dict( os.environ )
+        self.sitRoot  = os.path.join( self.tmpDir.name, 'SIT' )
+        self.sitProxy = os.path.join( self.tmpDir.name, 'proxy' )
+
+        FastScript.mkdir( self.sitRoot )
+        FastScript.mkdir( self.sitProxy )
+        os.symlink( self.sitRoot, os.path.join( self.sitProxy, SIT.parentLink ) )
+
+        os.environ[ 'HOME' ] = os.path.join( self.tmpDir.name, 'home' )
+        os.environ[ 'SIT' ]  = self.sitProxy
+
+
+    def tearDown( self ):
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def install( self, package, version ):
+        installRoot = os.path.join( self.sitRoot, 'Libraries', package, version )
+        FastScript.mkdir( installRoot )
+
+        return installRoot
+
+
+    def link( self, linkPath, target ):
+        linkPath = os.path.join( self.sitProxy, linkPath )
+        FastScript.mkdir( os.path.dirname( linkPath ) )
+        os.symlink( target, linkPath )
+
+        return linkPath
+
+
+    def installGlobally( self, package, version, journal=True ):
+        canonicalPath = 'Libraries/%s/%s' % ( package, version )
+
+        if journal:
+            SITJournal.beginChange( self.sitRoot, canonicalPath )
+
+        installRoot = self.install( package, version + '.1' )
+        os.symlink( version + '.1', os.path.join( os.path.dirname( installRoot ), version ) )
+        FastScript.setFileContent( os.path.join( installRoot, 'pkgInfo.py' ), '' )
+
+        if journal:
+            SITJournal.addEntry( self.sitRoot, 'install', canonicalPath )
+
+
+    def isLinked( self, package, version ):
+        return os.path.islink( os.path.join( self.sitProxy, 'Libraries', package, version ) )
+
+
+    def unlink( self, package, version ):
+        os.remove( os.path.join( self.sitProxy, 'Libraries', package, version ) )
+
+
+    def createProxy( self ):
+        # a proxy initially links all globally installed packages
+        self.installGlobally( 'Spam', '1.0', journal=False )
+        self.link( 'Libraries/Spam/1.0', os.path.join( self.sitRoot, 'Libraries/Spam/1.0' ) )
+
+
+    def updateProxyDir( self ):
+        ProxyDir.updateProxyDir( cleanHomeDirectory=False )
+
+
+    def brokenLinks( self ):
+        return [ link.path for link in ProxyDir.findBrokenLinks( self.sitProxy ) ]
+
+
+    def test_findBrokenLinks( self ):
+        expected = []
+
+        # absolute target, with and without trailing slash
+        fooRoot = self.install( 'Foo', '1.0.1' )
+        self.link( 'Libraries/Foo/1.0.1', fooRoot )
+        self.link( 'Libraries/Foo/1.0',   fooRoot + '/' )
+
+        # relative targets
+        self.install( 'Bar', '2.0.1' )
+        self.link( 'Libraries/Bar/2.0.1', '../../../SIT/Libraries/Bar/2.0.1' )
+        self.link( 'Libraries/Bar/2.0',   './2.0.1/' )
+        expected.append( self.link( 'Libraries/Bar/2.1',
+                                    '../../../SIT/Libraries/Bar/2.1.1' ) )
+
+        # chained symlinks: proxy --> version link in root SIT --> install root
+        self.install( 'Baz', '3.0.1' )
+        os.symlink( '3.0.1', os.path.join( self.sitRoot, 'Libraries', 'Baz', '3.0' ) )
+        os.symlink( '3.0.9', os.path.join( self.sitRoot, 'Libraries', 'Baz', '3.1' ) )
+        self.link( 'Libraries/Baz/3.0', os.path.join( self.sitRoot, 'Libraries/Baz/3.0/' ) )
+        expected.append( self.link( 'Libraries/Baz/3.1',
+                                    os.path.join( self.sitRoot, 'Libraries/Baz/3.1' ) ) )
+
+        # missing targets, also within non-existing directory
+        expected.append( self.link( 'Libraries/Foo/1.1',
+                                    os.path.join( self.sitRoot, 'Libraries/Foo/1.1.1/' ) ) )
+        expected.append( self.link( 'Libraries/Gone/1.0',
+                                    os.path.join( self.sitRoot, 'Libraries/Gone/1.0.1' ) ) )
+
+        # non-version link below a category
+        expected.append( self.link( 'Libraries/Foo/README', 'README.txt' ) )
+
+        # proxy installation: only its top-level entries are checked
+        expected.append( self.link( 'Libraries/Qux/1.0/pkgInfo.py', 'missing.py' ) )
+        self.link( 'Libraries/Qux/1.0/lib/focal64/libQux.so', 'missing.so' )
+
+        self.assertEqual( self.brokenLinks(), sorted( expected ) )
+
+        for link in ProxyDir.findBrokenLinks( self.sitProxy ):
+            isVersion = not link.path.endswith( ( 'README', '.py' ) )
+
+            self.assertEqual( link.isVersion, isVersion )
+            self.assertEqual( link.package,
+                              os.path.relpath( link.path, self.sitProxy ) if isVersion else None )
+
+
+    def test_findBrokenLinks_restricted( self ):
+        # execute-only package directory of a restricted package: it can't
+        # be listed (unless being root), but its content is accessible
+        restrictedDir = os.path.dirname( self.install( 'Secret', '1.0.1' ) )
+        os.symlink( '1.0.1', os.path.join( restrictedDir, '1.0' ) )
+
+        self.link( 'Libraries/Secret/1.0', os.path.join( restrictedDir, '1.0' ) )
+        brokenLink = self.link( 'Libraries/Secret/1.1', os.path.join( restrictedDir, '1.1' ) )
+
+        scandir = os.scandir
+
+        def restrictedScandir( path ):
+            if path == restrictedDir:
+                raise PermissionError( 13, 'Permission denied', path )
+
+            return scandir( path )
+
+        with unittest.mock.patch( 'os.scandir', restrictedScandir ):
+            self.assertEqual( self.brokenLinks(), [ brokenLink ] )
+
+
+    def test_updateProxyDir_journal( self ):
+        self.createProxy()
+        self.installGlobally( 'Foo', '1.0' )
+
+        # initial full resync
+        self.updateProxyDir()
+        self.assertTrue( self.isLinked( 'Foo', '1.0' ) )
+        self.assertTrue( SITJournal.isJournalTrusted( self.sitRoot, self.sitProxy ) )
+
+        # only journal entries get applied, hence a link removed by the
+        # user is not restored
+        self.unlink( 'Foo', '1.0' )
+        self.installGlobally( 'Bar', '2.0' )
+
+        self.updateProxyDir()
+        self.assertTrue( self.isLinked( 'Bar', '2.0' ) )
+        self.assertFalse( self.isLinked( 'Foo', '1.0' ) )
+
+        # uninstallation
+        FastScript.remove( os.path.join( self.sitRoot, 'Libraries', 'Bar' ) )
+        SITJournal.addEntry( self.sitRoot, 'uninstall', 'Libraries/Bar/2.0' )
+
+        self.updateProxyDir()
+        self.assertFalse( os.path.exists( os.path.join( self.sitProxy, 'Libraries', 'Bar' ) ) )
+
+
+    def test_updateProxyDir_fallback( self ):
+        self.createProxy()
+        self.installGlobally( 'Foo', '1.0' )
+        self.updateProxyDir()
+        self.unlink( 'Foo', '1.0' )
+
+        # installation bypassing the journal (rsync, older ToolBOSCore,...)
+        time.sleep( 0.1 )
+        self.installGlobally( 'Bar', '2.0', journal=False )
+        self.assertFalse( SITJournal.isJournalTrusted( self.sitRoot, self.sitProxy ) )
+
+        self.updateProxyDir()
+        self.assertTrue( self.isLinked( 'Foo', '1.0' ) )
+        self.assertTrue( self.isLinked( 'Bar', '2.0' ) )
+        self.assertTrue( SITJournal.isJournalTrusted( self.sitRoot, self.sitProxy ) )
+
+        # manual removal
+        time.sleep( 0.1 )
+        FastScript.remove( os.path.join( self.sitRoot, 'Libraries', 'Bar' ) )
+        self.assertFalse( SITJournal.isJournalTrusted( self.sitRoot, self.sitProxy ) )
+
+        self.updateProxyDir()
+        self.assertFalse( os.path.exists( os.path.join( self.sitProxy, 'Libraries', 'Bar' ) ) )
+
+        # installation bypassing the journal, followed by a journaled one
+        time.sleep( 0.1 )
+        self.installGlobally( 'Bar', '2.0', journal=False )
+        time.sleep( 0.1 )
+        self.installGlobally( 'Baz', '3.0' )
+        self.assertTrue( SITJournal.isJournalTrusted( self.sitRoot, self.sitProxy ) )
+
+        self.updateProxyDir()
+        self.assertTrue( self.isLinked( 'Bar', '2.0' ) )
+        self.assertTrue( self.isLinked( 'Baz', '3.0' ) )
+
+        # periodic full resync
+        self.unlink( 'Foo', '1.0' )
+        fullSyncFile = os.path.join( self.sitProxy, SITJournal.fullSyncFile )
+        syncTime     = time.time() - SITJournal.maxSyncAge - 60
+        os.utime( fullSyncFile, ( syncTime, syncTime ) )
+
+        self.updateProxyDir()
+        self.assertTrue( self.isLinked( 'Foo', '1.0' ) )
+
+
+    def test_treeStamp( self ):
+        for i in range( 10 ):
+            self.installGlobally( 'Foo%d' % i, '1.0' )
+
+        scandir = os.scandir
+        paths   = []
+
+        def countingScandir( path ):
+            paths.append( path )
+            return scandir( path )
+
+        # independent of the number of packages
+        with unittest.mock.patch( 'os.scandir', countingScandir ):
+            SITJournal.getTreeStamp( self.sitRoot )
+
+        self.assertEqual( paths, [ self.sitRoot ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+from ToolBOSCore.Util import FastScript
+
+
+# max. time (in milliseconds) spent on imports when showing the help of
+# a CLI tool, can be scaled on slow machines via STARTUP_BUDGET_FACTOR
+budgets = { 'BST.py':                    150,
+            'BST-Daemon.py':             150,
+            'FindProxyInstallations.py': 150,
+            'ListDependencies.py':       150,
+            'MSVC-Setup.py':             150,
+            'ToolBOS-Config.py':         150,
+            'UpdateProxyDir.py':         150,
+            'Wine-Setup.py':             150 }
+
+# heavy modules only needed for particular tasks, not at startup
+deferredModules = ( 'mako', 'hashlib' )
+
+
+def getImportTimes( program ):
+    """
+        Runs 'program --help' with "-X importtime" and returns a tuple of
+        the total import time (in milliseconds) and the set of all modules
+        imported.
+
+        Raises a subprocess.CalledProcessError if the program failed.
+    """
+    cmd     = [ sys.executable, '-X', 'importtime', program, '--help' ]
+    proc    = subprocess.run( cmd, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE, universal_newlines=True,
+                              check=True )
+    total   = 0
+    modules = set()
+
+    for line in proc.stderr.splitlines():
+        if not line.startswith( 'import time:' ):
+            continue
+
+        try:
+            _, cumulative, name = line[ len( 'import time:' ): ].split( '|' )
+            cumulative = int( cumulative )
+        except ValueError:
+            continue                               # header line
+
+        name = name.rstrip()[ 1: ]
+
+        # nested imports are already part of the top-level import's time
+        if not name.startswith( ' ' ):
+            total += cumulative
+
+        modules.add( name.strip() )
+
+    return total / 1000.0, modules
+
+
+class TestStartupTime( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+
+    def test_startupBudget( self ):
+        binDir = os.path.join( FastScript.getEnv( 'TOOLBOSCORE_ROOT' ), 'bin' )
+        factor = float( FastScript.getEnv( 'STARTUP_BUDGET_FACTOR' ) or 1.0 )
+
+        for program, budget in sorted( budgets.items() ):
+            fullPath = os.path.join( binDir, program )
+
+            # best of three runs to reduce noise from disk caches etc.
+            results  = [ getImportTimes( fullPath ) for _ in range( 3 ) ]
+            total    = min( result[0] for result in results )
+            modules  = results[0][1]
+
+            logging.info( '%s: %.1f ms (budget: %d ms)', program, total, budget )
+
+            self.assertLessEqual( total, budget * factor, program )
+
+            for name in deferredModules:
+                self.assertNotIn( name, modules, '%s: imports %s' % ( program, name ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import time
+import unittest
+
+from ToolBOSCore.Util import FastScript
+from ToolBOSCore.Util import TemplateEngine
+
+
+class TestTemplateEngine( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir      = tempfile.TemporaryDirectory()
+        self.oldModDir   = TemplateEngine.moduleDir
+        self.oldLookups  = dict( TemplateEngine._lookups )
+        self.moduleDir   = os.path.join( self.tmpDir.name, 'MakoCache' )
+        self.templateDir = os.path.join( self.tmpDir.name, 'templates' )
+        self.template    = os.path.join( self.templateDir, 'Foo.mako' )
+        self.outputDir   = os.path.join( self.tmpDir.name, 'output' )
+
+        TemplateEngine.moduleDir = self.moduleDir
+        TemplateEngine._lookups.clear()
+
+        FastScript.setFileContent( os.path.join( self.templateDir, 'header.mako' ),
+                                   '# ${name}\n' )
+        FastScript.setFileContent( self.template,
+                                   '<%include file="header.mako"/>value = ${value}\n' )
+
+
+    def tearDown( self ):
+        TemplateEngine.moduleDir = self.oldModDir
+        TemplateEngine._lookups.clear()
+        TemplateEngine._lookups.update( self.oldLookups )
+
+        self.tmpDir.cleanup()
+
+
+    def modify( self, filePath, content, mtime ):
+        # Mako compares the template's modification time with the time of
+        # compilation (in seconds)
+        FastScript.setFileContent( filePath, content )
+        os.utime( filePath, ( mtime, mtime ) )
+
+
+    def render( self, values ):
+        dstFile = os.path.join( self.outputDir, 'Foo' )
+        TemplateEngine.run( self.template, dstFile, values )
+
+        return FastScript.getFileContent( dstFile )
+
+
+    def getModuleFile( self ):
+        return os.path.join( self.moduleDir, self.templateDir.lstrip( os.sep ),
+                             'Foo.mako.py' )
+
+
+    def test_lookupCache( self ):
+        values = { 'name': 'Foo', 'value': 42 }
+
+        self.assertEqual( self.render( values ), '# Foo\nvalue = 42\n' )
+        self.assertEqual( list( TemplateEngine._lookups ), [ self.templateDir ] )
+
+        lookup = TemplateEngine._lookups[ self.templateDir ]
+
+        self.assertEqual( self.render( values ), '# Foo\nvalue = 42\n' )
+        self.assertIs( TemplateEngine._lookups[ self.templateDir ], lookup )
+
+        # compiled templates are mirrored in the module directory
+        self.assertTrue( os.path.isfile( self.getModuleFile() ) )
+
+        # another template directory
+        otherTemplate = os.path.join( self.tmpDir.name, 'other', 'Foo.mako' )
+        FastScript.setFileContent( otherTemplate, 'other\n' )
+
+        TemplateEngine.run( otherTemplate, os.path.join( self.outputDir, 'Other' ), {} )
+
+        self.assertEqual( sorted( TemplateEngine._lookups ),
+                          sorted( [ self.templateDir, os.path.dirname( otherTemplate ) ] ) )
+
+
+    def test_recompile( self ):
+        values = { 'name': 'Foo', 'value': 42 }
+
+        self.assertEqual( self.render( values ), '# Foo\nvalue = 42\n' )
+
+        # within the same process
+        self.modify( self.template, 'modified = ${value}\n', time.time() + 10 )
+        self.assertEqual( self.render( values ), 'modified = 42\n' )
+
+        # subsequent process re-using the compiled module (created after
+        # the last modification of the template)
+        moduleTime = os.stat( self.template ).st_mtime + 10
+        os.utime( self.getModuleFile(), ( moduleTime, moduleTime ) )
+        TemplateEngine._lookups.clear()
+
+        self.assertEqual( self.render( values ), 'modified = 42\n' )
+        self.assertEqual( os.stat( self.getModuleFile() ).st_mtime, moduleTime )
+
+        # ...unless the template has changed meanwhile
+        self.modify( self.template, 'again = ${value}\n', moduleTime + 10 )
+        TemplateEngine._lookups.clear()
+
+        self.assertEqual( self.render( values ), 'again = 42\n' )
+        self.assertNotEqual( os.stat( self.getModuleFile() ).st_mtime, moduleTime )
+
+        # ...also within the same second as the compilation
+        moduleTime = int( os.stat( self.template ).st_mtime ) + 20
+        os.utime( self.getModuleFile(), ns=( moduleTime * 10**9, moduleTime * 10**9 ) )
+
+        self.modify( self.template, 'sameSecond = ${value}\n', moduleTime + 0.5 )
+        TemplateEngine._lookups.clear()
+
+        self.assertEqual( self.render( values ), 'sameSecond = 42\n' )
+
+
+    def test_runBatch( self ):
+        os.chmod( self.template, 0o755 )
+
+        jobs = [ ( os.path.join( self.outputDir, 'Foo%d' % i ), { 'name': 'Foo', 'value': i } )
+                 for i in range( 3 ) ]
+
+        TemplateEngine.runBatch( self.template, jobs )
+
+        for dstFile, values in jobs:
+            self.assertEqual( FastScript.getFileContent( dstFile ),
+                              '# Foo\nvalue = %d\n' % values[ 'value' ] )
+            self.assertTrue( os.access( dstFile, os.X_OK ) )
+
+        self.assertEqual( len( TemplateEngine._lookups ), 1 )
+
+
+    def test_noModuleDir( self ):
+        # not possible to create the module directory
+        FastScript.setFileContent( self.moduleDir, '' )
+
+        self.assertEqual( self.render( { 'name': 'Foo', 'value': 42 } ),
+                          '# Foo\nvalue = 42\n' )
+        self.assertTrue( os.path.isfile( self.moduleDir ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
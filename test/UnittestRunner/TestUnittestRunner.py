@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.BuildSystem import UnittestRunner
+from ToolBOSCore.Util        import FastScript
+
+
+passingTest = '''
+import os
+import unittest
+
+class TestPassing( unittest.TestCase ):
+
+    def test_passing( self ):
+        self.assertTrue( os.path.exists( __file__ ) )
+
+    @unittest.skip( 'not relevant' )
+    def test_skipped( self ):
+        pass
+'''
+
+failingTest = '''
+import unittest
+
+class TestFailing( unittest.TestCase ):
+
+    def test_failing( self ):
+        self.assertEqual( 1, 2 )
+'''
+
+coloredTest = '''
+import unittest
+
+class TestColored( unittest.TestCase ):
+
+    def test_colored( self ):
+        print( '\\x1b[31mcolored output\\x1b[0m \\x07' )
+        self.fail( '\\x1b[1mcolored message\\x1b[0m' )
+'''
+
+
+class TestUnittestRunner( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.topDir = self.tmpDir.name
+
+
+    def tearDown( self ):
+        self.tmpDir.cleanup()
+
+
+    def writeTest( self, relPath, content ):
+        filePath = os.path.join( self.topDir, relPath )
+
+        FastScript.mkdir( os.path.dirname( filePath ) )
+        FastScript.setFileContent( filePath, content )
+
+
+    def test_discoverAndShard( self ):
+        self.writeTest( 'test/A/TestA1.py', passingTest )
+        self.writeTest( 'test/A/TestA2.py', passingTest )
+        self.writeTest( 'test/B/TestB.py', passingTest )
+        self.writeTest( 'test/B/helper.py', '' )
+        self.writeTest( 'test/B/ReferenceData/TestIgnored.py', '' )
+
+        modules = UnittestRunner.discoverTests( self.topDir )
+
+        self.assertEqual( modules, [ 'test/A/TestA1.py', 'test/A/TestA2.py',
+                                     'test/B/TestB.py' ] )
+
+        # slowest first, unknown timings before known ones
+        timings = { 'test/A/TestA1.py': 1.0, 'test/A/TestA2.py': 1.0,
+                    'test/B/TestB.py': 5.0 }
+
+        self.assertEqual( UnittestRunner.getShards( modules, timings ),
+                          [ [ 'test/B/TestB.py' ],
+                            [ 'test/A/TestA1.py', 'test/A/TestA2.py' ] ] )
+
+        del timings[ 'test/A/TestA2.py' ]
+
+        self.assertEqual( UnittestRunner.getShards( modules, timings )[0],
+                          [ 'test/A/TestA1.py', 'test/A/TestA2.py' ] )
+
+
+    def test_runTests( self ):
+        resultDir = os.path.join( self.topDir, 'results' )
+
+        self.writeTest( 'test/A/TestPassing.py', passingTest )
+        self.assertTrue( UnittestRunner.runTests( self.topDir, resultDir, 2 ) )
+
+        self.writeTest( 'test/B/TestFailing.py', failingTest )
+        self.writeTest( 'test/C/TestBroken.py', 'import nonExistingModule\n' )
+        self.assertFalse( UnittestRunner.runTests( self.topDir, resultDir, 2 ) )
+
+        junit = FastScript.getFileContent( os.path.join( resultDir, 'junit.xml' ) )
+
+        self.assertIn( '<testsuites tests="4" failures="1" errors="1" skipped="1"', junit )
+
+        with open( os.path.join( resultDir, 'timings.json' ) ) as f:
+            timings = json.load( f )
+
+        self.assertEqual( sorted( timings[ 'modules' ] ),
+                          [ 'test/A/TestPassing.py', 'test/B/TestFailing.py',
+                            'test/C/TestBroken.py' ] )
+
+        self.assertIn( 'test/A/TestPassing.py::TestPassing.TestPassing.test_passing',
+                       timings[ 'tests' ] )
+
+
+    def test_junitControlCharacters( self ):
+        import xml.etree.ElementTree as ET
+
+        resultDir = os.path.join( self.topDir, 'results' )
+
+        self.writeTest( 'test/A/TestColored.py', coloredTest )
+        self.assertFalse( UnittestRunner.runTests( self.topDir, resultDir, 1 ) )
+
+        root    = ET.parse( os.path.join( resultDir, 'junit.xml' ) ).getroot()
+        failure = root.find( 'testsuite/testcase/failure' )
+        output  = root.find( 'testsuite/system-out' ).text
+
+        self.assertEqual( failure.get( 'message' ), 'colored message' )
+        self.assertIn( 'colored output', output )
+        self.assertNotIn( '\x1b', output + failure.text )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -36,6 +36,14 @@
 
 
 import collections.abc
+import io
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
 import unittest
 
 from ToolBOSCore.Util import FastScript
@@ -89,6 +97,181 @@ class TestArgManagerV2( unittest.TestCase ):
         self.assertIsInstance( resultIterator, collections.abc.Iterator )
 
 
+    def test_contractsDisabled( self ):
+        script = 'from ToolBOSCore.Util import FastScript\n' \
+                 'assert not FastScript.contractsEnabled\n' \
+                 'FastScript.requireIsList( 42 )\n'
+
+        env = dict( os.environ )
+        env[ 'TOOLBOSCORE_CONTRACTS' ] = 'FALSE'
+
+        subprocess.check_call( [ sys.executable, '-c', script ], env=env )
+
+        self.assertTrue( FastScript.contractsEnabled )
+        self.assertRaises( AssertionError, FastScript.requireIsList, 42 )
+
+
+    def test_counters( self ):
+        FastScript.resetCounters()
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            srcFile = os.path.join( tmpDir, 'src.txt' )
+            dstFile = os.path.join( tmpDir, 'dst.txt' )
+
+            dstDir  = os.path.join( tmpDir, 'dst' )
+
+            FastScript.setFileContent( srcFile, 'Hello, World!' )
+            FastScript.copy( srcFile, dstFile )
+            FastScript.execProgram( 'true' )
+
+            # copy into directory
+            FastScript.mkdir( dstDir )
+            FastScript.copy( srcFile, dstDir )
+
+            counters = FastScript.getCounters()
+
+            self.assertEqual( counters[ 'filesWritten' ], 1 )
+            self.assertEqual( counters[ 'filesCopied' ], 2 )
+            self.assertEqual( counters[ 'bytesCopied' ], 26 )
+            self.assertEqual( counters[ 'subprocesses' ], 1 )
+
+
+            # dump at exit if BST_METRICS is set, child processes write
+            # to a file of their own
+            metricsFile = os.path.join( tmpDir, 'metrics.json' )
+            scriptFile  = os.path.join( tmpDir, 'script.py' )
+            script      = 'import subprocess, sys\n' \
+                          'from ToolBOSCore.Util import FastScript\n' \
+                          'FastScript.countEvent( "foo", 42 )\n' \
+                          'if sys.argv[ 1: ] != [ "child" ]:\n' \
+                          '    subprocess.check_call( [ sys.executable, sys.argv[ 0 ], "child" ] )\n'
+
+            FastScript.setFileContent( scriptFile, script )
+
+            env = dict( os.environ )
+            env[ 'BST_METRICS' ] = metricsFile
+            env.pop( 'BST_METRICS_PID', None )
+
+            subprocess.check_call( [ sys.executable, scriptFile ], env=env )
+
+            with open( metricsFile ) as fd:
+                data = json.load( fd )
+
+            self.assertEqual( data[ 'argv' ], [ scriptFile ] )
+            self.assertEqual( data[ 'counters' ][ 'foo' ], 42 )
+
+            childFiles = [ name for name in os.listdir( tmpDir )
+                           if name.startswith( 'metrics.json.' ) ]
+
+            self.assertEqual( len( childFiles ), 1 )
+
+            with open( os.path.join( tmpDir, childFiles[ 0 ] ) ) as fd:
+                data = json.load( fd )
+
+            self.assertEqual( data[ 'argv' ], [ scriptFile, 'child' ] )
+            self.assertEqual( childFiles[ 0 ], 'metrics.json.%d' % data[ 'pid' ] )
+
+
+    def test_streamLogger( self ):
+        self.enableInfo()
+
+        stream  = io.StringIO()
+        handler = FastScript.addStreamLogger( stream, logging.INFO, preamble=False )
+
+        # more than one batch, all in order
+        for i in range( 3 * FastScript.logBatchSize ):
+            logging.info( 'message %d', i )
+
+        logging.debug( 'below the level of the stream logger' )
+
+        try:
+            raise ValueError( 'spam' )
+        except ValueError:
+            logging.exception( 'with traceback' )
+
+        FastScript.flushLogs()
+
+        lines = stream.getvalue().splitlines()
+        count = 3 * FastScript.logBatchSize
+
+        self.assertEqual( lines[ :count ], [ 'message %d' % i for i in range( count ) ] )
+        self.assertEqual( lines[ count ], 'with traceback' )
+        self.assertIn( 'Traceback', lines[ count + 1 ] )
+        self.assertEqual( lines[ -1 ], 'ValueError: spam' )
+
+        # pending messages are written before removing the logger
+        logging.info( 'last message' )
+        FastScript.removeStreamLogger( handler )
+        logging.info( 'not logged anymore' )
+        FastScript.flushLogs()
+
+        self.assertTrue( stream.getvalue().endswith( 'ValueError: spam\nlast message\n' ) )
+
+
+    def test_fileLogger( self ):
+        self.enableInfo()
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            logFile = os.path.join( tmpDir, 'output.log' )
+
+            FastScript.setOutputFile( logFile )
+
+            try:
+                logging.info( 'Hello, %s!', 'World' )
+                FastScript.logVerbatim( 3, '  verbatim  line' )
+                FastScript.flushLogs()
+            finally:
+                FastScript.setOutputFile( None )
+
+            lines = FastScript.getFileContent( logFile, splitLines=True )
+
+        self.assertEqual( len( lines ), 2 )
+        self.assertRegex( lines[0], r'^\[TestFastScript\.py:\d+ INFO\] Hello, World!\n$' )
+        self.assertEqual( lines[1], '  verbatim  line\n' )
+
+
+    def test_fileLoggerAtExit( self ):
+        # no flushLogs(), neither in the parent nor the forked child
+        script = 'import logging, os, sys\n' \
+                 'from ToolBOSCore.Util import FastScript\n' \
+                 'FastScript.setOutputFile( sys.argv[1] )\n' \
+                 'logging.warning( "started" )\n' \
+                 'pid = os.fork()\n' \
+                 'if pid:\n' \
+                 '    os.waitpid( pid, 0 )\n' \
+                 'for i in range( 1000 ):\n' \
+                 '    logging.warning( "%s %d", "parent" if pid else "child", i )\n'
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            logFile = os.path.join( tmpDir, 'output.log' )
+
+            subprocess.check_call( [ sys.executable, '-c', script, logFile ],
+                                   stderr=subprocess.DEVNULL )
+
+            messages = [ re.sub( r'^\[.*?\] ', '', line )
+                         for line in FastScript.getFileContent( logFile, splitLines=True ) ]
+
+        for name in ( 'child', 'parent' ):
+            self.assertEqual( [ line for line in messages if line.startswith( name ) ],
+                              [ '%s %d\n' % ( name, i ) for i in range( 1000 ) ] )
+
+        self.assertEqual( messages.count( 'started\n' ), 1 )
+        self.assertEqual( len( messages ), 2001 )
+
+
+    def enableInfo( self ):
+        # log INFO messages, but only into the loggers under test
+        rootLogger   = logging.getLogger()
+        rootLevel    = rootLogger.level
+        consoleLevel = FastScript.consoleHandler.level
+
+        rootLogger.setLevel( logging.INFO )
+        FastScript.consoleHandler.setLevel( logging.CRITICAL )
+
+        self.addCleanup( rootLogger.setLevel, rootLevel )
+        self.addCleanup( FastScript.consoleHandler.setLevel, consoleLevel )
+
+
 if __name__ == '__main__':
     unittest.main()
 
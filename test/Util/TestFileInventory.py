@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Util import FastScript
+from ToolBOSCore.Util import FileInventory
+
+
+class TestFileInventory( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir        = tempfile.TemporaryDirectory()
+        self.topLevelDir   = self.tmpDir.name
+        self.checkInterval = FileInventory.checkInterval
+
+        for relPath in ( 'pkgInfo.py',
+                         'CMakeLists.txt',
+                         'src/Foo.c',
+                         'src/Foo.h',
+                         'src/Bar/__init__.py',
+                         'include/Foo.h',
+                         'test/TestFoo.py',
+                         '.git/config',
+                         '.git/hooks/pre-commit.py',
+                         'external/lib/Baz.c' ):
+            self.addFile( relPath )
+
+        os.symlink( 'external', os.path.join( self.topLevelDir, 'linked' ) )
+
+        self.inventory = FileInventory.FileInventory( self.topLevelDir )
+
+
+    def tearDown( self ):
+        FileInventory.checkInterval = self.checkInterval
+
+        self.tmpDir.cleanup()
+
+
+    def addFile( self, relPath ):
+        filePath = os.path.join( self.topLevelDir, relPath )
+
+        FastScript.mkdir( os.path.dirname( filePath ) )
+        FastScript.setFileContent( filePath, '' )
+
+
+    def test_lookup( self ):
+        inventory = self.inventory
+
+        self.assertEqual( inventory.getFiles( '.h' ),
+                          [ 'include/Foo.h', 'src/Foo.h' ] )
+        self.assertEqual( inventory.getFiles( '.py' ),
+                          [ 'pkgInfo.py', 'src/Bar/__init__.py', 'test/TestFoo.py' ] )
+        self.assertEqual( inventory.getFiles( '__init__.py' ),
+                          [ 'src/Bar/__init__.py' ] )
+        self.assertEqual( inventory.getFiles( 'CMakeLists.txt' ),
+                          [ 'CMakeLists.txt' ] )
+        self.assertEqual( len( inventory.getFiles() ), 8 )
+
+        self.assertTrue( inventory.hasFiles( '.c' ) )
+        self.assertFalse( inventory.hasFiles( '.cpp' ) )
+
+        self.assertTrue( inventory.exists( 'pkgInfo.py' ) )
+        self.assertTrue( inventory.exists( './src/Foo.c' ) )
+        self.assertFalse( inventory.exists( 'Foo.c' ) )
+        self.assertFalse( inventory.exists( 'include/Foo.c' ) )
+
+
+    def test_subDir( self ):
+        inventory = self.inventory
+
+        self.assertEqual( inventory.getFiles( '.h', 'src' ), [ 'src/Foo.h' ] )
+        self.assertEqual( inventory.getFiles( '.py', 'src/' ),
+                          [ 'src/Bar/__init__.py' ] )
+        self.assertEqual( inventory.getFiles( '.py', 'src/Bar' ),
+                          [ 'src/Bar/__init__.py' ] )
+        self.assertEqual( inventory.getFiles( subDir='include' ),
+                          [ 'include/Foo.h' ] )
+
+        self.assertTrue( inventory.hasFiles( '.c', 'src' ) )
+        self.assertFalse( inventory.hasFiles( '.c', 'include' ) )
+
+        # prefix of a directory name is not a subdirectory
+        self.assertFalse( inventory.hasFiles( '.c', 'sr' ) )
+
+
+    def test_skippedDirs( self ):
+        inventory = self.inventory
+
+        # .git is not scanned
+        self.assertFalse( inventory.exists( '.git/config' ) )
+        self.assertEqual( inventory.getFiles( '.py', '.git' ), [] )
+
+        # symlinks to directories are not followed
+        self.assertTrue( inventory.exists( 'external/lib/Baz.c' ) )
+        self.assertFalse( inventory.exists( 'linked/lib/Baz.c' ) )
+        self.assertEqual( inventory.getFiles( '.c', 'linked' ), [] )
+        self.assertNotIn( 'linked', inventory.getFiles() )
+
+
+    def test_rebuild( self ):
+        inventory = self.inventory
+
+        self.assertFalse( inventory.hasFiles( '.cpp' ) )
+
+        self.addFile( 'src/Bar/Qux.cpp' )
+
+        # ensure a different mtime even on filesystems with coarse timestamps
+        barDir = os.path.join( self.topLevelDir, 'src', 'Bar' )
+        stat   = os.stat( barDir )
+        os.utime( barDir, ns=( stat.st_atime_ns, stat.st_mtime_ns + 10**9 ) )
+
+        # not checked again within checkInterval
+        FileInventory.checkInterval = 3600
+        self.assertFalse( inventory.hasFiles( '.cpp' ) )
+
+        FileInventory.checkInterval = 0
+        self.assertEqual( inventory.getFiles( '.cpp' ), [ 'src/Bar/Qux.cpp' ] )
+        self.assertTrue( inventory.exists( 'src/Bar/Qux.cpp' ) )
+
+
+    def test_singleton( self ):
+        inventory = FileInventory.getFileInventory( self.topLevelDir )
+
+        self.assertIs( FileInventory.getFileInventory( self.topLevelDir + '/.' ),
+                       inventory )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
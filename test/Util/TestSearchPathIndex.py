@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import tempfile
+import unittest
+
+from ToolBOSCore.Util import FastScript
+from ToolBOSCore.Util import SearchPathIndex
+
+
+class TestSearchPathIndex( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.oldEnv = dict( os.environ )
+        self.oldCwd = os.getcwd()
+        self.binDir = os.path.join( self.tmpDir.name, 'bin' )
+
+        FastScript.mkdir( self.binDir )
+
+        self.index = SearchPathIndex.SearchPathIndex( 'TEST_PATH' )
+
+
+    def tearDown( self ):
+        os.chdir( self.oldCwd )
+        os.environ.clear()
+        os.environ.update( self.oldEnv )
+
+        self.tmpDir.cleanup()
+
+
+    def addFile( self, dirName, name ):
+        filePath = os.path.join( self.tmpDir.name, dirName, name )
+
+        FastScript.mkdir( os.path.dirname( filePath ) )
+        FastScript.setFileContent( filePath, '' )
+
+        return filePath
+
+
+    def test_find( self ):
+        spam = self.addFile( 'bin', 'spam' )
+        self.addFile( 'other', 'spam' )
+
+        os.environ[ 'TEST_PATH' ] = '%s:%s' % ( self.binDir,
+                                                os.path.join( self.tmpDir.name, 'other' ) )
+
+        self.assertEqual( self.index.find( 'spam' ), spam )
+        self.assertIsNone( self.index.find( 'eggs' ) )
+        self.assertEqual( self.index.findAll( [ 'spam', 'eggs' ] ),
+                          { 'spam': spam, 'eggs': None } )
+
+
+    def test_relativeEntries( self ):
+        spam = self.addFile( 'bin', 'spam' )
+        eggs = self.addFile( 'sub/first', 'eggs' )
+
+        # empty entry (= current working directory) before the absolute one
+        os.environ[ 'TEST_PATH' ] = ':' + self.binDir
+
+        os.chdir( self.binDir )
+        self.assertEqual( self.index.find( 'spam' ), 'spam' )
+
+        os.chdir( self.tmpDir.name )
+        self.assertEqual( self.index.find( 'spam' ), spam )
+
+        # relative entry, not found at first
+        os.environ[ 'TEST_PATH' ] = 'first:' + self.binDir
+
+        self.assertIsNone( self.index.find( 'eggs' ) )
+
+        os.chdir( os.path.dirname( os.path.dirname( eggs ) ) )
+        self.assertEqual( self.index.find( 'eggs' ), 'first/eggs' )
+
+
+    def test_brokenSymlink( self ):
+        os.environ[ 'TEST_PATH' ] = self.binDir
+
+        target = os.path.join( self.tmpDir.name, 'target' )
+        link   = os.path.join( self.binDir, 'spam' )
+        os.symlink( target, link )
+
+        # like os.path.exists()
+        self.assertIsNone( self.index.find( 'spam' ) )
+
+        # creating the target does not change the mtime of the directory
+        FastScript.setFileContent( target, '' )
+        self.assertEqual( self.index.find( 'spam' ), link )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  launches the unit testing
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from ToolBOSCore.BuildSystem import WinSymbols
+from ToolBOSCore.Util        import FastScript
+
+
+# reference data: dumpbin.exe output, and the .def files created by the
+# former implementation of DumpWinSymbols.py using the arguments
+# "-b <bits> -s ExtraSym:Foo_new"
+dumpFile     = 'Foo-dumpbin.txt'
+defFiles     = { 32: 'Foo-32.def', 64: 'Foo-64.def' }
+extraSymbols = [ 'ExtraSym', 'Foo_new' ]
+
+
+class TestWinSymbols( unittest.TestCase ):
+
+    def setUp( self ):
+        if not FastScript.getEnv( 'VERBOSE' ) == 'TRUE':
+            FastScript.setDebugLevel( 1 )
+
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.script = os.path.join( FastScript.getEnv( 'TOOLBOSCORE_ROOT' ),
+                                    'include', 'CMake', 'DumpWinSymbols.py' )
+
+
+    def tearDown( self ):
+        self.tmpDir.cleanup()
+
+
+    def getExpected( self, bits ):
+        return FastScript.getFileContent( defFiles[ bits ] )
+
+
+    def runScript( self, *args, stdin=None ):
+        cmd = [ sys.executable, self.script, '-s', ':'.join( extraSymbols ) ] + list( args )
+
+        return subprocess.check_output( cmd, stdin=stdin, universal_newlines=True )
+
+
+    def test_referenceData( self ):
+        for bits in ( 32, 64 ):
+            outputFile = os.path.join( self.tmpDir.name, defFiles[ bits ] )
+
+            WinSymbols.dumpSymbols( dumpFile, outputFile, bits, extraSymbols + [ '' ] )
+
+            self.assertEqual( FastScript.getFileContent( outputFile ),
+                              self.getExpected( bits ) )
+            self.assertEqual( os.listdir( self.tmpDir.name ), [ defFiles[ bits ] ] )
+
+            os.remove( outputFile )
+
+
+    def test_stdin( self ):
+        outputFile = os.path.join( self.tmpDir.name, 'Foo.def' )
+
+        with open( dumpFile ) as fd:
+            output = self.runScript( '-o', outputFile, stdin=fd )
+
+        self.assertEqual( output, '' )
+        self.assertEqual( FastScript.getFileContent( outputFile ), self.getExpected( 32 ) )
+
+        # stdin to stdout
+        with open( dumpFile ) as fd:
+            output = self.runScript( '-b', '64', stdin=fd )
+
+        self.assertEqual( output, self.getExpected( 64 ) )
+
+
+    def test_batch( self ):
+        dumpFiles = []
+
+        for name in ( 'Foo', 'Bar', 'Baz' ):
+            filePath = os.path.join( self.tmpDir.name, name + '.out' )
+            FastScript.copy( dumpFile, filePath )
+            dumpFiles.append( filePath )
+
+        outputDir = os.path.join( self.tmpDir.name, 'defFiles' )
+        FastScript.mkdir( outputDir )
+
+        self.runScript( '-b', '64', '-j', '2', '-d', outputDir, *dumpFiles )
+
+        self.assertEqual( sorted( os.listdir( outputDir ) ),
+                          [ 'Bar.def', 'Baz.def', 'Foo.def' ] )
+
+        for fileName in os.listdir( outputDir ):
+            self.assertEqual( FastScript.getFileContent( os.path.join( outputDir, fileName ) ),
+                              self.getExpected( 64 ) )
+
+        # error in any of the files
+        missingFile = os.path.join( self.tmpDir.name, 'Missing.out' )
+        jobs        = [ ( filePath, filePath + '.def' )
+                        for filePath in dumpFiles + [ missingFile ] ]
+
+        with self.assertRaises( EnvironmentError ) as context:
+            WinSymbols.dumpSymbolsBatch( jobs, 64, extraSymbols, 2 )
+
+        self.assertIn( missingFile, str( context.exception ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# EOF
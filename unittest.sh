@@ -42,12 +42,31 @@ source "${TOOLBOSCORE_ROOT}/include/Unittest.bash"
 CWD=$(pwd)
 
 
+cd "${CWD}/test/AppConfig"           && runTest ./TestAppConfig.py
+cd "${CWD}/test/BSTDaemon"           && runTest ./TestBSTDaemon.py
+cd "${CWD}/test/BuildSystemTools"    && runTest ./TestBuildSystemTools.py
+cd "${CWD}/test/CMakeCompileCommands" && runTest ./TestCMakeCompileCommands.py
+cd "${CWD}/test/ConfigOptions"       && runTest ./TestConfigOptions.py
+cd "${CWD}/test/DocumentationCreator" && runTest ./TestDocumentationCreator.py
 cd "${CWD}/test/Git"                 && runTest ./test_Git.py
 cd "${CWD}/test/HelpTextConsistency" && runTest ./TestHelpTextConsistency.py
+cd "${CWD}/test/InstallProcedure"    && runTest ./TestInstallProcedure.py
+cd "${CWD}/test/ListDependencies"    && runTest ./TestListDependencies.py
+cd "${CWD}/test/MakeShellfiles"      && runTest ./TestBashSrcFlat.py
 cd "${CWD}/test/MakeShellfiles"      && runTest ./TestMakeShellfiles.py
+cd "${CWD}/test/PackageDetector"     && runTest ./TestPackageDetector.py
+cd "${CWD}/test/PackageRecord"       && runTest ./TestPackageRecord.py
+cd "${CWD}/test/ProcessEnv"          && runTest ./TestProcessEnv.py
+cd "${CWD}/test/ProxyDir"            && runTest ./TestProxyDir.py
 cd "${CWD}/test/SetupWineMSVC"       && runTest ./TestSetupWineMSVC.py
+cd "${CWD}/test/StartupTime"         && runTest ./TestStartupTime.py
+cd "${CWD}/test/TemplateEngine"      && runTest ./TestTemplateEngine.py
+cd "${CWD}/test/UnittestRunner"      && runTest ./TestUnittestRunner.py
 cd "${CWD}/test/Util"                && runTest ./TestArgsManagerV2.py
 cd "${CWD}/test/Util"                && runTest ./TestFastScript.py
+cd "${CWD}/test/Util"                && runTest ./TestFileInventory.py
+cd "${CWD}/test/Util"                && runTest ./TestSearchPathIndex.py
+cd "${CWD}/test/WinSymbols"          && runTest ./TestWinSymbols.py
 
 
 # we managed to get here --> success